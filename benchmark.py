@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+不依赖Windows组件和图形界面，可以在任何平台上运行：
+    python benchmark.py verify      # 按父目录批量验证前后的系统调用次数
+    python benchmark.py cli         # 命令行查询模式的启动时间
+    python benchmark.py search      # 2万个文件夹的模糊搜索耗时，以及逐字输入时每次按键的耗时
+    python benchmark.py rank        # 5万个文件夹按 frecency 重新排名的耗时（有 numpy 时使用 numpy）
+    python benchmark.py memory      # 每1万个文件夹记录和过滤结果占用的内存（tracemalloc）
+    python benchmark.py tags        # 10万个路径按关键词分类的耗时（逐条规则查找子串 vs 编译的分类器）
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+
+import frecency
+from folder_record import FolderRecord
+import lnk_parser
+import recent_scanner
+import search_index
+import smart_tags
+
+
+# 命令行查询模式不应加载的模块
+GUI_MODULES = ['tkinter', 'PIL', 'pystray', 'keyboard', 'win32com', 'pyperclip']
+
+# 生成模拟路径用的根目录、分组目录、项目名音节和子目录名
+ROOTS = ['C:\\Users\\me', 'D:\\', 'E:\\Media', '\\\\fileserver\\share\\team', '\\\\nas01\\projects']
+GROUP_DIRS = ['Documents', 'Projects', 'Work', 'Downloads', 'Photos', '学习资料', '工作文档', 'archive', '2023', '2024']
+NAME_SYLLABLES = ['ka', 'lo', 'mi', 'ter', 'von', 'bel', 'gra', 'sun', 'dex', 'nor', 'qui', 'fal', 'hub', 'ze', 'pix']
+SUB_DIRS = ['src', 'api', 'docs', 'client', 'server', 'build', 'release', 'data', 'scripts', 'tools',
+            'backup', 'reports', 'images', 'test', 'config', '照片', '报告']
+
+
+class SyscallCounter:
+    """统计 os.stat / os.scandir 的调用次数（os.path.isdir 内部使用 os.stat）"""
+
+    def __init__(self):
+        self.counts = {'stat': 0, 'scandir': 0}
+        self._originals = {}
+
+    def __enter__(self):
+        for name in self.counts:
+            original = getattr(os, name)
+            self._originals[name] = original
+
+            def counted(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                return _original(*args, **kwargs)
+
+            setattr(os, name, counted)
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+def make_candidate_tree(root, parents, children):
+    """创建 parents 个父目录，每个下面 children 个子文件夹，返回候选列表
+
+    候选列表模拟扫描结果：每个子文件夹及其父目录都是候选，另外每个父目录
+    下还有几个已删除的子文件夹。
+    """
+    now = time.time()
+    candidates = []
+    for p in range(parents):
+        parent = os.path.join(root, f"parent_{p:03d}")
+        os.makedirs(parent)
+        candidates.append({'path': parent, 'timestamp': now})
+        for c in range(children):
+            child = os.path.join(parent, f"child_{c:03d}")
+            os.makedirs(child)
+            candidates.append({'path': child, 'timestamp': now})
+        for c in range(3):
+            candidates.append({'path': os.path.join(parent, f"deleted_{c}"), 'timestamp': now})
+    return candidates
+
+
+def make_folder_records(count, seed=1):
+    """生成 count 个模拟文件夹记录
+
+    Windows风格路径（包括较长的UNC路径），按 根目录\\分组\\项目\\子目录 组织，
+    项目名由音节随机组合，和真实的最近文件夹一样有大量共同前缀。
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    projects = [
+        rng.choice(ROOTS).rstrip('\\') + '\\' + rng.choice(GROUP_DIRS) + '\\' +
+        '-'.join(''.join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 3)))
+                 for _ in range(rng.randint(1, 2)))
+        for _ in range(max(1, count // 20))
+    ]
+    folders = []
+    for i in range(count):
+        parts = [rng.choice(projects)] + [rng.choice(SUB_DIRS) for _ in range(rng.randint(0, 3))]
+        path = '\\'.join(parts) + f"_{i}"
+        folders.append(FolderRecord(path, now - i * 60, True))
+    return folders
+
+
+def build_lnk(target, is_dir=True):
+    """生成一个只包含 LinkInfo（本地路径）的最小 .lnk 文件内容"""
+    flags = lnk_parser.HAS_LINK_INFO | lnk_parser.IS_UNICODE
+    attributes = lnk_parser.FILE_ATTRIBUTE_DIRECTORY if is_dir else 0x20
+    header = (struct.pack('<I', lnk_parser.HEADER_SIZE) + lnk_parser.LINK_CLSID +
+              struct.pack('<2I', flags, attributes) + b'\0' * 24 +
+              struct.pack('<3I', 0, 0, 1) + b'\0' * 12)
+
+    base_ansi = target.encode('ascii', errors='replace') + b'\0'
+    base_unicode = target.encode('utf-16-le') + b'\0\0'
+    volume_id = struct.pack('<4I', 16, 3, 0, 16)
+    header_size = 0x24
+    volume_offset = header_size
+    base_offset = volume_offset + len(volume_id)
+    suffix_offset = base_offset + len(base_ansi)
+    base_unicode_offset = suffix_offset + 1
+    suffix_unicode_offset = base_unicode_offset + len(base_unicode)
+    total = suffix_unicode_offset + 2
+    link_info = (struct.pack('<9I', total, header_size, lnk_parser.VOLUME_ID_AND_LOCAL_BASE_PATH,
+                             volume_offset, base_offset, 0, suffix_offset,
+                             base_unicode_offset, suffix_unicode_offset) +
+                 volume_id + base_ansi + b'\0' + base_unicode + b'\0\0')
+    return header + link_info
+
+
+def make_recent_folder(root, count):
+    """创建包含 count 个快捷方式的模拟Recent文件夹，目标指向真实存在的文件夹"""
+    recent_dir = os.path.join(root, "Recent")
+    targets_dir = os.path.join(root, "targets")
+    os.makedirs(recent_dir)
+    for i in range(count):
+        parent = os.path.join(targets_dir, f"project_{i % 50:02d}")
+        target = os.path.join(parent, f"dir_{i:05d}")
+        os.makedirs(target)
+        with open(os.path.join(recent_dir, f"link_{i:05d}.lnk"), 'wb') as f:
+            f.write(build_lnk(target))
+    return recent_dir
+
+
+def bench_verify(args):
+    """比较逐个 isdir 与按父目录 scandir 的系统调用次数和耗时"""
+    root = tempfile.mkdtemp(prefix="rfv_bench_")
+    try:
+        candidates = make_candidate_tree(root, args.parents, args.children)
+        print(f"候选文件夹: {len(candidates)} 个（{args.parents} 个父目录 × {args.children} 个子文件夹）")
+
+        for label, grouped in (("逐个 isdir", False), ("按父目录 scandir", True)):
+            with SyscallCounter() as counter:
+                start = time.perf_counter()
+                folders = recent_scanner.verify_candidates(candidates, group_by_parent=grouped)
+                elapsed = time.perf_counter() - start
+            print(f"{label:<16} stat={counter.counts['stat']:>6}  scandir={counter.counts['scandir']:>5}  "
+                  f"总计={counter.total:>6}  有效={len(folders)}  {elapsed * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_cli(args):
+    """测量 --list --json 的启动时间（冷缓存一次、热缓存多次），并检查没有加载界面模块"""
+    root = tempfile.mkdtemp(prefix="rfv_bench_")
+    try:
+        recent_dir = make_recent_folder(root, args.links)
+        env = dict(os.environ, HOME=root, USERPROFILE=root)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recent_folders_viewer.py")
+        command = [sys.executable, script, '--list', '--json', '--limit', '50',
+                   '--query', 'dir', '--recent-dir', recent_dir]
+
+        def run_once():
+            start = time.perf_counter()
+            subprocess.run(command, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return (time.perf_counter() - start) * 1000
+
+        print(f"模拟Recent文件夹: {args.links} 个快捷方式")
+        print(f"冷缓存: {run_once():.1f} ms")
+        warm = [run_once() for _ in range(args.runs)]
+        print(f"热缓存: 中位数 {statistics.median(warm):.1f} ms，最快 {min(warm):.1f} ms（{args.runs} 次）")
+
+        # 检查命令行模式加载的模块
+        check = (
+            "import runpy, sys\n"
+            f"sys.argv = {command[1:]!r}\n"
+            "try:\n"
+            "    runpy.run_path(sys.argv[0], run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"loaded = [m for m in {GUI_MODULES!r} if m in sys.modules]\n"
+            "sys.stderr.write(repr(loaded))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', check], env=env, check=True,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        print(f"加载的界面模块: {result.stderr.strip().splitlines()[-1]}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_search(args):
+    """测量模糊搜索和子串搜索的耗时、位掩码预过滤排除的比例，以及逐字输入和退格时每次按键的耗时"""
+    from folder_index import FolderIndex
+
+    folders = make_folder_records(args.folders)
+    config_dir = tempfile.mkdtemp(prefix="rfv_bench_")
+    try:
+        index = FolderIndex(config_dir)
+        start = time.perf_counter()
+        index.set_folders(folders)
+        index.prepare_search_index()
+        print(f"文件夹: {len(folders)} 个，建立索引 {(time.perf_counter() - start) * 1000:.1f} ms")
+        if len(folders) >= search_index.NUMPY_MIN_PATHS and frecency.load_numpy():
+            start = time.perf_counter()
+            index.search_index._numpy_arrays()
+            print(f"模糊搜索计算方式: numpy，建立数组 {(time.perf_counter() - start) * 1000:.1f} ms")
+        else:
+            print("模糊搜索计算方式: 纯Python")
+
+        fuzzy_keys = index.search_index.fuzzy_keys
+        print(f"{'查询':<16}{'预过滤通过':>10}{'结果':>8}{'模糊(ms)':>10}{'子串(ms)':>10}")
+        for query in args.queries:
+            query_mask = search_index.char_mask(search_index.normalize_text(query))
+            passed = sum(1 for mask, _, _ in fuzzy_keys.values() if mask & query_mask == query_mask)
+
+            timings = {}
+            for fuzzy in (True, False):
+                index.settings['fuzzy_search'] = fuzzy
+                best = None
+                for _ in range(args.runs):
+                    index.clear_search_cache()
+                    start = time.perf_counter()
+                    result = index.filter_folders(query)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[fuzzy] = (best, len(result))
+            print(f"{query:<16}{passed:>10}{timings[True][1]:>8}"
+                  f"{timings[True][0] * 1000:>10.2f}{timings[False][0] * 1000:>10.2f}")
+
+        # 模拟在搜索框中逐字输入再逐字退格，重复 runs 次，每次按键取最短耗时
+        index.settings['fuzzy_search'] = True
+        print(f"\n逐字输入（每次按键 ms，{args.runs} 次取最短）:")
+        for query in args.queries:
+            typing = [float('inf')] * len(query)
+            backspace = [float('inf')] * (len(query) - 1)
+            for _ in range(args.runs):
+                index.clear_search_cache()
+                for i in range(1, len(query) + 1):
+                    start = time.perf_counter()
+                    index.filter_folders(query[:i])
+                    typing[i - 1] = min(typing[i - 1], (time.perf_counter() - start) * 1000)
+                for i in range(len(query) - 1, 0, -1):
+                    start = time.perf_counter()
+                    index.filter_folders(query[:i])
+                    backspace[len(query) - 1 - i] = min(backspace[len(query) - 1 - i],
+                                                         (time.perf_counter() - start) * 1000)
+            print(f"{query:<16}输入 {' '.join(f'{t:.1f}' for t in typing)}")
+            print(f"{'':<16}退格 {' '.join(f'{t:.1f}' for t in backspace)}")
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def make_open_history(folders, ratio, seed=1):
+    """为 ratio 比例的文件夹生成过去90天内的打开事件"""
+    rng = random.Random(seed)
+    now = time.time()
+    history = {}
+    for folder in rng.sample(folders, int(len(folders) * ratio)):
+        opens = sorted(now - rng.uniform(0, 90 * 86400) for _ in range(rng.randint(1, 30)))
+        history[folder.path] = {
+            'count': len(opens), 'first_opened': opens[0], 'last_opened': opens[-1], 'opens': opens
+        }
+    return history
+
+
+def bench_rank(args):
+    """测量建立 frecency 排名器、完整重新排名、缓存命中和打开一个文件夹后重新排名的耗时"""
+    folders = make_folder_records(args.folders)
+    history = make_open_history(folders, args.opened)
+    numpy_state = "numpy" if frecency.load_numpy() else "纯Python（未安装numpy）"
+    print(f"文件夹: {len(folders)} 个，有打开记录: {len(history)} 个，计算方式: {numpy_state}")
+
+    def best_of(func):
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    print(f"建立排名器: {best_of(lambda: frecency.FrecencyRanker(folders, history)):.2f} ms")
+    ranker = frecency.FrecencyRanker(folders, history)
+    now = time.time()
+    print(f"计算所有分数: {best_of(lambda: ranker.scores(now)):.2f} ms")
+
+    # 每次使用新的时间分档，强制完整重新排名
+    buckets = iter(range(1, 10 ** 6))
+    full = best_of(lambda: ranker.rank(now + next(buckets) * frecency.RANK_BUCKET_SECONDS))
+    print(f"完整重新排名: {full:.2f} ms")
+    ranker.rank(now)
+    print(f"缓存命中: {best_of(lambda: ranker.rank(now)) * 1000:.1f} us")
+
+    paths = [folder.path for folder in folders]
+
+    def open_and_rank():
+        ranker.record_open(random.choice(paths), now)
+        ranker.rank(now)
+    print(f"打开一个文件夹后重新排名: {best_of(open_and_rank):.2f} ms")
+
+
+def traced_size(build):
+    """返回 (build() 的结果, 构建过程中新分配并仍然占用的字节数)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def bench_memory(args):
+    """比较每1万个文件夹的常驻内存：dict+datetime 记录和 FolderRecord，过滤结果的列表副本和下标数组
+
+    路径字符串在两种记录中相同，事先生成并单独列出，记录的内存不包括它们。
+    """
+    count = args.folders
+    per_10k = 10000 / count / 1024
+    source = make_folder_records(count)
+    paths, timestamps = zip(*[(folder.path, folder.timestamp) for folder in source])
+    del source
+    _, path_size = traced_size(lambda: [path.encode('utf-8').decode('utf-8') for path in paths])
+    print(f"文件夹: {count} 个，以下为每1万个文件夹的内存（KB）")
+    print(f"路径字符串（两种记录相同）: {path_size * per_10k:.0f} KB")
+
+    dicts, dict_size = traced_size(lambda: [
+        {'path': path, 'access_time': datetime.fromtimestamp(t), 'exists': True}
+        for path, t in zip(paths, timestamps)
+    ])
+    # t + 0.0 生成新的浮点数对象，和实际扫描时一样每个记录有自己的时间戳
+    records, record_size = traced_size(lambda: [
+        FolderRecord(path, t + 0.0, True) for path, t in zip(paths, timestamps)
+    ])
+    print(f"记录 dict + datetime: {dict_size * per_10k:.0f} KB")
+    print(f"记录 FolderRecord: {record_size * per_10k:.0f} KB")
+    del dicts
+
+    # 过滤结果：没有过滤条件时原来复制整个列表，现在直接共享；有过滤条件时按匹配比例比较
+    _, copy_size = traced_size(lambda: records.copy())
+    print(f"无过滤时复制列表: {copy_size * per_10k:.0f} KB")
+    print("无过滤时共享列表: 0 KB")
+    step = max(1, round(1 / args.matched))
+    matched = range(0, count, step)
+    _, list_size = traced_size(lambda: [records[i] for i in matched])
+    _, array_size = traced_size(lambda: array('I', matched))
+    print(f"匹配 {args.matched:.0%} 时列表: {list_size * per_10k:.0f} KB")
+    print(f"匹配 {args.matched:.0%} 时下标数组: {array_size * per_10k:.0f} KB")
+
+
+def chained_keyword_tags(path_lower):
+    """原来的做法：对每条规则逐个关键词查找子串，返回匹配的 [(标签, 分类), ...]"""
+    return [
+        (tag, category) for tag, category, keywords in smart_tags.PATH_KEYWORD_RULES
+        if any(keyword in path_lower for keyword in keywords)
+    ]
+
+
+def bench_tags(args):
+    """比较逐条规则查找关键词和编译的关键词分类器，并检查两者结果一致"""
+    paths = [folder.path.lower() for folder in make_folder_records(args.paths)]
+    start = time.perf_counter()
+    classifier = smart_tags.KeywordClassifier(smart_tags.PATH_KEYWORD_RULES)
+    build = (time.perf_counter() - start) * 1000
+    print(f"路径: {len(paths)} 个，关键词: {len(classifier.masks)} 个，编译分类器 {build:.1f} ms")
+
+    for name, classify in [("逐条规则查找子串", chained_keyword_tags), ("编译的分类器", classifier.classify)]:
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            results = [classify(path) for path in paths]
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name}: {best:.0f} ms（每个路径 {best * 1000 / len(paths):.2f} us）")
+        if classify is chained_keyword_tags:
+            expected = results
+        elif results != expected:
+            mismatches = sum(1 for a, b in zip(results, expected) if a != b)
+            print(f"结果不一致: {mismatches} 个路径")
+    matched = sum(1 for result in expected if result)
+    print(f"匹配到至少一个分类的路径: {matched} 个")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="最近文件夹查看器性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    verify_parser = subparsers.add_parser('verify', help="文件夹存在性验证的系统调用次数")
+    verify_parser.add_argument('--parents', type=int, default=40)
+    verify_parser.add_argument('--children', type=int, default=50)
+    verify_parser.set_defaults(func=bench_verify)
+
+    cli_parser = subparsers.add_parser('cli', help="命令行查询模式的启动时间")
+    cli_parser.add_argument('--links', type=int, default=2000)
+    cli_parser.add_argument('--runs', type=int, default=10)
+    cli_parser.set_defaults(func=bench_cli)
+
+    search_parser = subparsers.add_parser('search', help="模糊搜索耗时")
+    search_parser.add_argument('--folders', type=int, default=20000)
+    search_parser.add_argument('--runs', type=int, default=5)
+    search_parser.add_argument('--queries', nargs='+',
+                               default=['prjapi', 'kalosrc', 'nasrel', 'docs2024', 'zzq', 'fileserverapi', '报告'])
+    search_parser.set_defaults(func=bench_search)
+
+    rank_parser = subparsers.add_parser('rank', help="frecency 重新排名耗时")
+    rank_parser.add_argument('--folders', type=int, default=50000)
+    rank_parser.add_argument('--opened', type=float, default=0.1, help="有打开记录的文件夹比例")
+    rank_parser.add_argument('--runs', type=int, default=5)
+    rank_parser.set_defaults(func=bench_rank)
+
+    memory_parser = subparsers.add_parser('memory', help="文件夹记录和过滤结果的内存占用")
+    memory_parser.add_argument('--folders', type=int, default=50000)
+    memory_parser.add_argument('--matched', type=float, default=0.1, help="有过滤条件时匹配的文件夹比例")
+    memory_parser.set_defaults(func=bench_memory)
+
+    tags_parser = subparsers.add_parser('tags', help="路径关键词分类耗时")
+    tags_parser.add_argument('--paths', type=int, default=100000)
+    tags_parser.add_argument('--runs', type=int, default=3)
+    tags_parser.set_defaults(func=bench_tags)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
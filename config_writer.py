@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 文件的原子写入和后台合并写入
+先写到同一目录下的临时文件并刷到磁盘，再用 os.replace 替换目标文件，
+写入过程中程序崩溃或断电时目标文件要么是旧内容，要么是新内容，不会只写了一半。
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+# 后台写入前等待的时间（秒），这段时间内的多次保存合并为一次写入
+WRITE_DELAY = 1.0
+
+# 目标文件被其他程序（例如杀毒软件）短暂占用时 os.replace 的重试次数和间隔
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.05
+
+# 后台写入失败后重试的等待时间（秒），连续失败时加倍，最长 WRITE_RETRY_MAX_DELAY
+WRITE_RETRY_DELAY = 1.0
+WRITE_RETRY_MAX_DELAY = 30.0
+
+
+def atomic_write_json(path, data, indent=None):
+    """把 data 原子地写入 path；indent 为None时使用紧凑格式"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if indent is None:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(temp_path, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class BackgroundJsonWriter:
+    """在后台线程中写入 JSON 文件
+
+    submit(data) 只记录最新的数据并唤醒写入线程，调用方不会被磁盘IO阻塞；
+    线程等待 delay 秒后写入，期间多次 submit 只写最后一次。data 必须是调用方不再修改的快照。
+    写入失败时保留数据，等待一段时间（连续失败时加倍）后重试，不需要等到下一次 submit。
+    程序退出前调用 flush() 立即写入还没写的数据。
+    """
+
+    def __init__(self, path, delay=WRITE_DELAY, indent=None):
+        self.path = path
+        self.delay = delay
+        self.indent = indent
+        self.writes = 0  # 实际写入的次数
+        self._pending = None
+        self._lock = threading.Lock()
+        # 同一时间只允许一次写入（后台线程和 flush 可能同时写）
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def submit(self, data):
+        """记录要写入的数据，稍后在后台写入"""
+        with self._lock:
+            self._pending = data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="json-writer", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        failures = 0
+        while True:
+            self._wakeup.wait()
+            # 等一会儿再写，合并连续的多次保存
+            time.sleep(self.delay)
+            self._wakeup.clear()
+            if self.flush():
+                failures = 0
+                continue
+            # 没写成的数据还在 _pending 中，等一会儿自己唤醒重试
+            failures += 1
+            time.sleep(min(WRITE_RETRY_MAX_DELAY, WRITE_RETRY_DELAY * 2 ** (failures - 1)))
+            self._wakeup.set()
+
+    def flush(self):
+        """立即写入还没写的数据，返回是否成功（没有数据时也返回True）"""
+        with self._write_lock:
+            with self._lock:
+                data, self._pending = self._pending, None
+            if data is None:
+                return True
+            try:
+                atomic_write_json(self.path, data, self.indent)
+                self.writes += 1
+                return True
+            except Exception as e:
+                print(f"保存 {os.path.basename(self.path)} 失败: {e}")
+                # 没有更新的数据时保留这份，下次再写
+                with self._lock:
+                    if self._pending is None:
+                        self._pending = data
+                return False
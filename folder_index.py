@@ -0,0 +1,765 @@
+# -*- coding: utf-8 -*-
+"""
+最近文件夹索引（不依赖图形界面）
+负责扫描、去重、优先级排序、过滤、智能标签以及配置的读写。
+图形界面只是它的一个视图；本模块只使用标准库，可以在Linux上导入和做性能测试。
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from itertools import repeat
+from operator import floordiv, mod, mul, sub
+
+from config_writer import BackgroundJsonWriter
+from folder_record import FolderView
+from frecency import FrecencyRanker, append_open_event
+from history_store import HistoryStore
+from link_cache import LinkCache
+from search_index import TrigramIndex, SCORE_BUCKET, FUZZY_MIN_LENGTH
+from recent_scanner import (
+    get_recent_path, list_lnk_files, resolve_links, build_folder_candidates, verify_candidates
+)
+from smart_tags import (
+    generate_folder_tags, generate_path_tags, format_auto_comment, is_auto_comment,
+    CLASSIFIER_VERSION, FREQUENT_OPEN_COUNT, OFTEN_OPEN_COUNT
+)
+from tag_cache import TagCache
+from tag_job import TagJob
+
+
+# 可在 config.json 的 settings 中修改的设置及默认值
+DEFAULT_SETTINGS = {
+    'resolve_workers': 0,            # 解析快捷方式的工作进程数，0表示使用CPU核心数
+    'resolve_executor': 'process',   # 'process' 或 'thread'
+    'verify_workers': 16,            # 并发检查文件夹是否存在的线程数
+    'verify_timeout': 2.0,           # 单个路径检查的超时时间（秒）
+    'verify_breaker_threshold': 3,   # 同一卷超时达到该次数后跳过该卷上剩余的路径
+    'fuzzy_search': True,            # 搜索框使用模糊匹配（子序列）并按匹配程度排序
+    'tag_workers': 8,                # 生成智能标签时同时分析的文件夹数
+    'preview_sort': 'name',          # 文件预览的排序方式：'name'、'size'（最大）或 'mtime'（最新）
+}
+
+# 缓存最近多少个搜索文本排好序的结果
+SEARCH_RESULT_CACHE_SIZE = 16
+
+
+def default_config_dir():
+    """默认配置目录 ~/.recent_folders_viewer"""
+    return os.path.join(os.path.expanduser("~"), ".recent_folders_viewer")
+
+
+class FolderIndex:
+    """最近访问文件夹的数据、打开历史、注释和智能标签"""
+
+    def __init__(self, config_dir=None):
+        # 存储文件夹数据（已按优先级排序）
+        self.folders_data = []
+        # 每个路径在 folders_data 中的位置，列表替换或重新排序后更新
+        self.folder_positions = {}  # {path: index}
+        # 排序版本：列表替换或重新排序时加一；和搜索索引的数据版本一起作为搜索结果缓存的键
+        self.order_version = 0
+        self._search_results = OrderedDict()  # {(搜索文本, 是否模糊, 数据版本, 排序版本): 文件夹列表}
+        # 记录已打开的文件夹和打开次数
+        self.opened_folders = set()
+        self.open_history = {}  # {path: {'count': 打开次数, 'last_opened': 最后打开时间, 'opens': [打开时间, ...]}}
+        # 按 frecency 排序当前的文件夹列表，set_folders 时重建
+        self.frecency = FrecencyRanker([], {})
+        # 文件夹注释
+        self.folder_comments = {}  # {path: comment}
+        # 自动生成的智能标签
+        self.folder_smart_tags = {}  # {path: [tag1, tag2, ...]}
+        # 文件夹分类缓存
+        self.folder_categories = {}  # {path: category}
+        # 程序设置
+        self.settings = dict(DEFAULT_SETTINGS)
+        # 路径和注释的搜索索引，随文件夹列表和注释的变化增量维护
+        self.search_index = TrigramIndex()
+        # 文件夹列表或注释整体替换后为True，第一次搜索前（或 ensure_search_index）才重建索引
+        self.search_index_stale = False
+
+        # 配置文件路径
+        self.config_dir = config_dir or default_config_dir()
+        self.config_file = os.path.join(self.config_dir, "config.json")
+        # 设置在后台线程中合并、原子地写入（config.json 可能被手动编辑，保持缩进格式）
+        self.config_writer = BackgroundJsonWriter(self.config_file, indent=2)
+        # 打开历史、注释和智能标签保存在SQLite数据库中，config.json 只保存设置
+        self.store = HistoryStore(os.path.join(self.config_dir, "history.db"))
+        # 数据库不可用或还没有迁移成功时，打开历史和注释仍按旧版格式和设置一起保存在 config.json 中
+        self.history_in_json = False
+        # config.json 无法读取且备份失败时不再改写它
+        self.config_writable = True
+        # 快捷方式解析缓存（首次扫描时加载）
+        self.link_cache = LinkCache(os.path.join(self.config_dir, "lnk_cache.json"))
+        self.link_cache_loaded = False
+        # 智能标签的文件夹内容分析缓存（第一次生成标签时加载）
+        self.tag_cache = TagCache(os.path.join(self.config_dir, "tag_cache.json"))
+        # 正在运行（或最近一次）的智能标签生成任务，同一时间只运行一个
+        self.tag_job = None
+        self._tag_job_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 配置
+    # ------------------------------------------------------------------
+
+    def create_config_dir(self):
+        """创建配置目录"""
+        try:
+            if not os.path.exists(self.config_dir):
+                os.makedirs(self.config_dir)
+        except Exception as e:
+            print(f"创建配置目录失败: {e}")
+
+    def load_config(self):
+        """加载设置，以及数据库中的打开历史、注释和智能标签
+
+        第一次使用数据库时先把旧版 config.json 备份为 config.json.bak，再把其中的打开历史和注释迁移过去。
+        数据库无法打开或迁移没有提交时继续使用 config.json 中的打开历史和注释，保存设置时一起写回。
+        """
+        config = {}
+        config_readable = True
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+
+                # 加载程序设置（缺少的项使用默认值）
+                self.settings.update(config.get('settings', {}))
+            else:
+                print("配置文件不存在，使用默认设置")
+        except Exception as e:
+            print(f"加载配置文件失败: {e}")
+            config_readable = False
+            # 保存设置时会改写 config.json，先保留无法读取的原文件
+            self.config_writable = self.backup_config(".corrupt")
+
+        self.history_in_json = True
+        smart_tags = {}
+        try:
+            if self.store.open():
+                if self.store.is_migrated():
+                    self.history_in_json = False
+                elif config_readable:
+                    self.history_in_json = not self.migrate_config(config)
+            if self.history_in_json:
+                print("历史数据库不可用，打开历史和注释继续保存在 config.json 中")
+                self.open_history = config.get('open_history', {})
+                self.folder_comments = config.get('folder_comments', {})
+            else:
+                self.open_history, self.folder_comments, smart_tags = self.store.load()
+
+            # 重建 opened_folders 集合和智能标签
+            self.opened_folders = set(self.open_history.keys())
+            self.folder_smart_tags = {path: tags for path, (_, tags) in smart_tags.items() if tags}
+            self.folder_categories = {path: category for path, (category, _) in smart_tags.items()}
+
+            print(f"配置加载成功，包含 {len(self.open_history)} 条历史记录和 {len(self.folder_comments)} 条注释")
+        except Exception as e:
+            print(f"加载历史数据库失败: {e}")
+            self.history_in_json = True
+            self.open_history = config.get('open_history', {})
+            self.opened_folders = set(self.open_history)
+            self.folder_comments = config.get('folder_comments', {})
+        if self.history_in_json:
+            # 迁移提交之前不写数据库，否则以后迁移 config.json 时这些行会和迁移的记录重复
+            self.store.close()
+        self.invalidate_search_index()
+
+    def backup_config(self, suffix):
+        """把 config.json 复制为 config.json<suffix>，返回是否成功"""
+        try:
+            shutil.copyfile(self.config_file, self.config_file + suffix)
+            return True
+        except Exception as e:
+            print(f"备份配置文件失败: {e}")
+            return False
+
+    def migrate_config(self, config):
+        """把旧版 config.json 中的打开历史和注释迁移到数据库，返回迁移是否已提交
+
+        迁移之后保存设置会把 config.json 改写成只有设置的格式，所以有数据时必须先备份成功。
+        """
+        open_history = config.get('open_history', {})
+        folder_comments = config.get('folder_comments', {})
+        if (open_history or folder_comments) and not self.backup_config(".bak"):
+            return False
+        return self.store.migrate_from_json(open_history, folder_comments, time.time())
+
+    def history_snapshot(self):
+        """按旧版 config.json 的格式返回打开历史和注释的副本，交给写入线程后不会再被修改
+
+        智能标签线程中也会调用，先用 list/dict 在C层面一次复制，不会遇到迭代期间字典被修改。
+        """
+        return {
+            'open_history': {
+                path: dict(entry, opens=list(entry['opens'])) if 'opens' in entry else dict(entry)
+                for path, entry in list(self.open_history.items())
+            },
+            'folder_comments': dict(self.folder_comments),
+        }
+
+    def history_changed(self):
+        """打开历史或注释变化后调用：数据库不可用时它们只保存在 config.json 中，在后台保存（连续的变化合并写入）"""
+        if self.history_in_json:
+            self.save_config()
+
+    def save_config(self):
+        """在后台保存设置
+
+        打开历史、注释和智能标签在变化时已经写入数据库；数据库不可用时它们和设置一起写入 config.json。
+        """
+        if not self.config_writable:
+            return
+        data = {
+            'settings': dict(self.settings),
+            'last_saved': time.time()
+        }
+        if self.history_in_json:
+            data.update(self.history_snapshot())
+        self.config_writer.submit(data)
+
+    def update_setting(self, key, value):
+        """修改一项设置并在后台保存"""
+        if self.settings.get(key) == value:
+            return
+        self.settings[key] = value
+        self.save_config()
+
+    def export_json(self):
+        """按旧版 config.json 的格式导出打开历史、注释和设置"""
+        if self.history_in_json:
+            return dict(self.history_snapshot(), settings=dict(self.settings))
+        return self.store.export_json(self.settings)
+
+    def close(self):
+        """取消智能标签生成，立即写入设置并关闭数据库，程序退出前调用"""
+        self.cancel_smart_tags_job()
+        self.save_config()
+        self.config_writer.flush()
+        self.store.close()
+
+    # ------------------------------------------------------------------
+    # 扫描
+    # ------------------------------------------------------------------
+
+    def scan_recent_folders(self, recent_path=None):
+        """从Windows Recent文件夹的.lnk文件读取最近访问的文件夹
+
+        recent_path 可以指定其他目录（例如复制出来的Recent文件夹），默认使用当前用户的。
+        """
+        folders = []
+
+        try:
+            # 获取Recent文件夹路径
+            recent_path = recent_path or get_recent_path()
+            if not recent_path:
+                return folders
+
+            # 使用os.scandir提升性能，同时获取文件信息
+            try:
+                lnk_files_info = list_lnk_files(recent_path)
+            except (OSError, PermissionError):
+                return folders
+
+            # 加载快捷方式缓存，并删除已不存在的快捷方式对应的缓存项
+            recent_path = os.path.normcase(os.path.abspath(recent_path))
+            if not self.link_cache_loaded or self.link_cache.source != recent_path:
+                self.link_cache.load(recent_path)
+                self.link_cache_loaded = True
+            self.link_cache.reset_stats()
+            self.link_cache.prune({lnk_info['name'] for lnk_info in lnk_files_info})
+
+            if not lnk_files_info:
+                self.link_cache.save()
+                return folders
+
+            # 并行解析快捷方式（命中缓存的直接复用），保持最新优先的顺序去重
+            resolved = resolve_links(
+                lnk_files_info,
+                self.link_cache,
+                workers=self.settings['resolve_workers'],
+                executor_kind=self.settings['resolve_executor']
+            )
+            folder_candidates = build_folder_candidates(lnk_files_info, resolved)
+
+            self.link_cache.save()
+            print(f"快捷方式缓存命中 {self.link_cache.hits} 个，重新解析 {self.link_cache.misses} 个")
+
+            # 现在批量检查文件夹是否存在（这是最耗时的部分）
+            print(f"正在验证 {len(folder_candidates)} 个候选文件夹...")
+
+            # 在有超时限制的线程池中并发验证，无响应的卷会被熔断，超时的路径状态记为未知
+            folders = verify_candidates(
+                folder_candidates,
+                workers=self.settings['verify_workers'],
+                timeout=self.settings['verify_timeout'],
+                breaker_threshold=self.settings['verify_breaker_threshold']
+            )
+
+            print(f"找到 {len(folders)} 个有效文件夹")
+
+        except Exception as e:
+            print(f"读取Recent文件夹时出错: {e}")
+
+        return folders
+
+    def dedupe_folders(self, recent_folders, progress_callback=None):
+        """按规范化路径去重，保留访问时间更新的记录
+
+        progress_callback(progress, found_count) 每处理50个文件夹调用一次。
+        """
+        # 使用字典来存储文件夹信息，以路径为键进行去重
+        folder_dict = {}
+        total_found = len(recent_folders)
+
+        for i, folder in enumerate(recent_folders):
+            # 标准化路径（解决大小写和路径分隔符问题）
+            normalized_path = os.path.normpath(folder.path).lower()
+            if normalized_path not in folder_dict:
+                folder_dict[normalized_path] = folder
+            else:
+                # 如果路径已存在，保留访问时间更新的那个
+                if folder.timestamp > folder_dict[normalized_path].timestamp:
+                    folder_dict[normalized_path] = folder
+
+            # 每处理50个文件夹就更新一次进度
+            if progress_callback and ((i + 1) % 50 == 0 or i == total_found - 1):
+                progress = min(100, int((i + 1) / total_found * 100))
+                progress_callback(progress, len(folder_dict))
+
+        return list(folder_dict.values())
+
+    def load_folders(self, progress_callback=None, recent_path=None):
+        """扫描并去重，返回新的文件夹列表（不修改当前数据，set_folders 时按优先级排序）"""
+        recent_folders = self.scan_recent_folders(recent_path)
+        return self.dedupe_folders(recent_folders, progress_callback)
+
+    def set_folders(self, folders_data):
+        """替换当前的文件夹列表并按优先级排序"""
+        self.frecency = FrecencyRanker(folders_data, self.open_history)
+        self.folders_data = self.frecency.rank()
+        self.update_folder_positions()
+        self.invalidate_search_index()
+
+    def update_folder_positions(self):
+        """记录每个路径在优先级顺序中的位置"""
+        self.folder_positions = {folder.path: i for i, folder in enumerate(self.folders_data)}
+        self.order_version += 1
+
+    def rebuild_search_index(self):
+        """根据当前文件夹列表和注释重建搜索索引"""
+        comments = self.folder_comments
+        self.search_index.rebuild(
+            (folder.path, comments.get(folder.path, "")) for folder in self.folders_data
+        )
+
+    def invalidate_search_index(self):
+        """标记搜索索引需要重建：2万个文件夹重建要几百毫秒，不搜索（例如命令行只列出文件夹）时不重建"""
+        self.search_index_stale = True
+
+    def ensure_search_index(self):
+        """需要时重建搜索索引（不建立倒排表），在第一次搜索前调用
+
+        重建期间持有索引的锁，同时到来的搜索会等重建完成。先清除标记再读取文件夹列表和注释，
+        重建期间的变化要么已经读到，要么会再次标记或增量更新。
+        """
+        with self.search_index.lock:
+            if self.search_index_stale:
+                self.search_index_stale = False
+                self.rebuild_search_index()
+
+    def prepare_search_index(self):
+        """重建搜索索引并建立倒排表，界面在后台线程中调用，之后输入时每次按键都很快"""
+        self.ensure_search_index()
+        self.search_index.build_postings()
+
+    def _reindex_comment(self, path):
+        """注释变化后更新该文件夹的搜索索引（索引等待重建时不需要）"""
+        if not self.search_index_stale:
+            self.search_index.update(path, self.folder_comments.get(path, ""))
+
+    def get_folder(self, path):
+        """根据路径查找文件夹记录"""
+        position = self.folder_positions.get(path)
+        if position is None:
+            return None
+        return self.folders_data[position]
+
+    # ------------------------------------------------------------------
+    # 打开历史和排序
+    # ------------------------------------------------------------------
+
+    def record_folder_open(self, folder_path):
+        """记录文件夹打开历史"""
+        current_time = time.time()
+
+        entry = self.open_history.get(folder_path)
+        if entry is not None:
+            # 先记录打开事件（用于按时间衰减的打开次数）：旧版记录没有打开事件时，
+            # 按更新前的次数和时间补出以前的事件，这次打开不会被算两次
+            append_open_event(entry, current_time)
+            # 增加打开次数
+            entry['count'] += 1
+            entry['last_opened'] = current_time
+        else:
+            # 首次打开
+            entry = self.open_history[folder_path] = {
+                'count': 1,
+                'first_opened': current_time,
+                'last_opened': current_time,
+                'opens': [current_time]
+            }
+        self.frecency.record_open(folder_path, current_time)
+
+        # 添加到已打开集合
+        self.opened_folders.add(folder_path)
+
+        # 只写入这个文件夹的打开记录
+        self.store.record_open(folder_path, entry, current_time)
+        self.history_changed()
+
+    def move_folder_to_top(self, path):
+        """更新文件夹的访问时间并重新排序"""
+        folder = self.get_folder(path)
+        if folder is not None:
+            folder.timestamp = time.time()
+            self.frecency.touch(path, folder.timestamp)
+
+        # 重新排序：使用与初始排序相同的优先级算法
+        self.refresh_order()
+
+    def refresh_order(self):
+        """按 frecency 重新排序；没有新的打开事件且时间分档没变时排名来自缓存，不做任何事"""
+        ranked = self.frecency.rank()
+        if ranked is not self.folders_data:
+            self.folders_data = ranked
+            self.update_folder_positions()
+
+    # ------------------------------------------------------------------
+    # 注释
+    # ------------------------------------------------------------------
+
+    def get_comment(self, path):
+        """获取文件夹注释"""
+        return self.folder_comments.get(path, "")
+
+    def set_comment(self, path, comment):
+        """设置文件夹注释，注释为空时删除"""
+        if comment:
+            self.folder_comments[path] = comment
+        elif path in self.folder_comments:
+            del self.folder_comments[path]
+        self._reindex_comment(path)
+        self.store.set_comment(path, comment)
+        self.history_changed()
+
+    def delete_comment(self, path):
+        """删除文件夹注释"""
+        if path in self.folder_comments:
+            del self.folder_comments[path]
+            self._reindex_comment(path)
+            self.store.set_comment(path, "")
+            self.history_changed()
+
+    # ------------------------------------------------------------------
+    # 过滤
+    # ------------------------------------------------------------------
+
+    def matches_category(self, folder, category, now=None, text_matches=None):
+        """检查文件夹是否属于快捷分类
+
+        now 为时间戳；text_matches 是搜索索引中路径或注释包含分类名的路径集合，批量过滤时传入以免逐个转换大小写。
+        """
+        path = folder.path
+        category_lower = category.lower()
+
+        # 检查智能标签
+        if path in self.folder_smart_tags:
+            tags = [tag.lower() for tag in self.folder_smart_tags[path]]
+            if category_lower in tags:
+                return True
+
+        if text_matches is not None:
+            # 路径或注释包含分类关键词
+            if path in text_matches:
+                return True
+        else:
+            # 检查注释内容
+            if category_lower in self.folder_comments.get(path, "").lower():
+                return True
+
+            # 检查路径是否包含分类关键词
+            if category_lower in path.lower():
+                return True
+
+        # 特殊处理一些分类
+        if category == "手动备注":
+            # 检查是否有手动注释（不以"["开头的注释）
+            comment = self.folder_comments.get(path, "").strip()
+            return bool(comment) and not is_auto_comment(comment)
+        elif category == "常用":
+            return path in self.open_history and self.open_history[path]['count'] >= FREQUENT_OPEN_COUNT
+        elif category == "经常":
+            return path in self.open_history and self.open_history[path]['count'] >= OFTEN_OPEN_COUNT
+        elif category == "今日":
+            now = now or time.time()
+            return 0 <= now - folder.timestamp < 86400
+
+        return False
+
+    def clear_search_cache(self):
+        """清空搜索结果缓存和搜索索引的查询缓存"""
+        self._search_results.clear()
+        self.search_index.clear_cache()
+
+    def search_folders(self, search_text):
+        """返回匹配搜索文本并排好序的文件夹（FolderView，结果会被缓存）
+
+        子串匹配时保持优先级顺序；模糊匹配时先按分数档，同一档内按优先级位置。
+        数据和顺序都没变时，退格回到最近的搜索文本直接返回缓存的结果。
+        """
+        fuzzy = bool(self.settings.get('fuzzy_search')) and len(search_text) >= FUZZY_MIN_LENGTH
+        self.ensure_search_index()
+        # 智能标签线程可能同时更新注释，版本号和查询结果在同一次加锁中读取，保证缓存键与结果一致
+        with self.search_index.lock:
+            key = (search_text, fuzzy, self.search_index.version, self.order_version)
+            cache = self._search_results
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                return result
+            if fuzzy:
+                scores = self.search_index.fuzzy_search(search_text)
+            else:
+                matches = self.search_index.search(search_text)
+
+        # 只对匹配的文件夹排序，结果只保存它们在 folders_data 中的下标
+        positions = self.folder_positions
+        if fuzzy:
+            # 排序键 = 位置 - 分数档 * bucket_size；位置小于 bucket_size，所以排好序的键对 bucket_size
+            # 取余就是位置。整数列表用 map 在C层面计算后排序，不需要每个路径调用一次 key 函数
+            bucket_size = len(self.folders_data) + 1
+            buckets = map(floordiv, scores.values(), repeat(SCORE_BUCKET))
+            order_keys = sorted(map(sub, map(positions.__getitem__, scores), map(mul, buckets, repeat(bucket_size))))
+            indexes = array('I', map(mod, order_keys, repeat(bucket_size)))
+        else:
+            indexes = array('I', sorted(map(positions.__getitem__, matches)))
+        result = FolderView(self.folders_data, indexes)
+
+        cache[key] = result
+        if len(cache) > SEARCH_RESULT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+
+    def filter_folders(self, search_text="", category=""):
+        """按分类和搜索文本过滤
+
+        没有搜索文本时保持优先级顺序；模糊搜索时按匹配分数排序，同一分数档内保持优先级顺序。
+        没有过滤条件时直接返回 folders_data，否则返回 FolderView（下标数组），都不复制文件夹列表，
+        调用方不要修改。重新排序时 folders_data 会被替换成新的列表，已经返回的结果不受影响。
+        """
+        # 时间分档变化后分数会变，排名缓存命中时这里几乎没有开销
+        self.refresh_order()
+        if not category and not search_text:
+            return self.folders_data
+
+        if search_text:
+            result = self.search_folders(search_text)
+            if not category:
+                return result
+            indexes = result.indexes
+        else:
+            indexes = range(len(self.folders_data))
+
+        folders = self.folders_data
+        now = time.time()
+        self.ensure_search_index()
+        category_matches = self.search_index.search(category)
+        return FolderView(folders, array('I', [
+            i for i in indexes
+            if self.matches_category(folders[i], category, now, category_matches)
+        ]))
+
+    # ------------------------------------------------------------------
+    # 智能标签
+    # ------------------------------------------------------------------
+
+    def apply_smart_tags(self, path, category, tags):
+        """记录智能标签和分类，并生成自动注释（批量调用，由调用方最后调用一次 history_changed）"""
+        self.folder_smart_tags[path] = tags
+        self.folder_comments[path] = format_auto_comment(category, tags)
+        self.folder_categories[path] = category
+        self._reindex_comment(path)
+        self.store.set_comment(path, self.folder_comments[path])
+        self.store.set_smart_tags(path, category, tags)
+
+    def folders_needing_tags(self):
+        """返回还没有任何注释的文件夹（增量生成）"""
+        return [
+            folder for folder in self.folders_data
+            if not self.folder_comments.get(folder.path, "").strip()
+        ]
+
+    def start_smart_tags_job(self, progress_callback=None, done_callback=None):
+        """在后台线程中为没有注释的文件夹生成智能标签，返回 TagJob
+
+        同一时间只运行一个任务：已有任务时先取消它，新任务等它结束后才开始。
+        progress_callback(已完成, 总数) 和 done_callback(处理的数量) 在后台线程中调用，
+        任务被取消时不调用 done_callback。
+        """
+        with self._tag_job_lock:
+            previous = self.tag_job
+            if previous is not None:
+                previous.cancel()
+            job = TagJob(self.settings['tag_workers'], progress_callback)
+            self.tag_job = job
+        threading.Thread(
+            target=self._run_smart_tags_job, args=(job, previous, done_callback),
+            name="smart-tags", daemon=True
+        ).start()
+        return job
+
+    def cancel_smart_tags_job(self):
+        """取消正在运行的智能标签生成任务（已生成的标签不会再保存）"""
+        with self._tag_job_lock:
+            if self.tag_job is not None:
+                self.tag_job.cancel()
+
+    def _run_smart_tags_job(self, job, previous, done_callback):
+        try:
+            if previous is not None:
+                previous.wait()
+            if job.is_cancelled():
+                return
+            processed_count = self.generate_smart_tags(job)
+            if done_callback and not job.is_cancelled():
+                done_callback(processed_count)
+        except Exception as e:
+            print(f"生成智能标签时出错: {e}")
+        finally:
+            job.finished.set()
+
+    def generate_smart_tags(self, job=None):
+        """为所有没有注释的文件夹生成智能标签，返回处理的文件夹数量
+
+        job 为None时创建一个新的 TagJob 在当前线程中运行；job 被取消时不保存任何标签。
+        """
+        job = job or TagJob(self.settings['tag_workers'])
+        folders_need_tags = self.folders_needing_tags()
+        if not folders_need_tags:
+            print("所有文件夹都已有标签，无需生成新标签")
+            return 0
+
+        print(f"开始为 {len(folders_need_tags)} 个文件夹生成智能标签...")
+        tag_cache = self.load_tag_cache()
+        tag_cache.prune(self.folder_positions)
+        tag_cache.reset_stats()
+        open_history = self.open_history
+
+        def tag_folder(folder):
+            category, tags = generate_folder_tags(folder.path, folder.access_time, open_history,
+                                                  tag_cache=tag_cache)
+            return folder.path, category, tags
+
+        # 先并行生成所有标签（需要读取文件夹内容，比较慢），再在一个事务中保存，避免长时间占用数据库
+        results = job.run(folders_need_tags, tag_folder)
+        tag_cache.save()
+        print(f"标签缓存命中 {tag_cache.hits} 个，重新读取 {tag_cache.misses} 个文件夹")
+
+        processed_count = 0
+        with self.store.transaction():
+            # 在事务（锁）中检查，取消之后开始的清空注释等操作不会和这里交错
+            if job.is_cancelled():
+                print(f"智能标签生成已取消（已分析 {job.completed}/{job.total} 个文件夹）")
+                return 0
+            for path, category, tags in results:
+                # 只为没有任何注释的文件夹生成标签（生成期间可能已经手动添加了注释）
+                if self.folder_comments.get(path, "").strip():
+                    continue
+                if tags:
+                    self.apply_smart_tags(path, category, tags)
+                else:
+                    self.folder_categories[path] = category
+                    self.store.set_smart_tags(path, category, [])
+                processed_count += 1
+        if processed_count:
+            self.history_changed()
+
+        print(f"智能标签生成完成，处理了 {processed_count} 个文件夹")
+        return processed_count
+
+    def regenerate_smart_tag(self, path):
+        """重新生成单个文件夹的智能标签，返回生成的注释；找不到文件夹时返回None"""
+        folder = self.get_folder(path)
+        if folder is None:
+            return None
+
+        tag_cache = self.load_tag_cache()
+        category, tags = generate_folder_tags(path, folder.access_time, self.open_history, tag_cache=tag_cache)
+        tag_cache.save()
+        with self.store.transaction():
+            if tags:
+                self.apply_smart_tags(path, category, tags)
+            else:
+                # 如果没有标签，生成一个默认的
+                self.folder_comments[path] = format_auto_comment(category, ["普通"])
+                self.folder_categories[path] = category
+                self._reindex_comment(path)
+                self.store.set_comment(path, self.folder_comments[path])
+                self.store.set_smart_tags(path, category, [])
+            self.history_changed()
+
+            return self.folder_comments[path]
+
+    def load_tag_cache(self):
+        """返回标签缓存，第一次使用时从磁盘加载"""
+        if not self.tag_cache.loaded:
+            self.tag_cache.load(CLASSIFIER_VERSION)
+        return self.tag_cache
+
+    def generate_path_comment(self, path):
+        """只根据路径关键词和打开次数生成并保存自动注释（不读取文件夹内容），返回生成的注释"""
+        category, tags = generate_path_tags(path, self.open_history)
+        comment = format_auto_comment(category, tags or ["普通"])
+        self.set_comment(path, comment)
+        return comment
+
+    def clear_smart_tag(self, path):
+        """删除单个文件夹的自动注释、智能标签和分类（保留手动注释）"""
+        self._clear_smart_tag(path)
+        self.history_changed()
+
+    def _clear_smart_tag(self, path):
+        if is_auto_comment(self.folder_comments.get(path, "")):
+            del self.folder_comments[path]
+            self._reindex_comment(path)
+            self.store.set_comment(path, "")
+        self.folder_smart_tags.pop(path, None)
+        self.folder_categories.pop(path, None)
+        self.store.set_smart_tags(path, None, None)
+
+    def clear_auto_smart_tags(self):
+        """删除所有自动生成的注释及对应的标签和分类，返回删除的数量"""
+        with self.store.transaction():
+            auto_paths = [
+                path for path, comment in self.folder_comments.items()
+                if is_auto_comment(comment)
+            ]
+            for path in auto_paths:
+                self._clear_smart_tag(path)
+        self.history_changed()
+        return len(auto_paths)
+
+    def clear_all_comments(self):
+        """清空所有注释、标签和分类（包括手动注释）"""
+        with self.store.transaction():
+            self.folder_comments.clear()
+            self.folder_smart_tags.clear()
+            self.folder_categories.clear()
+            self.store.clear_comments()
+            self.invalidate_search_index()
+        self.history_changed()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+虚拟化的文件夹列表
+Treeview 中只保留可见窗口那么多行，滚动条的位置映射到 rows（过滤后的文件夹列表）中的下标，
+所以显示10万个文件夹和显示50个的开销相同。
+
+可见的行按路径对应 Treeview 的项目。刷新时比较新旧两个窗口：还在窗口中的项目原地保留，
+位置变了才 move，离开窗口的项目 detach 后留给新进入窗口的路径复用，只有注释变化时只改注释列。
+例如把一个文件夹移到最前面只需要移动它自己、detach 掉被挤出窗口的最后一行。
+"""
+
+# 测不出行高时使用的可见行数（与 Treeview 的 height 一致）
+DEFAULT_VISIBLE_ROWS = 15
+
+# 鼠标滚轮每格滚动的行数
+WHEEL_ROWS = 3
+
+
+class VirtualFolderList:
+    """在 Treeview 上显示 rows 中从 offset 开始的一个窗口
+
+    row_content(folder) 返回一行的 (values, tags)，values 为 (路径, 注释)。选中的文件夹按路径记录，
+    滚出可见窗口后仍然保持选中；选中的路径变化时在 Treeview 上产生 <<FolderSelect>> 事件。
+    """
+
+    def __init__(self, tree, scrollbar, row_content):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_content = row_content
+        self.rows = []
+        self.offset = 0
+        self.visible_rows = DEFAULT_VISIBLE_ROWS
+        self.selected_path = None
+        # {path: rows中的下标}，调用方没有提供时按需建立，rows 替换后失效
+        self._positions = None
+        # 可见窗口中的项目：按显示顺序排列的项目、{path: item}、{item: path}
+        self.shown_items = []
+        self.path_items = {}
+        self.item_paths = {}
+        # 每个项目当前显示的 (values, tags)，内容没变时不调用Tk
+        self.item_contents = {}
+        # 已 detach、可以复用的项目
+        self.free_items = []
+        # 加载中、出错等提示信息占用的行
+        self.message_item = None
+
+        scrollbar.configure(command=self.yview)
+        tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        tree.bind('<Configure>', self.on_configure)
+        tree.bind('<MouseWheel>', self.on_mouse_wheel)
+        tree.bind('<Button-4>', lambda e: self.scroll_by(-WHEEL_ROWS))
+        tree.bind('<Button-5>', lambda e: self.scroll_by(WHEEL_ROWS))
+        tree.bind('<Up>', lambda e: self.move_selection(-1))
+        tree.bind('<Down>', lambda e: self.move_selection(1))
+        tree.bind('<Prior>', lambda e: self.move_selection(-self.visible_rows))
+        tree.bind('<Next>', lambda e: self.move_selection(self.visible_rows))
+        tree.bind('<Home>', lambda e: self.select_index(0))
+        tree.bind('<End>', lambda e: self.select_index(len(self.rows) - 1))
+
+    # ------------------------------------------------------------------
+    # 数据
+    # ------------------------------------------------------------------
+
+    def set_rows(self, rows, positions=None, keep_position=False):
+        """替换显示的文件夹列表
+
+        positions 为 {path: 下标}，调用方已经有时传入可以省去建立。keep_position 为False时回到顶部，
+        为True时（注释变化等刷新）保持滚动位置。选中的文件夹仍在新列表中时保持选中并滚动到可见，
+        否则取消选中。
+        """
+        self.rows = rows
+        self._positions = positions
+        if keep_position:
+            self.offset = max(0, min(self.offset, len(rows) - self.visible_rows))
+        else:
+            self.offset = 0
+        if self.selected_path is not None:
+            index = self.index_of(self.selected_path)
+            if index is None:
+                self._set_selected(None)
+            else:
+                self.see(index)
+        self.render()
+
+    def refresh(self):
+        """文件夹的注释或状态变化后重新显示可见窗口"""
+        self.render()
+
+    def index_of(self, path):
+        """返回 path 在 rows 中的下标，不在列表中时返回None"""
+        if self._positions is None:
+            self._positions = {folder.path: i for i, folder in enumerate(self.rows)}
+        return self._positions.get(path)
+
+    def show_message(self, text, tag):
+        """清空列表，只显示一行提示信息"""
+        self.rows = []
+        self._positions = None
+        self.offset = 0
+        self._set_selected(None)
+        self.render()
+        if self.message_item is None:
+            self.message_item = self.tree.insert('', 0, values=(text,), tags=(tag,))
+        else:
+            self.tree.item(self.message_item, values=(text,), tags=(tag,))
+
+    # ------------------------------------------------------------------
+    # 选中
+    # ------------------------------------------------------------------
+
+    def selected_folder(self):
+        """返回选中的文件夹，没有选中时返回None"""
+        index = self.selected_index()
+        return None if index is None else self.rows[index]
+
+    def selected_index(self):
+        if self.selected_path is None:
+            return None
+        return self.index_of(self.selected_path)
+
+    def select_index(self, index):
+        """选中 rows 中的第 index 个文件夹并滚动到可见"""
+        if not self.rows:
+            return 'break'
+        index = max(0, min(index, len(self.rows) - 1))
+        self._set_selected(self.rows[index].path)
+        self.see(index)
+        self.render()
+        return 'break'
+
+    def select_path(self, path):
+        """按路径选中文件夹并滚动到可见，路径不在列表中时返回False"""
+        index = self.index_of(path)
+        if index is None:
+            return False
+        self.select_index(index)
+        return True
+
+    def move_selection(self, delta):
+        """方向键和翻页键：从当前选中的文件夹移动 delta 行，没有选中时从可见窗口第一行开始"""
+        index = self.selected_index()
+        if index is None:
+            return self.select_index(self.offset)
+        return self.select_index(index + delta)
+
+    def on_tree_select(self, event):
+        """鼠标点击等 Treeview 自身的选择变化"""
+        selection = self.tree.selection()
+        # 选中行滚出窗口时 Treeview 中没有选中项，这时保持原来的选中
+        if not selection:
+            return
+        path = self.item_paths.get(selection[0])
+        if path is not None:
+            self._set_selected(path)
+
+    def _set_selected(self, path):
+        if path != self.selected_path:
+            self.selected_path = path
+            self.tree.event_generate('<<FolderSelect>>')
+
+    # ------------------------------------------------------------------
+    # 滚动
+    # ------------------------------------------------------------------
+
+    def see(self, index):
+        """调整 offset 使第 index 行可见"""
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.rows) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def on_mouse_wheel(self, event):
+        # Windows 上每格滚轮的 delta 是120
+        return self.scroll_by(-int(event.delta / 120) * WHEEL_ROWS)
+
+    def yview(self, *args):
+        """滚动条的回调：('moveto', 比例) 或 ('scroll', 数量, 'units'/'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_by(int(args[1]) * step)
+
+    def on_configure(self, event):
+        """窗口大小变化后重新计算可见行数（等布局完成后再测量）"""
+        self.tree.after_idle(self.update_visible_rows)
+
+    def update_visible_rows(self):
+        """按第一行的位置和行高计算能完整显示的行数"""
+        if not self.shown_items:
+            return
+        bbox = self.tree.bbox(self.shown_items[0])
+        if not bbox:
+            return
+        _, top, _, row_height = bbox
+        visible_rows = max(1, (self.tree.winfo_height() - top) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.offset = max(0, min(self.offset, len(self.rows) - visible_rows))
+            self.render()
+
+    # ------------------------------------------------------------------
+    # 显示
+    # ------------------------------------------------------------------
+
+    def render(self):
+        """按路径比较新旧可见窗口，只对进入、离开、移动和内容变化的行调用Tk"""
+        tree = self.tree
+        if self.message_item is not None and self.rows:
+            tree.delete(self.message_item)
+            self.message_item = None
+
+        window = self.rows[self.offset:self.offset + self.visible_rows]
+        window_paths = {folder.path for folder in window}
+
+        # 离开窗口的项目 detach 后留给新进入窗口的路径复用
+        leaving = [item for item in self.shown_items if self.item_paths[item] not in window_paths]
+        if leaving:
+            tree.detach(*leaving)
+            for item in leaving:
+                del self.path_items[self.item_paths.pop(item)]
+            self.free_items.extend(leaving)
+            shown = [item for item in self.shown_items if item in self.item_paths]
+        else:
+            shown = self.shown_items
+
+        path_items = self.path_items
+        item_contents = self.item_contents
+        for index, folder in enumerate(window):
+            path = folder.path
+            item = path_items.get(path)
+            if item is None:
+                item = self.free_items.pop() if self.free_items else tree.insert('', 'end')
+                path_items[path] = item
+                self.item_paths[item] = path
+            self._update_item(item, self.row_content(folder), item_contents.get(item))
+            if index >= len(shown) or shown[index] != item:
+                if item in shown:
+                    shown.remove(item)
+                shown.insert(index, item)
+                tree.move(item, '', index)
+        self.shown_items = shown
+
+        # 可见行都能完整显示，Treeview 自己不应该滚动
+        tree.yview_moveto(0)
+        self._sync_selection()
+        self._update_scrollbar()
+
+    def _update_item(self, item, content, old_content):
+        """内容变化时更新项目；路径和颜色都没变时只改注释列"""
+        if content == old_content:
+            return
+        values, tags = content
+        if old_content is not None and old_content[0][0] == values[0] and old_content[1] == tags:
+            self.tree.set(item, 'comment', values[1])
+        else:
+            self.tree.item(item, values=values, tags=tags)
+        self.item_contents[item] = content
+
+    def refresh_path(self, path):
+        """只更新一个文件夹的行（例如注释变化），不在可见窗口中时什么都不做"""
+        item = self.path_items.get(path)
+        index = self.index_of(path)
+        if item is not None and index is not None:
+            self._update_item(item, self.row_content(self.rows[index]), self.item_contents.get(item))
+
+    def _sync_selection(self):
+        """让 Treeview 的选中项对应 selected_path：选中行在窗口中时选中它，否则不选中任何行"""
+        item = self.path_items.get(self.selected_path)
+        selection = self.tree.selection()
+        if item is not None:
+            if selection != (item,):
+                self.tree.selection_set(item)
+                self.tree.focus(item)
+        elif selection:
+            self.tree.selection_remove(selection)
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, min(1, (self.offset + self.visible_rows) / total))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+文件夹记录和过滤结果
+每个最近访问的文件夹是一个 __slots__ 对象：intern 后的路径、浮点数访问时间戳和状态标志位，
+比每个文件夹一个 dict 加一个 datetime 对象省一半以上内存，排序时直接比较浮点数。
+过滤结果是文件夹列表加一个下标数组（FolderView），不复制文件夹列表。
+"""
+
+import sys
+from datetime import datetime
+
+# 状态标志位：都没有设置表示文件夹不存在
+FLAG_EXISTS = 1
+FLAG_UNKNOWN = 2  # 检查超时或所在卷无响应，状态未知
+
+
+class FolderRecord:
+    """一个最近访问的文件夹"""
+
+    __slots__ = ('path', 'timestamp', 'flags')
+
+    def __init__(self, path, timestamp, exists=True):
+        self.path = sys.intern(path)
+        self.timestamp = timestamp
+        self.flags = 0
+        self.exists = exists
+
+    @property
+    def exists(self):
+        """True 表示存在，False 表示不存在，None 表示状态未知"""
+        if self.flags & FLAG_UNKNOWN:
+            return None
+        return bool(self.flags & FLAG_EXISTS)
+
+    @exists.setter
+    def exists(self, value):
+        self.flags &= ~(FLAG_EXISTS | FLAG_UNKNOWN)
+        if value is None:
+            self.flags |= FLAG_UNKNOWN
+        elif value:
+            self.flags |= FLAG_EXISTS
+
+    @property
+    def access_time(self):
+        """访问时间（datetime），只在显示和生成标签时使用"""
+        return datetime.fromtimestamp(self.timestamp)
+
+    def __repr__(self):
+        return f"FolderRecord({self.path!r}, {self.timestamp!r}, exists={self.exists!r})"
+
+
+class FolderView:
+    """folders 中按 indexes（下标数组）选出的文件夹，只读
+
+    支持 len、下标、切片（返回列表）和迭代，可以像列表一样使用。
+    folders 在排序后会被替换成新的列表而不是原地修改，所以旧的视图始终有效。
+    """
+
+    __slots__ = ('folders', 'indexes')
+
+    def __init__(self, folders, indexes):
+        self.folders = folders
+        self.indexes = indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return list(map(self.folders.__getitem__, self.indexes[item]))
+        return self.folders[self.indexes[item]]
+
+    def __iter__(self):
+        return map(self.folders.__getitem__, self.indexes)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+文件夹的 frecency（频率+新近度）排序
+每次打开文件夹记一次打开事件，打开次数按半衰期指数衰减后累加，再加上快捷方式修改时间
+（最近访问时间）的新近度分数：
+
+    分数 = OPEN_SCORE * Σ 0.5^(距每次打开的时间 / 打开半衰期)
+         + RECENT_SCORE * 0.5^(距最近访问的时间 / 访问半衰期)
+
+所有文件夹的分数在一次向量化计算中得到（安装了 numpy 且文件夹较多时使用 numpy，
+否则使用纯Python），排名结果缓存到下一次打开事件或时间分档变化为止。
+
+衰减的打开次数以 reference_time 为基准保存：所有文件夹的打开部分随时间按同一个系数衰减，
+所以新的时间点只需要整体乘一个系数，新的打开事件只需要给一个文件夹加上它的权重。
+"""
+
+import time
+
+# 打开次数和最近访问时间的半衰期（秒）
+OPEN_HALF_LIFE = 14 * 86400
+RECENT_HALF_LIFE = 3 * 86400
+
+# 刚打开一次和刚访问过各得的分数
+OPEN_SCORE = 100.0
+RECENT_SCORE = 100.0
+
+# 排名缓存的时间分档（秒）：同一档内且没有新的打开事件时直接返回上次的排名
+RANK_BUCKET_SECONDS = 300
+
+# 每个文件夹保存的打开事件数量上限（更早的事件衰减后已经可以忽略）
+MAX_OPEN_EVENTS = 100
+
+# 文件夹数量达到这个值时才尝试使用 numpy：导入 numpy 本身需要几十毫秒，
+# 而纯Python计算1万个文件夹的排名只需要几毫秒
+NUMPY_MIN_FOLDERS = 10000
+
+
+def load_numpy():
+    """numpy 是可选依赖，没有安装时返回None"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+def open_timestamps(entry):
+    """返回一条打开历史中的打开时间列表
+
+    旧版本的记录只有次数、首次和最后打开时间，按次数在两者之间均匀分布（最多 MAX_OPEN_EVENTS 个）。
+    """
+    opens = entry.get('opens')
+    if opens:
+        return opens
+    last = entry['last_opened']
+    count = min(entry.get('count', 1), MAX_OPEN_EVENTS)
+    if count <= 1:
+        return [last]
+    first = entry.get('first_opened', last)
+    step = (last - first) / (count - 1)
+    return [first + step * k for k in range(count)]
+
+
+def append_open_event(entry, when):
+    """在打开历史中记录一次打开事件，只保留最近的 MAX_OPEN_EVENTS 个"""
+    opens = entry.get('opens')
+    if opens is None:
+        opens = entry['opens'] = list(open_timestamps(entry)) if 'last_opened' in entry else []
+    opens.append(when)
+    if len(opens) > MAX_OPEN_EVENTS:
+        del opens[:-MAX_OPEN_EVENTS]
+
+
+class FrecencyRanker:
+    """对一组文件夹按 frecency 排名
+
+    folders 为 FolderRecord 列表，open_history 为
+    {path: {'count', 'first_opened', 'last_opened', 'opens'}}。
+    """
+
+    def __init__(self, folders, open_history, now=None):
+        now = time.time() if now is None else now
+        # 按访问时间倒序保存，分数相同（例如很久以前的文件夹新近度衰减到0）时保持这个顺序
+        self.folders = sorted(folders, key=lambda folder: folder.timestamp, reverse=True)
+        self.positions = {folder.path: i for i, folder in enumerate(self.folders)}
+        self.reference_time = now
+
+        mtimes = [folder.timestamp for folder in self.folders]
+        open_mass = [0.0] * len(self.folders)
+        for path, entry in open_history.items():
+            position = self.positions.get(path)
+            if position is not None:
+                open_mass[position] = sum(
+                    2.0 ** ((t - now) / OPEN_HALF_LIFE) for t in open_timestamps(entry)
+                )
+
+        self.numpy = load_numpy() if len(self.folders) >= NUMPY_MIN_FOLDERS else None
+        if self.numpy is not None:
+            mtimes = self.numpy.array(mtimes, dtype=float)
+            open_mass = self.numpy.array(open_mass, dtype=float)
+            # 用对象数组按排名取出文件夹，比逐个下标构造列表快
+            self.folder_array = self.numpy.empty(len(self.folders), dtype=object)
+            self.folder_array[:] = self.folders
+        self.mtimes = mtimes
+        self.open_mass = open_mass  # 以 reference_time 为基准的衰减打开次数
+
+        # 打开事件或访问时间变化时加一，和时间分档一起作为排名缓存的键
+        self.version = 0
+        self._rank_key = None
+        self._ranked = None
+
+    def record_open(self, path, when=None):
+        """记录一次打开事件"""
+        position = self.positions.get(path)
+        if position is None:
+            return
+        when = time.time() if when is None else when
+        self.open_mass[position] += 2.0 ** ((when - self.reference_time) / OPEN_HALF_LIFE)
+        self.version += 1
+
+    def touch(self, path, when=None):
+        """更新文件夹的最近访问时间"""
+        position = self.positions.get(path)
+        if position is None:
+            return
+        self.mtimes[position] = time.time() if when is None else when
+        self.version += 1
+
+    def _rebase(self, now):
+        """把衰减的打开次数换算到新的基准时间，避免长时间运行后指数溢出"""
+        factor = 2.0 ** ((self.reference_time - now) / OPEN_HALF_LIFE)
+        if self.numpy is not None:
+            self.open_mass *= factor
+        else:
+            self.open_mass = [mass * factor for mass in self.open_mass]
+        self.reference_time = now
+
+    def scores(self, now=None):
+        """返回所有文件夹（按 self.folders 的顺序）在 now 时刻的分数"""
+        now = time.time() if now is None else now
+        self._rebase(now)
+        if self.numpy is not None:
+            np = self.numpy
+            return OPEN_SCORE * self.open_mass + RECENT_SCORE * np.exp2((self.mtimes - now) / RECENT_HALF_LIFE)
+        return [
+            OPEN_SCORE * mass + RECENT_SCORE * 2.0 ** ((mtime - now) / RECENT_HALF_LIFE)
+            for mass, mtime in zip(self.open_mass, self.mtimes)
+        ]
+
+    def rank(self, now=None):
+        """返回按分数从高到低排列的文件夹列表；同一时间分档内没有变化时返回同一个列表对象"""
+        now = time.time() if now is None else now
+        key = (int(now // RANK_BUCKET_SECONDS), self.version)
+        if key == self._rank_key:
+            return self._ranked
+
+        scores = self.scores(now)
+        folders = self.folders
+        if self.numpy is not None:
+            order = self.numpy.argsort(-scores, kind='stable')
+            self._ranked = self.folder_array[order].tolist()
+        else:
+            # reverse=True 的排序同样是稳定的，分数相同时保持访问时间倒序
+            order = sorted(range(len(folders)), key=scores.__getitem__, reverse=True)
+            self._ranked = [folders[i] for i in order]
+        self._rank_key = key
+        return self._ranked
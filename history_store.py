@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+打开历史、注释和智能标签的SQLite存储
+使用WAL模式，每次打开文件夹、修改注释只写入相关的几行，不再重写整个 config.json。
+第一次使用时从旧版 config.json 中的 open_history 和 folder_comments 迁移；
+export_json 可以把数据导出回旧版 config.json 的格式。
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from frecency import MAX_OPEN_EVENTS, open_timestamps
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS folder_opens (
+    path TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    first_opened REAL NOT NULL,
+    last_opened REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS open_events (
+    path TEXT NOT NULL,
+    opened_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS open_events_path ON open_events (path, opened_at);
+CREATE TABLE IF NOT EXISTS comments (
+    path TEXT PRIMARY KEY,
+    comment TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS smart_tags (
+    path TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+"""
+
+# meta 表中记录已从 config.json 迁移的键
+MIGRATED_KEY = 'migrated_from_json'
+
+
+class HistoryStore:
+    """打开历史、注释和智能标签的持久化
+
+    智能标签在后台线程中生成，所以连接允许跨线程使用，所有操作用一把锁串行化。
+    数据库无法打开时 conn 为None，所有写操作直接跳过（数据只保留在内存中）。
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.conn = None
+        self.lock = threading.RLock()
+        # transaction() 嵌套的层数，最外层结束时才提交
+        self._depth = 0
+
+    def open(self):
+        """打开数据库并建表"""
+        try:
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # WAL模式下 NORMAL 不会损坏数据库，只是断电时可能丢失最后一次提交
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+        except Exception as e:
+            print(f"打开历史数据库失败: {e}")
+            self.conn = None
+        return self.conn is not None
+
+    def close(self):
+        """关闭数据库"""
+        with self.lock:
+            if self.conn is not None:
+                try:
+                    self.conn.close()
+                except Exception as e:
+                    print(f"关闭历史数据库失败: {e}")
+                self.conn = None
+
+    @contextmanager
+    def transaction(self):
+        """把多次写入合并到一个事务中提交，可以嵌套"""
+        with self.lock:
+            self._depth += 1
+            try:
+                yield
+            except Exception:
+                self._depth -= 1
+                if self._depth == 0 and self.conn is not None:
+                    self.conn.rollback()
+                raise
+            self._depth -= 1
+            if self._depth == 0 and self.conn is not None:
+                self.conn.commit()
+
+    def _write(self, description, statements):
+        """执行 [(sql, 参数), ...]，出错时只打印错误；在 transaction() 中时由最外层提交"""
+        if self.conn is None:
+            return
+        try:
+            with self.transaction():
+                for sql, params in statements:
+                    self.conn.execute(sql, params)
+        except Exception as e:
+            print(f"{description}失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 迁移、读取和导出
+    # ------------------------------------------------------------------
+
+    def is_migrated(self):
+        """是否已经从 config.json 迁移过；数据库没有打开时返回 False"""
+        if self.conn is None:
+            return False
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (MIGRATED_KEY,)).fetchone()
+        return row is not None
+
+    def migrate_from_json(self, open_history, folder_comments, migrated_at):
+        """把旧版 config.json 中的打开历史和注释导入数据库（只在第一次使用时调用），返回是否已提交
+
+        导入前删除已有的打开记录和注释，以 config.json 为准，打开事件不会重复。
+        """
+        if self.conn is None:
+            return False
+        try:
+            with self.transaction():
+                conn = self.conn
+                for table in ('folder_opens', 'open_events', 'comments'):
+                    conn.execute(f"DELETE FROM {table}")
+                for path, entry in open_history.items():
+                    conn.execute(
+                        "INSERT OR REPLACE INTO folder_opens VALUES (?, ?, ?, ?)",
+                        (path, entry['count'], entry.get('first_opened', entry['last_opened']),
+                         entry['last_opened'])
+                    )
+                    conn.executemany(
+                        "INSERT INTO open_events VALUES (?, ?)",
+                        [(path, t) for t in open_timestamps(entry)[-MAX_OPEN_EVENTS:]]
+                    )
+                conn.executemany("INSERT OR REPLACE INTO comments VALUES (?, ?)", folder_comments.items())
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (MIGRATED_KEY, str(migrated_at)))
+            print(f"已将 {len(open_history)} 条历史记录和 {len(folder_comments)} 条注释迁移到数据库")
+            return True
+        except Exception as e:
+            print(f"迁移配置到数据库失败: {e}")
+            return False
+
+    def load(self):
+        """返回 (open_history, folder_comments, {path: (分类, 标签列表)})"""
+        open_history = {}
+        folder_comments = {}
+        smart_tags = {}
+        if self.conn is None:
+            return open_history, folder_comments, smart_tags
+        with self.lock:
+            conn = self.conn
+            for path, count, first_opened, last_opened in conn.execute("SELECT * FROM folder_opens"):
+                open_history[path] = {
+                    'count': count, 'first_opened': first_opened, 'last_opened': last_opened, 'opens': []
+                }
+            for path, opened_at in conn.execute("SELECT path, opened_at FROM open_events ORDER BY path, opened_at"):
+                entry = open_history.get(path)
+                if entry is not None:
+                    entry['opens'].append(opened_at)
+            folder_comments = dict(conn.execute("SELECT path, comment FROM comments"))
+            for path, category, tags in conn.execute("SELECT * FROM smart_tags"):
+                smart_tags[path] = (category, json.loads(tags))
+        return open_history, folder_comments, smart_tags
+
+    def export_json(self, settings):
+        """按旧版 config.json 的格式导出"""
+        open_history, folder_comments, _ = self.load()
+        return {
+            'open_history': open_history,
+            'folder_comments': folder_comments,
+            'settings': settings
+        }
+
+    # ------------------------------------------------------------------
+    # 单行写入
+    # ------------------------------------------------------------------
+
+    def record_open(self, path, entry, opened_at):
+        """更新一个文件夹的打开次数并记录一次打开事件，只保留最近的 MAX_OPEN_EVENTS 个事件"""
+        self._write("保存打开记录", [
+            ("INSERT INTO folder_opens VALUES (?, ?, ?, ?) "
+             "ON CONFLICT(path) DO UPDATE SET count = excluded.count, last_opened = excluded.last_opened",
+             (path, entry['count'], entry['first_opened'], entry['last_opened'])),
+            ("INSERT INTO open_events VALUES (?, ?)", (path, opened_at)),
+            ("DELETE FROM open_events WHERE path = ? AND opened_at < ("
+             "SELECT opened_at FROM open_events WHERE path = ? ORDER BY opened_at DESC LIMIT 1 OFFSET ?)",
+             (path, path, MAX_OPEN_EVENTS - 1)),
+        ])
+
+    def set_comment(self, path, comment):
+        """保存注释，注释为空时删除"""
+        if comment:
+            statement = ("INSERT INTO comments VALUES (?, ?) "
+                         "ON CONFLICT(path) DO UPDATE SET comment = excluded.comment", (path, comment))
+        else:
+            statement = ("DELETE FROM comments WHERE path = ?", (path,))
+        self._write("保存注释", [statement])
+
+    def set_smart_tags(self, path, category, tags):
+        """保存智能标签和分类，tags 为None时删除"""
+        if tags is None:
+            statement = ("DELETE FROM smart_tags WHERE path = ?", (path,))
+        else:
+            statement = ("INSERT INTO smart_tags VALUES (?, ?, ?) "
+                         "ON CONFLICT(path) DO UPDATE SET category = excluded.category, tags = excluded.tags",
+                         (path, category, json.dumps(tags, ensure_ascii=False)))
+        self._write("保存智能标签", [statement])
+
+    def clear_comments(self):
+        """删除所有注释和智能标签"""
+        self._write("清空注释", [("DELETE FROM comments", ()), ("DELETE FROM smart_tags", ())])
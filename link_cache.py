@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+快捷方式解析结果的持久化缓存
+以 .lnk 文件名为键，记录文件大小和修改时间，只有新增或变化的快捷方式才需要重新解析。
+"""
+
+import json
+import os
+
+from config_writer import atomic_write_json
+
+
+CACHE_VERSION = 1
+
+
+class LinkCache:
+    """保存每个.lnk的解析结果：{name: [size, mtime, target, is_direct]}"""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.source = None
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, source=None):
+        """加载缓存文件，文件损坏、版本不符或来自其他Recent文件夹时从空缓存开始"""
+        self.source = source
+        self.entries = {}
+        self.dirty = False
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION and data.get('source') == source:
+                    self.entries = data.get('links', {})
+        except Exception as e:
+            print(f"加载快捷方式缓存失败: {e}")
+            self.entries = {}
+
+    def lookup(self, name, size, mtime):
+        """返回 (target, is_direct)；未命中或快捷方式已变化时返回None"""
+        entry = self.entries.get(name)
+        if entry is not None and entry[0] == size and entry[1] == mtime:
+            self.hits += 1
+            return entry[2], entry[3]
+        self.misses += 1
+        return None
+
+    def store(self, name, size, mtime, target, is_direct):
+        """记录一个快捷方式的解析结果"""
+        self.entries[name] = [size, mtime, target, is_direct]
+        self.dirty = True
+
+    def prune(self, live_names):
+        """删除已不存在的快捷方式对应的缓存项"""
+        stale = [name for name in self.entries if name not in live_names]
+        for name in stale:
+            del self.entries[name]
+        if stale:
+            self.dirty = True
+        return len(stale)
+
+    def reset_stats(self):
+        """重置命中统计"""
+        self.hits = 0
+        self.misses = 0
+
+    def save(self):
+        """缓存有变化时写回磁盘"""
+        if not self.dirty:
+            return
+        try:
+            data = {'version': CACHE_VERSION, 'source': self.source, 'links': self.entries}
+            atomic_write_json(self.cache_file, data)
+            self.dirty = False
+        except Exception as e:
+            print(f"保存快捷方式缓存失败: {e}")
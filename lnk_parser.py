@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shell Link (.lnk) 二进制解析器
+按照 MS-SHLLINK 格式直接解析快捷方式文件，替代 WScript.Shell 的 COM 调用：
+- 每个文件只读取一次
+- 依次解析 ShellLinkHeader、LinkTargetIDList、LinkInfo、StringData 和 ExtraData
+- 不依赖任何Windows组件，可在Linux上对样例 .lnk 文件进行验证
+
+用法（调试/对比用）：
+    python lnk_parser.py <.lnk文件或目录> [...]
+"""
+
+import codecs
+import ntpath
+import os
+import struct
+import sys
+from collections import namedtuple
+
+
+# ShellLinkHeader 固定为76字节，CLSID 为 00021401-0000-0000-C000-000000000046
+HEADER_SIZE = 0x4C
+LINK_CLSID = b'\x01\x14\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00\x46'
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+FORCE_NO_LINK_INFO = 0x00000100
+
+# FileAttributes
+FILE_ATTRIBUTE_DIRECTORY = 0x00000010
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x00000001
+COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x00000002
+
+# ExtraData 块签名
+ENVIRONMENT_VARIABLE_DATA_BLOCK = 0xA0000001
+
+# IDList 中常见的根文件夹 CLSID（按磁盘上的字节序）
+CLSID_MY_COMPUTER = b'\xe0\x4f\xd0\x20\xea\x3a\x69\x10\xa2\xd8\x08\x00\x2b\x30\x30\x9d'
+CLSID_USERS_FILES = b'\x47\x1a\x03\x59\x72\x3f\xa7\x44\x89\xc5\x55\x95\xfe\x6b\x30\xee'
+CLSID_NETWORK = b'\x60\x2c\x8d\x20\xea\x3a\x69\x10\xa2\xd7\x08\x00\x2b\x30\x30\x9d'
+
+# 文件条目扩展块签名 0xBEEF0004
+BEEF0004_SIGNATURE = b'\x04\x00\xef\xbe'
+
+
+# path 为目标路径（非文件系统目标时为空字符串），
+# is_dir 为目标是否为文件夹（头部属性为0时无法判断，为None）
+LnkTarget = namedtuple('LnkTarget', ['path', 'is_dir'])
+
+
+class LnkParseError(ValueError):
+    """快捷方式文件格式错误或不受支持"""
+
+
+def _default_ansi_encoding():
+    """ANSI字符串使用系统代码页（Windows上为mbcs），其他平台退回latin-1"""
+    try:
+        codecs.lookup('mbcs')
+        return 'mbcs'
+    except LookupError:
+        return 'latin-1'
+
+
+ANSI_ENCODING = _default_ansi_encoding()
+
+
+def _read_c_string(data, offset, encoding):
+    """读取以NUL结尾的ANSI字符串"""
+    end = data.find(b'\x00', offset)
+    if end < 0:
+        end = len(data)
+    return data[offset:end].decode(encoding, errors='replace')
+
+
+def _read_c_wstring(data, offset):
+    """读取以NUL结尾的UTF-16LE字符串"""
+    end = offset
+    length = len(data) - 1
+    while end < length and (data[end] or data[end + 1]):
+        end += 2
+    return data[offset:end].decode('utf-16-le', errors='replace')
+
+
+def _parse_link_info(data, offset, encoding):
+    """解析LinkInfo结构，返回目标路径（可能为空字符串）"""
+    if offset + 28 > len(data):
+        raise LnkParseError("LinkInfo 结构被截断")
+    (info_size, header_size, info_flags, _volume_id_offset, local_base_offset,
+     network_offset, suffix_offset) = struct.unpack_from('<7I', data, offset)
+    if info_size < 28 or offset + info_size > len(data):
+        raise LnkParseError("LinkInfo 大小无效")
+
+    local_base_unicode = 0
+    suffix_unicode = 0
+    if header_size >= 0x24:
+        # 带 Unicode 偏移的头部为36字节，必须完整地位于 LinkInfo 之内
+        if info_size < 0x24:
+            raise LnkParseError("LinkInfo 头部被截断")
+        local_base_unicode, suffix_unicode = struct.unpack_from('<2I', data, offset + 28)
+
+    # 公共路径后缀
+    if suffix_unicode:
+        suffix = _read_c_wstring(data, offset + suffix_unicode)
+    elif suffix_offset:
+        suffix = _read_c_string(data, offset + suffix_offset, encoding)
+    else:
+        suffix = ""
+
+    # 本地路径：LocalBasePath + CommonPathSuffix
+    if info_flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if local_base_unicode:
+            base = _read_c_wstring(data, offset + local_base_unicode)
+        else:
+            base = _read_c_string(data, offset + local_base_offset, encoding)
+        if base:
+            return base + suffix
+
+    # 网络路径：NetName + "\" + CommonPathSuffix
+    if info_flags & COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX and network_offset:
+        net_start = offset + network_offset
+        if net_start + 20 > len(data):
+            raise LnkParseError("CommonNetworkRelativeLink 结构被截断")
+        _size, _net_flags, net_name_offset, _device_offset, _provider = \
+            struct.unpack_from('<5I', data, net_start)
+        if net_name_offset > 0x14 and net_start + 28 <= len(data):
+            net_name_unicode = struct.unpack_from('<I', data, net_start + 20)[0]
+            net_name = _read_c_wstring(data, net_start + net_name_unicode)
+        else:
+            net_name = _read_c_string(data, net_start + net_name_offset, encoding)
+        if net_name:
+            if suffix:
+                return net_name.rstrip('\\') + '\\' + suffix
+            return net_name
+
+    return ""
+
+
+def _file_entry_name(item, encoding):
+    """从文件条目项（0x30类）中取出长文件名，取不到时使用短文件名"""
+    # 优先使用 0xBEEF0004 扩展块中的长文件名
+    sig_pos = item.find(BEEF0004_SIGNATURE, 14)
+    if sig_pos >= 4:
+        ext_start = sig_pos - 4
+        ext_size, ext_version = struct.unpack_from('<2H', item, ext_start)
+        if ext_size and ext_start + ext_size <= len(item):
+            name_offset = 18
+            if ext_version >= 7:
+                name_offset += 18
+            if ext_version >= 3:
+                name_offset += 2
+            if ext_version >= 9:
+                name_offset += 4
+            if ext_version >= 8:
+                name_offset += 4
+            if name_offset < ext_size:
+                long_name = _read_c_wstring(item[:ext_start + ext_size], ext_start + name_offset)
+                if long_name:
+                    return long_name
+
+    # 短文件名（类型标志0x04表示Unicode）
+    if item[0] & 0x04:
+        return _read_c_wstring(item, 12)
+    return _read_c_string(item, 12, encoding)
+
+
+def _parse_id_list(data, offset, end, encoding):
+    """把LinkTargetIDList转换成文件系统路径，非文件系统目标返回空字符串"""
+    parts = []
+    root = None
+
+    while offset + 2 <= end:
+        item_size = struct.unpack_from('<H', data, offset)[0]
+        if item_size == 0:
+            break
+        if item_size < 3 or offset + item_size > end:
+            raise LnkParseError("IDList 项大小无效")
+        item = data[offset + 2:offset + item_size]
+        offset += item_size
+
+        item_type = item[0]
+        kind = item_type & 0x70
+
+        if item_type == 0x1F:
+            # 根文件夹：只支持"此电脑"、用户文件夹和网络
+            clsid = item[2:18]
+            if clsid == CLSID_MY_COMPUTER or clsid == CLSID_NETWORK:
+                continue
+            if clsid == CLSID_USERS_FILES:
+                root = os.environ.get('USERPROFILE', '')
+                if not root:
+                    return ""
+                continue
+            return ""
+        elif kind == 0x20:
+            # 卷项，例如 "C:\"
+            root = _read_c_string(item, 1, encoding)
+        elif kind == 0x30:
+            parts.append(_file_entry_name(item, encoding))
+        elif kind == 0x40:
+            # 网络位置，例如 "\\server\share"
+            root = _read_c_string(item, 3, encoding)
+        else:
+            # 控制面板、库等虚拟项，没有文件系统路径
+            return ""
+
+    if not root:
+        return ""
+    if not parts:
+        return root
+    return root.rstrip('\\') + '\\' + '\\'.join(parts)
+
+
+def _skip_string_data(data, offset, link_flags):
+    """跳过StringData部分，返回ExtraData的起始位置"""
+    char_size = 2 if link_flags & IS_UNICODE else 1
+    for flag in (HAS_NAME, HAS_RELATIVE_PATH, HAS_WORKING_DIR,
+                 HAS_ARGUMENTS, HAS_ICON_LOCATION):
+        if link_flags & flag:
+            if offset + 2 > len(data):
+                raise LnkParseError("StringData 被截断")
+            count = struct.unpack_from('<H', data, offset)[0]
+            offset += 2 + count * char_size
+    return offset
+
+
+def _parse_environment_target(data, offset):
+    """从ExtraData中查找EnvironmentVariableDataBlock并展开其中的目标路径"""
+    while offset + 8 <= len(data):
+        block_size, signature = struct.unpack_from('<2I', data, offset)
+        if block_size < 4:
+            break
+        if signature == ENVIRONMENT_VARIABLE_DATA_BLOCK and block_size >= 0x314:
+            target = _read_c_wstring(data[:offset + 0x314], offset + 268)
+            if not target:
+                target = _read_c_string(data[:offset + 268], offset + 8, ANSI_ENCODING)
+            if target:
+                return ntpath.expandvars(target)
+        offset += block_size
+    return ""
+
+
+def parse_lnk(data, encoding=None):
+    """解析.lnk文件内容，返回LnkTarget
+
+    目标路径的确定顺序与 IShellLink::GetPath 一致：
+    LinkInfo 中的本地/网络路径 → LinkTargetIDList → 环境变量数据块。
+    任何格式错误（包括结构中的偏移量越界）都抛出 LnkParseError。
+    """
+    try:
+        return _parse_lnk(data, encoding or ANSI_ENCODING)
+    except (struct.error, IndexError) as e:
+        raise LnkParseError(f"快捷方式结构越界: {e}") from e
+
+
+def _parse_lnk(data, encoding):
+
+    if len(data) < HEADER_SIZE:
+        raise LnkParseError("文件过短，不是有效的快捷方式")
+    header_size = struct.unpack_from('<I', data, 0)[0]
+    if header_size != HEADER_SIZE or data[4:20] != LINK_CLSID:
+        raise LnkParseError("ShellLinkHeader 无效")
+
+    link_flags, file_attributes = struct.unpack_from('<2I', data, 20)
+    if file_attributes:
+        is_dir = bool(file_attributes & FILE_ATTRIBUTE_DIRECTORY)
+    else:
+        is_dir = None
+
+    offset = HEADER_SIZE
+    id_list_range = None
+    if link_flags & HAS_LINK_TARGET_ID_LIST:
+        if offset + 2 > len(data):
+            raise LnkParseError("LinkTargetIDList 被截断")
+        id_list_size = struct.unpack_from('<H', data, offset)[0]
+        id_list_start = offset + 2
+        offset = id_list_start + id_list_size
+        if offset > len(data):
+            raise LnkParseError("LinkTargetIDList 被截断")
+        id_list_range = (id_list_start, offset)
+
+    path = ""
+    if link_flags & HAS_LINK_INFO:
+        if offset + 4 > len(data):
+            raise LnkParseError("LinkInfo 被截断")
+        info_size = struct.unpack_from('<I', data, offset)[0]
+        if not link_flags & FORCE_NO_LINK_INFO:
+            path = _parse_link_info(data, offset, encoding)
+        offset += info_size
+
+    if not path and id_list_range:
+        path = _parse_id_list(data, id_list_range[0], id_list_range[1], encoding)
+
+    if not path:
+        offset = _skip_string_data(data, offset, link_flags)
+        path = _parse_environment_target(data, offset)
+
+    return LnkTarget(path, is_dir)
+
+
+def read_lnk(lnk_path, encoding=None):
+    """读取并解析一个.lnk文件（只进行一次读取）"""
+    with open(lnk_path, 'rb') as f:
+        data = f.read()
+    return parse_lnk(data, encoding)
+
+
+def main():
+    """打印每个快捷方式解析出的目标路径，便于与COM结果对比"""
+    if len(sys.argv) < 2:
+        print("用法: python lnk_parser.py <.lnk文件或目录> [...]")
+        return 1
+
+    lnk_files = []
+    for arg in sys.argv[1:]:
+        if os.path.isdir(arg):
+            with os.scandir(arg) as entries:
+                lnk_files.extend(sorted(
+                    entry.path for entry in entries
+                    if entry.name.lower().endswith('.lnk') and entry.is_file()
+                ))
+        else:
+            lnk_files.append(arg)
+
+    failed = 0
+    for lnk_file in lnk_files:
+        try:
+            target = read_lnk(lnk_file)
+            print(f"{os.path.basename(lnk_file)}\t{target.path}")
+        except (OSError, LnkParseError) as e:
+            failed += 1
+            print(f"{os.path.basename(lnk_file)}\t<解析失败: {e}>")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
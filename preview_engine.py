@@ -0,0 +1,574 @@
+# -*- coding: utf-8 -*-
+"""
+文件预览引擎（不依赖图形界面）
+只用一个工作线程读取目录，最新的请求优先：每次选中新的文件夹时请求的代号（generation）加一，
+正在进行的目录扫描发现自己已经过时后立即放弃，过时的结果不会显示到界面上。
+选中项变化后等一小段时间再开始读取，按住方向键快速移动时不产生任何磁盘IO。
+
+最近的预览结果保存在按目录修改时间校验的LRU缓存中：回到刚看过的文件夹时只需要一次 stat，
+目录没有变化就直接显示缓存的结果。列目录得到的 DirEntry 一直用到生成预览行，
+每个项目最多 stat 一次（Windows上 DirEntry 自带大小，不需要额外的 stat）。
+
+很大的文件夹分页显示：第一页读完立即显示，滚动到底部时从上次停下的位置（PreviewCursor）继续读下一页；
+项目总数另外流式计数，超过时间上限就停止，显示为"超过 N 个"。
+按大小或修改时间排序时一次流式扫描整个文件夹，用固定大小的堆只保留前 PREVIEW_PAGE_SIZE 个项目，
+内存占用与文件夹大小无关。选中的文件夹加载完后，工作线程空闲时预取相邻的和排在最前面的
+文件夹，新的请求到来时预取立即让路；读取较慢的卷不预取。
+是否较慢只看打开预览时对文件夹本身的一次 stat（与文件夹大小无关），计数和排序扫描的用时不计入。
+"""
+
+import heapq
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict, deque
+
+from recent_scanner import volume_of
+
+
+# 最后一次请求后等待多久（秒）才开始读取目录，比键盘自动重复的间隔长
+PREVIEW_DEBOUNCE = 0.12
+
+# 预览缓存的条目数和估计内存上限
+PREVIEW_CACHE_ENTRIES = 64
+PREVIEW_CACHE_BYTES = 8 * 1024 * 1024
+
+# 预览每页的项目数，以及获取文件信息时每批处理的数量
+PREVIEW_PAGE_SIZE = 300
+PREVIEW_BATCH_SIZE = 50
+
+# 预览的排序方式：{设置值: 显示名称}。name 为先文件夹后文件、按名称排序并分页；
+# size（最大的文件）和 mtime（最近修改的项目）扫描整个文件夹，只显示前 PREVIEW_PAGE_SIZE 个
+PREVIEW_SORT_MODES = {
+    'name': "名称",
+    'size': "最大",
+    'mtime': "最新",
+}
+DEFAULT_PREVIEW_SORT = 'name'
+
+# 统计项目总数的时间上限（秒），超过后总数只是下限
+COUNT_TIME_LIMIT = 0.25
+
+# 除了相邻的行，还预取排在最前面的几个文件夹
+PREFETCH_TOP_FOLDERS = 10
+
+# stat 一个文件夹超过这个时间（秒）算一次慢速探测；同一个卷连续 SLOW_PROBE_COUNT 次慢速探测后
+# 标记为慢速，不再预取该卷上的文件夹（一次偶然的慢速，例如硬盘唤醒，不会标记）
+SLOW_STAT_SECONDS = 0.1
+SLOW_PROBE_COUNT = 2
+
+# 估计内存时每一行的固定开销（行字典和几个短字符串），名称和路径另按字符数计算
+PREVIEW_ROW_BYTES = 400
+
+
+class FolderPreview:
+    """一个文件夹预览的第一页
+
+    rows 为排好序的行（{'name', 'type', 'size', 'is_dir', 'path'}），total_count 为文件夹中的项目总数，
+    count_is_exact 为False时总数只是计数超时前数到的下限。next_offset 为下一页开始的位置，
+    已经显示了全部项目时为None。mtime 为生成结果时目录的修改时间（纳秒）。
+    sort_mode 为排序方式（见 PREVIEW_SORT_MODES），scan_seconds 为按大小或时间排序时扫描整个文件夹的用时。
+    """
+
+    __slots__ = ('path', 'mtime', 'rows', 'total_count', 'count_is_exact', 'next_offset',
+                 'sort_mode', 'scan_seconds', 'size')
+
+    def __init__(self, path, mtime, rows, total_count, count_is_exact=True, next_offset=None,
+                 sort_mode=DEFAULT_PREVIEW_SORT, scan_seconds=None):
+        self.path = path
+        self.mtime = mtime
+        self.rows = rows
+        self.total_count = total_count
+        self.count_is_exact = count_is_exact
+        self.next_offset = next_offset
+        self.sort_mode = sort_mode
+        self.scan_seconds = scan_seconds
+        self.update_size()
+
+    def update_size(self):
+        """重新估计占用的内存（rows 变化后调用）"""
+        self.size = PREVIEW_ROW_BYTES * len(self.rows) + sum(len(row['path']) for row in self.rows) * 2
+
+
+class PreviewCache:
+    """按目录修改时间校验的预览结果LRU缓存，按条目数和估计的字节数限制大小
+
+    工作线程读写缓存时用一把锁串行化；界面线程只查询是否包含某个路径。
+    目录中增删或重命名项目时修改时间会变化；文件内容变化不会改变目录的修改时间，
+    所以缓存中的文件大小可能略旧。
+    """
+
+    def __init__(self, max_entries=PREVIEW_CACHE_ENTRIES, max_bytes=PREVIEW_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {path: FolderPreview}，最近使用的在最后
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, path):
+        """是否有 path 的缓存（不校验修改时间）"""
+        return path in self.entries
+
+    def get(self, path, mtime, sort_mode=DEFAULT_PREVIEW_SORT):
+        """返回 path 的缓存结果；没有缓存、目录已经变化或排序方式不同时返回None"""
+        with self.lock:
+            preview = self.entries.get(path)
+            if preview is not None and preview.mtime == mtime and preview.sort_mode == sort_mode:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return preview
+            if preview is not None:
+                self._remove(path)
+            self.misses += 1
+            return None
+
+    def is_fresh(self, path, mtime, sort_mode=DEFAULT_PREVIEW_SORT):
+        """是否有 path 的有效缓存（不计入命中统计，也不改变淘汰顺序）"""
+        preview = self.entries.get(path)
+        return preview is not None and preview.mtime == mtime and preview.sort_mode == sort_mode
+
+    def put(self, preview):
+        """保存一个预览结果，超出上限时淘汰最久没有使用的"""
+        if preview.size > self.max_bytes:
+            return
+        with self.lock:
+            if preview.path in self.entries:
+                self._remove(preview.path)
+            self.entries[preview.path] = preview
+            self.total_bytes += preview.size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, path):
+        self.total_bytes -= self.entries.pop(path).size
+
+
+def format_size(size):
+    """格式化文件大小"""
+    if size < 1024:
+        return f"{size} B"
+    elif size < 1048576:  # 1024 * 1024
+        return f"{size >> 10:.0f} KB"  # 使用位运算
+    elif size < 1073741824:  # 1024 * 1024 * 1024
+        return f"{size >> 20:.1f} MB"
+    else:
+        return f"{size >> 30:.1f} GB"
+
+
+class PreviewCursor:
+    """文件夹预览的分页游标
+
+    offset 为已经读过的项目数。读完一页后目录仍然打开，下一页直接从这里继续；
+    被打断或从缓存恢复（只知道 offset）时重新打开目录并跳过已经读过的项目。
+    read_page 在预览工作线程中调用，close 可以在任何线程中调用。
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.offset = offset
+        self.exhausted = False
+        self.closed = False
+        self._iterator = None
+        self._lock = threading.Lock()
+
+    def read_page(self, is_current, page_size=PREVIEW_PAGE_SIZE):
+        """读取下一页，返回按显示顺序（先文件夹后文件，按名称）排列的 DirEntry 列表
+
+        is_current() 返回False或游标已关闭时返回None；无法列出文件夹时抛出 OSError。
+        """
+        with self._lock:
+            if self.closed:
+                return None
+            try:
+                page = self._read(is_current, page_size)
+            except OSError:
+                self._close_iterator()
+                raise
+            if page is None or self.exhausted:
+                self._close_iterator()
+            return page
+
+    def _read(self, is_current, page_size):
+        if self._iterator is None:
+            self._iterator = os.scandir(self.path)
+            # 重新打开时跳过已经显示过的项目
+            for _ in range(self.offset):
+                if not is_current():
+                    return None
+                if next(self._iterator, None) is None:
+                    self.exhausted = True
+                    return []
+
+        folders = []
+        files = []
+        for entry in self._iterator:
+            # 已经选中了其他文件夹，放弃这一页（已读的项目不计入 offset，下次重新打开目录）
+            if not is_current():
+                return None
+            try:
+                # 普通项目的类型来自目录本身，不需要 stat；只有符号链接要读取目标
+                if entry.is_dir():
+                    folders.append(entry)
+                else:
+                    files.append(entry)
+            except OSError:
+                files.append(entry)
+            if len(folders) + len(files) >= page_size:
+                break
+        else:
+            self.exhausted = True
+
+        self.offset += len(folders) + len(files)
+        folders.sort(key=_entry_sort_key)
+        files.sort(key=_entry_sort_key)
+        return folders + files
+
+    def close(self):
+        """关闭游标；正在读取时由读取的线程在读完后关闭目录"""
+        self.closed = True
+        if self._lock.acquire(blocking=False):
+            try:
+                self._close_iterator()
+            finally:
+                self._lock.release()
+
+    def _close_iterator(self):
+        if self._iterator is not None:
+            self._iterator.close()
+            self._iterator = None
+
+
+def count_entries(folder_path, is_current, time_limit=COUNT_TIME_LIMIT):
+    """流式统计文件夹中的项目数，不保存名称，返回 (项目数, 是否准确)
+
+    超过 time_limit 秒后停止，返回已经数到的数量作为下限；is_current() 返回False时返回None。
+    """
+    deadline = time.monotonic() + time_limit
+    count = 0
+    with os.scandir(folder_path) as entries:
+        for _ in entries:
+            if not is_current():
+                return None
+            count += 1
+            if not count & 255 and time.monotonic() > deadline:
+                return count, False
+    return count, True
+
+
+def read_top_entries(folder_path, sort_mode, is_current, limit=PREVIEW_PAGE_SIZE):
+    """一次流式扫描整个文件夹，返回 (最大或最新的 limit 个 DirEntry, 项目总数)
+
+    sort_mode 为 'size' 时只比较文件的大小，为 'mtime' 时比较所有项目的修改时间。
+    堆中最多保留 limit 个项目，其余的 DirEntry 扫描过就丢弃。is_current() 返回False时返回None。
+    """
+    heap = []  # (大小或时间, 扫描顺序, DirEntry)，堆顶是目前保留的项目中最小的
+    count = 0
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if not is_current():
+                return None
+            count += 1
+            try:
+                if sort_mode == 'size':
+                    if entry.is_dir():
+                        continue
+                    key = entry.stat().st_size
+                else:
+                    key = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            # 扫描顺序保证不会比较到 DirEntry，相同时先扫描到的排在前面
+            item = (key, -count, entry)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+    heap.sort(reverse=True)
+    return [entry for _, _, entry in heap], count
+
+
+def read_first_page(folder_path, is_current):
+    """读取第一页，返回 (游标, DirEntry 列表)；is_current() 返回False时返回None"""
+    cursor = PreviewCursor(folder_path)
+    entries = cursor.read_page(is_current)
+    if entries is None:
+        return None
+    return cursor, entries
+
+
+def count_after_page(cursor, is_current):
+    """返回 (项目总数, 是否准确)：第一页已经读完整个目录时不需要再数一遍"""
+    if cursor.exhausted:
+        return cursor.offset, True
+    counted = count_entries(cursor.path, is_current)
+    if counted is None:
+        return None
+    total_count, count_is_exact = counted
+    # 计数期间目录可能有变化，总数至少是已经读过的数量
+    return max(total_count, cursor.offset), count_is_exact
+
+
+def _entry_sort_key(entry):
+    return entry.name.lower()
+
+
+def describe_entries(entries):
+    """返回 DirEntry 对应的预览行，跳过无法访问的项目
+
+    文件夹不需要 stat；文件的大小用 DirEntry 缓存的 stat 结果（Windows上列目录时已经得到，
+    其他系统上每个文件一次 stat）。
+    """
+    rows = []
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                # 文件夹
+                item_type = "文件夹"
+                size_str = "-"
+                is_dir = True
+            else:
+                # 文件
+                _, ext = os.path.splitext(entry.name)
+                item_type = ext.upper()[1:] if ext else "文件"
+                size_str = format_size(entry.stat().st_size)
+                is_dir = False
+        except OSError:
+            # 跳过无法访问的文件（例如目标已不存在的符号链接）
+            continue
+
+        rows.append({
+            'name': entry.name,
+            'type': item_type,
+            'size': size_str,
+            'is_dir': is_dir,
+            'path': entry.path
+        })
+    return rows
+
+
+def iter_preview_batches(entries, is_current, batch_size=PREVIEW_BATCH_SIZE):
+    """按批生成预览行，产生 (这一批的行, 进度百分比)；is_current() 返回False时停止"""
+    for start in range(0, len(entries), batch_size):
+        if not is_current():
+            return
+        rows = describe_entries(entries[start:start + batch_size])
+        yield rows, min(100, (start + batch_size) * 100 // len(entries))
+
+
+def read_sorted_preview(folder_path, mtime, sort_mode, is_current):
+    """按大小或时间排序时读取要显示的项目，返回 (DirEntry 列表, 还没有行的 FolderPreview)
+
+    is_current() 返回False时返回None。
+    """
+    started = time.monotonic()
+    top = read_top_entries(folder_path, sort_mode, is_current)
+    if top is None:
+        return None
+    entries, total_count = top
+    return entries, FolderPreview(folder_path, mtime, [], total_count, sort_mode=sort_mode,
+                                  scan_seconds=time.monotonic() - started)
+
+
+def build_preview(folder_path, mtime, is_current, sort_mode=DEFAULT_PREVIEW_SORT):
+    """在当前线程中生成 folder_path 预览的第一页；is_current() 返回False时放弃并返回None"""
+    if sort_mode != DEFAULT_PREVIEW_SORT:
+        sorted_preview = read_sorted_preview(folder_path, mtime, sort_mode, is_current)
+        if sorted_preview is None:
+            return None
+        entries, preview = sorted_preview
+        for batch, _ in iter_preview_batches(entries, is_current):
+            preview.rows.extend(batch)
+        if not is_current():
+            return None
+        preview.update_size()
+        return preview
+
+    first_page = read_first_page(folder_path, is_current)
+    if first_page is None:
+        return None
+    cursor, entries = first_page
+    cursor.close()
+    rows = []
+    for batch, _ in iter_preview_batches(entries, is_current):
+        rows.extend(batch)
+    counted = count_after_page(cursor, is_current) if is_current() else None
+    if counted is None:
+        return None
+    total_count, count_is_exact = counted
+    return FolderPreview(folder_path, mtime, rows, total_count, count_is_exact,
+                         None if cursor.exhausted else cursor.offset)
+
+
+def prefetch_preview(cache, folder_path, is_current, sort_mode=DEFAULT_PREVIEW_SORT, stat_folder=os.stat):
+    """在缓存中准备 folder_path 的预览，已有有效缓存时只 stat 一次；被打断时放弃
+
+    stat_folder 用来 stat 文件夹本身，可以传入 PreviewLoader.stat_folder 以记录卷的读取速度。
+    """
+    try:
+        folder_stat = stat_folder(folder_path)
+    except OSError:
+        return
+    mtime = folder_stat.st_mtime_ns
+    if not stat.S_ISDIR(folder_stat.st_mode) or cache.is_fresh(folder_path, mtime, sort_mode):
+        return
+    try:
+        preview = build_preview(folder_path, mtime, is_current, sort_mode)
+    except OSError:
+        return
+    if preview is not None:
+        cache.put(preview)
+
+
+class PreviewLoader:
+    """只有一个工作线程的预览加载器
+
+    request(path) 使之前的请求全部作废并返回新请求的代号。请求停止变化 debounce 秒后，
+    工作线程调用 load(path, generation)；load 应在读取目录的循环中用 is_current(generation)
+    检查，作废后立即放弃，交给界面的结果也要在界面线程中再检查一次。
+
+    submit(generation, task) 在工作线程中尽快执行 task()（例如读取下一页），请求已经过时则跳过。
+
+    request 时可以附带要预取的路径：load 完成且没有新的请求时，工作线程依次调用
+    prefetch(path, generation)，新的请求使代号变化，正在进行的预取随之放弃。
+    load 和 prefetch 用 stat_folder 读取文件夹本身的信息：同一卷连续 SLOW_PROBE_COUNT 次
+    超过 SLOW_STAT_SECONDS 时记入 slow_volumes，不再预取。
+    """
+
+    def __init__(self, load, prefetch=None, debounce=PREVIEW_DEBOUNCE):
+        self.load = load
+        self.prefetch = prefetch
+        self.debounce = debounce
+        self.generation = 0
+        self.slow_volumes = set()
+        self._slow_probes = {}  # {卷: 连续慢速探测的次数}，只在工作线程中使用
+        self._pending = None  # (path, generation, 请求时间, 预取路径)
+        self._tasks = deque()  # (generation, task)
+        self._prefetch_queue = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def request(self, path, immediate=False, prefetch_paths=()):
+        """请求加载 path 的预览，返回请求的代号
+
+        immediate 为True时不等待防抖（例如已有缓存）；prefetch_paths 在 path 加载完成后预取。
+        """
+        requested_at = time.monotonic()
+        if immediate:
+            requested_at -= self.debounce
+        with self._condition:
+            self.generation += 1
+            self._pending = (path, self.generation, requested_at, list(prefetch_paths))
+            self._tasks.clear()
+            self._prefetch_queue.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="preview-loader", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self.generation
+
+    def submit(self, generation, task):
+        """在工作线程中执行 task()，排在新的请求之后、预取之前"""
+        with self._condition:
+            if generation != self.generation or self._closed:
+                return
+            self._tasks.append((generation, task))
+            self._condition.notify()
+
+    def cancel(self):
+        """作废所有请求（例如取消选中）"""
+        with self._condition:
+            self.generation += 1
+            self._pending = None
+            self._tasks.clear()
+            self._prefetch_queue.clear()
+
+    def is_current(self, generation):
+        """generation 是否仍是最新的请求"""
+        return generation == self.generation
+
+    def close(self):
+        """作废所有请求并让工作线程退出"""
+        with self._condition:
+            self._closed = True
+            self.generation += 1
+            self._pending = None
+            self._tasks.clear()
+            self._prefetch_queue.clear()
+            self._condition.notify()
+
+    def is_slow(self, path):
+        """path 所在的卷是否被标记为慢速"""
+        return volume_of(path) in self.slow_volumes
+
+    def stat_folder(self, path):
+        """在工作线程中 stat 文件夹并记录用时；无法访问时抛出 OSError（失败的用时同样记录）"""
+        started = time.monotonic()
+        try:
+            return os.stat(path)
+        finally:
+            self.record_probe(path, time.monotonic() - started)
+
+    def record_probe(self, path, seconds):
+        """记录一次 stat path 的用时，同一卷连续 SLOW_PROBE_COUNT 次慢速时标记为慢速"""
+        volume = volume_of(path)
+        if seconds <= SLOW_STAT_SECONDS:
+            self._slow_probes.pop(volume, None)
+            return
+        slow_probes = self._slow_probes.get(volume, 0) + 1
+        self._slow_probes[volume] = slow_probes
+        if slow_probes >= SLOW_PROBE_COUNT and volume not in self.slow_volumes:
+            self.slow_volumes.add(volume)
+            print(f"卷 {volume} 读取较慢，不再预取该卷上的文件夹")
+
+    def _next_task(self):
+        """返回下一个任务 (类型, 参数, generation, 预取路径)；关闭时返回None
+
+        类型为 'load'、'task' 或 'prefetch'。请求要等到它之后 debounce 秒内没有新的请求才开始；
+        然后处理 submit 的任务，最后才处理预取队列。
+        """
+        with self._condition:
+            while not self._closed:
+                if self._pending is not None:
+                    path, generation, requested_at, prefetch_paths = self._pending
+                    remaining = requested_at + self.debounce - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+                    self._pending = None
+                    return 'load', path, generation, prefetch_paths
+                while self._tasks:
+                    generation, task = self._tasks.popleft()
+                    if generation == self.generation:
+                        return 'task', task, generation, ()
+                while self._prefetch_queue:
+                    path = self._prefetch_queue.popleft()
+                    if not self.is_slow(path):
+                        return 'prefetch', path, self.generation, ()
+                self._condition.wait()
+            return None
+
+    def _run(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            kind, target, generation, prefetch_paths = task
+            try:
+                if kind == 'load':
+                    self.load(target, generation)
+                elif kind == 'task':
+                    target()
+                else:
+                    self.prefetch(target, generation)
+            except Exception as e:
+                print(f"加载预览失败: {e}")
+
+            # 选中的文件夹加载完成后，如果没有新的请求就开始预取
+            if prefetch_paths and self.prefetch is not None:
+                with self._condition:
+                    if generation == self.generation and self._pending is None:
+                        self._prefetch_queue.extend(prefetch_paths)
@@ -0,0 +1,1648 @@
+# -*- coding: utf-8 -*-
+"""
+Windows 最近访问文件夹查看器 - 图形界面
+功能：
+- 读取Windows最近访问的文件夹
+- 按访问时间排序显示
+- 支持搜索过滤
+- 单击复制路径，双击打开文件夹
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+import os
+import stat
+import subprocess
+import threading
+import time
+from folder_index import FolderIndex
+from folder_list_view import VirtualFolderList
+from preview_engine import (DEFAULT_PREVIEW_SORT, FolderPreview, PreviewCache, PreviewCursor, PreviewLoader,
+                            PREFETCH_TOP_FOLDERS, PREVIEW_SORT_MODES, count_after_page, iter_preview_batches,
+                            prefetch_preview, read_first_page, read_sorted_preview)
+
+# pyperclip、pystray、PIL、keyboard 在第一次用到时才导入，缩短启动时间
+
+
+class StartupTimer:
+    """记录启动各阶段耗时，用于 --startup-report"""
+
+    def __init__(self, enabled=False, started_at=None):
+        self.enabled = enabled
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases = []
+        self.marks = []
+        self.reported = False
+
+    def run(self, name, func):
+        """执行一个启动阶段并记录耗时"""
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        """记录从启动到某个时刻的耗时，每个时刻只记录第一次"""
+        if name not in dict(self.marks):
+            self.marks.append((name, time.perf_counter() - self.started_at))
+
+    def report(self):
+        """打印启动报告（只打印一次）"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("启动耗时报告:")
+        for name, elapsed in self.phases:
+            print(f"  {name:<22} {elapsed * 1000:8.1f} ms")
+        for name, elapsed in self.marks:
+            print(f"  {name:<22} {elapsed * 1000:8.1f} ms（从启动开始）")
+
+
+class RecentFoldersViewer:
+    def __init__(self, root, startup_timer=None):
+        self.root = root
+        self.startup_timer = startup_timer or StartupTimer()
+        self.root.title("Windows 最近访问文件夹查看器")
+        self.root.geometry("1000x600")
+        self.root.minsize(600, 400)
+        
+        # 文件夹数据、打开历史、注释和智能标签都由索引管理，界面只负责显示
+        self.index = FolderIndex()
+        # 当前显示的（过滤后的）文件夹和选中的快捷分类
+        self.filtered_data = []
+        self.current_category = ""
+        # 右侧预览只用一个工作线程加载，选中其他文件夹后正在进行的加载立即作废；
+        # 空闲时预取相邻和排在最前面的文件夹
+        self.preview_loader = PreviewLoader(self.load_folder_contents, self.prefetch_folder_contents)
+        # 最近的预览结果，目录没有变化时直接显示
+        self.preview_cache = PreviewCache()
+        # 当前预览的分页状态（下一页的游标、已读项目数、总数等），没有预览时为None
+        self.preview_paging = None
+        # 预览末尾的提示行（还有多少项目、正在加载更多）
+        self.preview_footer = None
+        
+        # 系统托盘相关（托盘图标在第一次隐藏窗口时才创建）
+        self.tray_icon = None
+        self.is_hidden = False
+        # 按下全局快捷键的时间，用于报告窗口显示耗时
+        self.hotkey_pressed_at = None
+        
+        # 创建配置目录并加载配置
+        timer = self.startup_timer
+        self.index.create_config_dir()
+        timer.run('load_config', self.index.load_config)
+        
+        timer.run('setup_ui', self.setup_ui)
+        timer.run('setup_window_icon', self.setup_window_icon)
+        timer.run('setup_tray', self.setup_tray)
+        timer.run('setup_global_hotkey', self.setup_global_hotkey)
+        self.root.bind('<Map>', self.on_first_map, add='+')
+        self.load_recent_folders()
+        
+        # 让搜索框获得默认焦点
+        self.root.after(100, lambda: self.search_entry.focus_set())
+        
+        # 绑定程序关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # 生成智能标签
+        self.generate_smart_tags()
+        
+    def setup_ui(self):
+        """设置用户界面"""
+        # 主框架
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 配置网格权重
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+        
+        # 搜索框架
+        search_frame = ttk.Frame(main_frame)
+        search_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        search_frame.columnconfigure(1, weight=1)
+        
+        # 搜索标签和输入框
+        ttk.Label(search_frame, text="搜索过滤:").grid(row=0, column=0, padx=(0, 5))
+        
+        self.search_var = tk.StringVar()
+        self.search_var.trace('w', self.on_search_change)
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        
+        # 刷新按钮
+        refresh_btn = ttk.Button(search_frame, text="刷新", command=self.refresh_folders)
+        refresh_btn.grid(row=0, column=2, padx=(5, 0))
+        
+        # 快捷分类过滤按钮
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(5, 10))
+        
+        ttk.Label(filter_frame, text="快捷分类:").grid(row=0, column=0, padx=(0, 5))
+        
+        # 分类按钮
+        categories = [
+            ("全部", ""),
+            ("开发", "开发"),
+            ("工作", "工作"),
+            ("学习", "学习"),
+            ("多媒体", "多媒体"),
+            ("手动备注", "手动备注"),
+            ("常用", "常用"),
+            ("今日", "今日")
+        ]
+        
+        self.category_buttons = []
+        for i, (label, category) in enumerate(categories):
+            btn = ttk.Button(filter_frame, text=label, 
+                           command=lambda c=category: self.filter_by_category(c))
+            btn.grid(row=0, column=i+1, padx=2)
+            self.category_buttons.append(btn)
+        
+        # 调整网格权重
+        main_frame.rowconfigure(2, weight=0)
+        
+        # 创建水平分割面板
+        paned_window = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
+        paned_window.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 左侧文件夹列表框架
+        left_frame = ttk.Frame(paned_window)
+        paned_window.add(left_frame, weight=2)  # 左侧占2/3
+        
+        left_frame.columnconfigure(0, weight=1)
+        left_frame.rowconfigure(0, weight=1)
+        
+        
+        # 创建文件夹列表Treeview
+        columns = ('path', 'comment')
+        self.tree = ttk.Treeview(left_frame, columns=columns, show='headings', height=15, style='Treeview')
+        
+        # 定义列标题和宽度
+        self.tree.heading('path', text='文件夹路径')
+        self.tree.heading('comment', text='注释')
+        
+        self.tree.column('path', width=400, anchor='w')
+        self.tree.column('comment', width=200, anchor='w')
+        
+        # 左侧滚动条；Treeview 中只有可见的行，滚动由虚拟列表处理
+        left_scrollbar = ttk.Scrollbar(left_frame, orient=tk.VERTICAL)
+        self.folder_list = VirtualFolderList(self.tree, left_scrollbar, self.get_folder_row)
+        self.configure_folder_tags()
+        
+        # 左侧布局
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        left_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        # 右侧文件预览框架
+        right_frame = ttk.Frame(paned_window)
+        paned_window.add(right_frame, weight=1)  # 右侧占1/3
+        
+        right_frame.columnconfigure(0, weight=1)
+        right_frame.rowconfigure(1, weight=1)
+        
+        # 右侧标题：文件夹名称、按大小或时间排序时的扫描开销，以及排序方式
+        preview_header = ttk.Frame(right_frame)
+        preview_header.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        self.preview_title = ttk.Label(preview_header, text="", font=('', 10, 'bold'))
+        self.preview_title.pack(side="left")
+        self.preview_cost = ttk.Label(preview_header, text="", foreground="#888888")
+        self.preview_cost.pack(side="left", padx=(8, 0))
+        
+        sort_labels = list(PREVIEW_SORT_MODES.values())
+        self.preview_sort_box = ttk.Combobox(preview_header, values=sort_labels, state="readonly", width=6)
+        self.preview_sort_box.set(PREVIEW_SORT_MODES[self.get_preview_sort()])
+        self.preview_sort_box.pack(side="right")
+        self.preview_sort_box.bind('<<ComboboxSelected>>', self.on_preview_sort_change)
+        ttk.Label(preview_header, text="排序:").pack(side="right", padx=(0, 3))
+        
+        # 右侧文件列表
+        file_columns = ('name', 'type', 'size')
+        self.file_tree = ttk.Treeview(right_frame, columns=file_columns, show='headings', height=15)
+        
+        # 定义文件列表列标题和宽度
+        self.file_tree.heading('name', text='文件名')
+        self.file_tree.heading('type', text='类型')
+        self.file_tree.heading('size', text='大小')
+        
+        self.file_tree.column('name', width=200, anchor='w')
+        self.file_tree.column('type', width=80, anchor='center')
+        self.file_tree.column('size', width=80, anchor='e')
+        
+        # 右侧滚动条
+        right_scrollbar = ttk.Scrollbar(right_frame, orient=tk.VERTICAL, command=self.file_tree.yview)
+        self.file_tree.configure(yscrollcommand=lambda first, last: self.on_file_tree_scroll(
+            right_scrollbar, first, last))
+        
+        # 右侧布局
+        self.file_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        right_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        
+        # 绑定事件
+        self.tree.bind('<Button-1>', self.on_single_click)
+        self.tree.bind('<Double-1>', self.on_double_click)
+        self.tree.bind('<Return>', self.on_enter_key)  # 绑定回车键
+        self.tree.bind('<KeyPress>', self.on_tree_key_press)  # 绑定其他按键
+        self.tree.bind('<<FolderSelect>>', self.on_folder_select)  # 绑定选择事件（虚拟列表产生）
+        self.tree.bind('<Button-3>', self.show_context_menu)  # 绑定右键菜单
+        
+        # 绑定文件列表双击事件和回车键事件
+        self.file_tree.bind('<Double-1>', self.on_file_double_click)
+        self.file_tree.bind('<Return>', self.on_file_enter_key)  # 绑定回车键
+        
+        # 为搜索框绑定键盘导航
+        self.search_entry.bind('<Down>', self.focus_to_tree)
+        self.search_entry.bind('<Return>', self.focus_to_tree)
+        
+        # 绑定全局快捷键
+        self.root.bind('<Control-f>', self.focus_to_search)
+        self.root.bind('<Control-F>', self.focus_to_search)  # 大小写都支持
+        self.root.bind('<Escape>', self.hide_to_tray)  # ESC键隐藏到托盘
+        
+        # 绑定左右方向键切换两栏焦点（绑定到具体控件而不是全局）
+        self.tree.bind('<Right>', self.on_tree_right_key)
+        self.file_tree.bind('<Left>', self.on_file_tree_left_key)
+        
+        # 存储当前焦点状态
+        self.current_panel = 'left'  # 'left' 或 'right'
+        
+        # 绑定窗口事件
+        self.root.protocol("WM_DELETE_WINDOW", self.hide_to_tray)  # 关闭按钮隐藏到托盘
+        self.root.bind('<Unmap>', self.on_window_minimize)  # 最小化事件
+        
+        # 创建右键菜单
+        self.context_menu = tk.Menu(self.root, tearoff=0)
+        self.context_menu.add_command(label="编辑注释", command=self.edit_comment)
+        self.context_menu.add_command(label="删除注释", command=self.delete_comment)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="重新生成标签", command=self.regenerate_single_tag)
+        self.context_menu.add_command(label="重新生成所有标签", command=self.regenerate_all_smart_tags)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="打开文件夹", command=self.open_selected_folder)
+        self.context_menu.add_command(label="复制路径", command=self.copy_selected_path)
+    
+    def load_recent_folders(self):
+        """加载最近访问的文件夹"""
+        def load_in_thread():
+            # 显示加载提示
+            self.root.after(0, self.show_folders_loading)
+            
+            # 只从Recent文件夹的.lnk文件获取（这是真正的最近文件夹），去重后按优先级排序（打开次数+访问时间）
+            def report_progress(progress, found_count):
+                self.root.after(0, self.update_folders_loading_progress, progress, found_count)
+            
+            try:
+                folder_info = self.index.load_folders(report_progress)
+            except Exception as e:
+                print(f"从Recent文件夹读取失败: {e}")
+                error_msg = f"读取失败: {str(e)}"
+                self.root.after(0, lambda: self.show_folders_loading_error(error_msg))
+                return
+            
+            # 分批更新UI
+            self.root.after(0, self.update_folder_list, folder_info)
+        
+        # 在后台线程中加载
+        threading.Thread(target=load_in_thread, daemon=True).start()
+    
+    def show_folders_loading(self):
+        """显示文件夹列表加载中的提示"""
+        self.folder_list.show_message("正在扫描最近访问的文件夹...", "loading")
+    
+    def update_folders_loading_progress(self, progress, found_count):
+        """更新文件夹加载进度"""
+        self.folder_list.show_message(f"正在扫描... {progress}% (已找到 {found_count} 个文件夹)", "loading")
+    
+    def show_folders_loading_error(self, error_msg):
+        """显示文件夹加载错误"""
+        self.folder_list.show_message(f"加载失败: {error_msg}", "error")
+    
+    def update_folder_list(self, folders_data):
+        """显示扫描到的文件夹（虚拟列表只创建可见的行，不需要分批插入）"""
+        self.index.set_folders(folders_data)
+        
+        # 如果没有数据，显示提示
+        if not folders_data:
+            self.filtered_data = []
+            self.folder_list.show_message("未找到最近访问的文件夹", "empty")
+        else:
+            self.apply_filter()
+        self.warm_search_index()
+        self.root.after_idle(self.on_first_row_shown)
+
+    def warm_search_index(self):
+        """在后台线程中重建搜索索引和倒排表，界面线程不等待（第一次搜索时如果还没建好会等它完成）"""
+        threading.Thread(target=self.index.prepare_search_index, daemon=True).start()
+    
+    
+    def on_first_map(self, event):
+        """窗口第一次显示"""
+        if event.widget is self.root:
+            self.startup_timer.mark('窗口可见')
+
+    def on_first_row_shown(self):
+        """列表第一次显示出文件夹后打印启动报告"""
+        self.startup_timer.mark('显示第一行')
+        self.startup_timer.report()
+
+    def get_folder_tags(self, folder):
+        """根据文件夹状态和是否已打开返回Treeview标签"""
+        if folder.exists is None:
+            status = "unknown"
+        elif folder.exists:
+            status = "exists"
+        else:
+            status = "not_exists"
+        if folder.path in self.index.opened_folders:
+            return ("opened_" + status,)
+        return (status,)
+    
+    def get_folder_row(self, folder):
+        """返回文件夹在列表中显示的 (values, tags)"""
+        path = folder.path
+        return (path, self.index.get_comment(path)), self.get_folder_tags(folder)
+    
+    def configure_folder_tags(self):
+        """配置文件夹列表的标签样式"""
+        self.tree.tag_configure("exists", foreground="black")
+        self.tree.tag_configure("not_exists", foreground="gray")
+        self.tree.tag_configure("unknown", foreground="#C08030")  # 状态未知（检查超时）用橙色
+        self.tree.tag_configure("opened_exists", foreground="#4A90E2")  # 淡蓝色
+        self.tree.tag_configure("opened_not_exists", foreground="#6BA3F0")  # 稍亮的淡蓝色
+        self.tree.tag_configure("opened_unknown", foreground="#C08030")
+        # 加载中、出错和空列表的提示行
+        self.tree.tag_configure("loading", foreground="#4A90E2", font=('', 9, 'italic'))
+        self.tree.tag_configure("error", foreground="red")
+        self.tree.tag_configure("empty", foreground="#888888", font=('', 10, 'italic'))
+    
+    def apply_filter(self, keep_position=False):
+        """应用搜索过滤（同时保留当前选择的快捷分类）"""
+        self.apply_category_filter(self.current_category, keep_position)
+    
+    def render_folder_rows(self, keep_position=False):
+        """把 filtered_data 显示到文件夹列表中（只更新可见窗口中变化的行）"""
+        # 没有过滤时 filtered_data 与索引中的顺序相同，可以直接使用索引的位置表
+        positions = None
+        if not self.search_var.get() and not self.current_category:
+            positions = self.index.folder_positions
+        self.folder_list.set_rows(self.filtered_data, positions, keep_position)
+    
+    def on_search_change(self, *args):
+        """搜索文本变化时的回调"""
+        self.apply_filter()
+    
+    def on_single_click(self, event):
+        """单击事件：选中项目（不再复制路径）"""
+        # 保留单击选中功能，但移除自动复制路径的行为
+        # 现在用户需要通过右键菜单来复制路径
+        pass
+    
+    def on_double_click(self, event):
+        """双击事件：根据点击位置决定是打开文件夹还是编辑注释"""
+        # 首先确定点击的项目
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return
+        
+        # 选中该项目（如果还没选中）
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        
+        # 获取点击的列和区域
+        column = self.tree.identify_column(event.x)
+        region = self.tree.identify_region(event.x, event.y)
+        
+        # 获取文件夹路径
+        values = self.tree.item(item, 'values')
+        if not values:
+            return
+        
+        path = values[0]
+        
+        # 确保只在cell区域响应双击
+        if region != 'cell':
+            return
+        
+        # 根据列决定操作
+        if column == '#1':  # 点击的是路径列（文件夹名字区域）
+            # 打开文件夹
+            self.open_folder_by_path(path)
+        elif column == '#2':  # 点击的是注释列
+            # 编辑注释
+            self.edit_comment_by_path(path)
+        else:
+            # 如果点击的是其他区域，默认打开文件夹
+            self.open_folder_by_path(path)
+    
+    def open_folder_by_path(self, path):
+        """根据路径打开文件夹"""
+        try:
+            if os.path.exists(path):
+                # 在文件管理器中打开（移除check=True避免误报错误）
+                subprocess.run(['explorer', path])
+                
+                # 记录文件夹打开历史
+                self.index.record_folder_open(path)
+                
+                # 将该文件夹移到最前面并更新访问时间
+                self.move_folder_to_top(path)
+            else:
+                messagebox.showwarning("警告", f"文件夹不存在: {path}")
+        except Exception as e:
+            messagebox.showerror("错误", f"打开文件夹失败: {str(e)}")
+    
+    def edit_comment_by_path(self, path):
+        """根据路径编辑注释"""
+        # 获取当前注释
+        current_comment = self.index.get_comment(path)
+        
+        # 创建编辑对话框
+        self.show_comment_dialog(path, current_comment)
+    
+    def move_folder_to_top(self, path):
+        """将指定文件夹移到列表最前面"""
+        # 更新访问时间并使用与初始排序相同的优先级算法重新排序
+        self.index.move_folder_to_top(path)
+        
+        # 刷新显示：列表按路径比较，只移动这个文件夹并移除被挤出窗口的一行
+        self.apply_filter(keep_position=True)
+        
+        # 重新选中移动到顶端的文件夹（不设置焦点，让调用者决定）
+        self.select_folder_by_path(path, set_focus=False)
+    
+    def select_folder_by_path(self, path, set_focus=False):
+        """根据路径选中文件夹并滚动到可见"""
+        if not self.folder_list.select_path(path):
+            return
+        
+        # 如果需要设置焦点，将焦点转移到左侧列表
+        if set_focus:
+            self.tree.focus_set()
+            self.current_panel = 'left'
+    
+    def focus_to_tree(self, event):
+        """从搜索框焦点转到列表"""
+        if self.folder_list.rows:
+            # 如果列表有项目，选中第一个并获得焦点
+            self.folder_list.select_index(0)
+            self.tree.focus_set()
+            return 'break'  # 阻止默认行为
+    
+    def on_enter_key(self, event):
+        """回车键事件：打开选中的文件夹"""
+        if self.folder_list.selected_path is not None:
+            # 复用双击事件的逻辑
+            self.on_double_click(event)
+            return 'break'
+    
+    def on_tree_key_press(self, event):
+        """处理列表中的按键事件"""
+        # 如果是字母数字键，将焦点转回搜索框并插入字符
+        if event.char and event.char.isprintable() and not event.state & 0x4:  # 不是Ctrl组合键
+            self.search_entry.focus_set()
+            # 将当前字符添加到搜索框
+            current_text = self.search_var.get()
+            self.search_var.set(current_text + event.char)
+            # 将光标移到末尾
+            self.search_entry.icursor(tk.END)
+            return 'break'
+        elif event.keysym == 'BackSpace':
+            # 退格键：回到搜索框并删除最后一个字符
+            self.search_entry.focus_set()
+            current_text = self.search_var.get()
+            if current_text:
+                self.search_var.set(current_text[:-1])
+            self.search_entry.icursor(tk.END)
+            return 'break'
+    
+    def focus_to_search(self, event):
+        """Ctrl+F快捷键：聚焦到搜索框并全选文本"""
+        self.search_entry.focus_set()
+        self.search_entry.select_range(0, tk.END)  # 全选搜索框中的文本
+        return 'break'  # 阻止默认行为
+    
+    def get_icon_path(self, filename):
+        """获取图标文件路径"""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(current_dir, filename)
+    
+    def load_icon_image(self, size=64):
+        """加载图标图像"""
+        try:
+            if size <= 16:
+                icon_path = self.get_icon_path('app_icon_16.png')
+            elif size <= 32:
+                icon_path = self.get_icon_path('app_icon_32.png')
+            else:
+                icon_path = self.get_icon_path('app_icon_64.png')
+            
+            if os.path.exists(icon_path):
+                from PIL import Image
+                return Image.open(icon_path)
+            else:
+                # 如果文件不存在，创建备用图标
+                return self.create_fallback_icon(size)
+        except Exception as e:
+            print(f"加载图标失败: {e}")
+            return self.create_fallback_icon(size)
+    
+    def create_fallback_icon(self, size=64):
+        """创建备用图标（当图标文件不存在时）"""
+        from PIL import Image, ImageDraw
+        image = Image.new('RGB', (size, size), color='white')
+        draw = ImageDraw.Draw(image)
+        
+        # 按比例缩放文件夹形状
+        scale = size / 64
+        draw.rectangle([int(10*scale), int(20*scale), int(54*scale), int(50*scale)], 
+                      fill='#FFD700', outline='#B8860B', width=max(1, int(2*scale)))
+        draw.rectangle([int(10*scale), int(15*scale), int(25*scale), int(25*scale)], 
+                      fill='#FFD700', outline='#B8860B', width=max(1, int(2*scale)))
+        
+        return image
+    
+    def setup_window_icon(self):
+        """设置窗口图标"""
+        try:
+            # 使用PNG文件并同时设置iconbitmap和iconphoto
+            png_path_32 = self.get_icon_path('app_icon_32.png')
+            ico_path = self.get_icon_path('app_icon.ico')
+            
+            # 设置窗口图标（标题栏显示）
+            if os.path.exists(png_path_32):
+                photo = tk.PhotoImage(file=png_path_32)
+                self.root.iconphoto(True, photo)
+                # 保存引用以防止被垃圾回收
+                self.window_icon = photo
+            
+            # 设置任务栏图标（使用iconbitmap）
+            if os.path.exists(ico_path):
+                try:
+                    self.root.iconbitmap(ico_path)
+                except Exception as e:
+                    print(f"设置ICO图标失败: {e}")
+                    # 如果ICO失败，尝试重新创建更好的ICO文件
+                    self.create_better_ico()
+            else:
+                # 如果ICO文件不存在，创建一个
+                self.create_better_ico()
+            
+            # 如果都不存在，创建备用图标
+            if not os.path.exists(png_path_32) and not os.path.exists(ico_path):
+                print("图标文件不存在，使用备用图标")
+                fallback_icon = self.create_fallback_icon(32)
+                
+                # 保存备用图标为临时文件
+                import tempfile
+                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+                    fallback_icon.save(tmp.name, 'PNG')
+                    photo = tk.PhotoImage(file=tmp.name)
+                    self.root.iconphoto(True, photo)
+                    self.window_icon = photo
+                    
+                    # 清理临时文件
+                    import atexit
+                    atexit.register(lambda: os.unlink(tmp.name) if os.path.exists(tmp.name) else None)
+                
+        except Exception as e:
+            print(f"设置窗口图标失败: {e}")
+    
+    def create_better_ico(self):
+        """创建更好的ICO文件来解决任务栏图标问题"""
+        try:
+            # 加载原始图标
+            icon_64 = self.load_icon_image(64)
+            
+            from PIL import Image
+            
+            # 创建多个尺寸的图标
+            sizes = [16, 24, 32, 48, 64]
+            images = []
+            
+            for size in sizes:
+                resized = icon_64.resize((size, size), Image.Resampling.LANCZOS)
+                images.append(resized)
+            
+            # 保存为ICO文件
+            ico_path = self.get_icon_path('app_icon.ico')
+            icon_64.save(ico_path, format='ICO', sizes=[(s, s) for s in sizes])
+            
+            # 立即尝试使用新创建的ICO文件
+            self.root.iconbitmap(ico_path)
+            print("重新创建ICO文件并设置成功")
+            
+        except Exception as e:
+            print(f"创建更好的ICO文件失败: {e}")
+    
+    def setup_tray(self):
+        """设置系统托盘：pystray 和托盘图标在第一次隐藏到托盘时才加载"""
+        self.tray_icon = None
+
+    def ensure_tray_icon(self):
+        """创建托盘图标（只创建一次）"""
+        if self.tray_icon is not None:
+            return self.tray_icon
+        try:
+            import pystray
+            
+            # 创建托盘菜单
+            menu = pystray.Menu(
+                pystray.MenuItem("显示窗口", self.show_window, default=True),
+                pystray.MenuItem("刷新列表", self.refresh_folders),
+                pystray.MenuItem("退出", self.quit_app)
+            )
+            
+            # 加载托盘图标（从文件加载）
+            icon_image = self.load_icon_image(64)
+            self.tray_icon = pystray.Icon(
+                "recent_folders", 
+                icon_image, 
+                "最近文件夹查看器", 
+                menu
+            )
+            
+        except Exception as e:
+            print(f"设置系统托盘失败: {e}")
+        return self.tray_icon
+    
+    def hide_to_tray(self, event=None):
+        """隐藏到系统托盘"""
+        if not self.is_hidden:
+            self.root.withdraw()  # 隐藏窗口
+            self.is_hidden = True
+            
+            # 启动托盘图标（在后台线程中）
+            self.ensure_tray_icon()
+            if self.tray_icon and not self.tray_icon.visible:
+                threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        
+        return 'break'  # 阻止默认行为
+    
+    def on_window_minimize(self, event):
+        """窗口最小化事件"""
+        # 检查是否是真正的最小化（而不是其他unmap事件）
+        if self.root.state() == 'iconic':
+            self.hide_to_tray()
+    
+    def show_window(self, icon=None, item=None):
+        """从托盘显示窗口或将已显示的窗口置顶"""
+        if self.is_hidden:
+            # 如果窗口被隐藏，显示它
+            self.root.deiconify()  # 显示窗口
+            self.is_hidden = False
+        
+        # 无论窗口是否已显示，都将其置顶并获得焦点
+        self.root.lift()  # 置顶
+        self.root.focus_force()  # 强制获得焦点
+        self.root.attributes('-topmost', True)  # 临时置为最顶层
+        self.root.after(100, lambda: self.root.attributes('-topmost', False))  # 100ms后取消最顶层
+        
+        # 让搜索框获得焦点
+        self.search_entry.focus_set()
+        
+        # 报告从按下全局快捷键到窗口显示的耗时
+        if self.hotkey_pressed_at is not None:
+            if self.startup_timer.enabled:
+                self.root.update_idletasks()
+                elapsed = time.perf_counter() - self.hotkey_pressed_at
+                print(f"快捷键到窗口显示: {elapsed * 1000:.1f} ms")
+            self.hotkey_pressed_at = None
+    
+    def setup_global_hotkey(self):
+        """设置全局快捷键"""
+        try:
+            import keyboard
+            
+            # 注册全局快捷键 Ctrl+9
+            keyboard.add_hotkey('ctrl+9', self.on_global_hotkey)
+        except Exception as e:
+            print(f"设置全局快捷键失败: {e}")
+    
+    def on_global_hotkey(self):
+        """全局快捷键回调：显示窗口"""
+        try:
+            self.hotkey_pressed_at = time.perf_counter()
+            # 使用after方法确保在主线程中执行UI操作
+            self.root.after(0, self.show_window)
+        except Exception as e:
+            print(f"全局快捷键处理失败: {e}")
+    
+    def on_tray_double_click(self, icon=None, item=None):
+        """托盘图标双击事件：显示窗口"""
+        try:
+            # 使用after方法确保在主线程中执行UI操作
+            self.root.after(0, self.show_window)
+        except Exception as e:
+            print(f"托盘双击处理失败: {e}")
+    
+    def quit_app(self, icon=None, item=None):
+        """退出应用程序"""
+        # 停止预览加载，取消智能标签生成，保存设置并关闭历史数据库
+        self.preview_loader.close()
+        self.index.close()
+        
+        try:
+            # 清理全局快捷键
+            import keyboard
+            keyboard.unhook_all_hotkeys()
+        except:
+            pass
+        
+        if self.tray_icon:
+            self.tray_icon.stop()
+        self.root.quit()
+        self.root.destroy()
+    
+    def on_folder_select(self, event):
+        """文件夹选择事件：加载文件夹内容到右侧预览"""
+        folder_path = self.folder_list.selected_path
+        if folder_path is None:
+            # 没有选中项，作废正在进行的加载并清空文件预览
+            self.preview_loader.cancel()
+            self.clear_file_preview()
+            return
+        
+        # 更新预览标题
+        folder_name = os.path.basename(folder_path) or folder_path
+        self.preview_title.config(text=f"{folder_name}")
+        
+        # 由预览工作线程加载文件列表（快速切换时只加载最后停下的文件夹）；
+        # 已有缓存的文件夹只需要一次 stat 校验，不等待防抖
+        self.preview_loader.request(folder_path, immediate=folder_path in self.preview_cache,
+                                    prefetch_paths=self.get_prefetch_paths(folder_path))
+    
+    def get_prefetch_paths(self, folder_path):
+        """选中文件夹加载完后要预取的路径：先是上下相邻的行，再是排在最前面的文件夹"""
+        rows = self.folder_list.rows
+        candidates = []
+        index = self.folder_list.selected_index()
+        if index is not None:
+            for neighbour in (index + 1, index - 1):
+                if 0 <= neighbour < len(rows):
+                    candidates.append(rows[neighbour])
+        candidates.extend(self.index.folders_data[:PREFETCH_TOP_FOLDERS])
+        
+        paths = []
+        seen = {folder_path}
+        for folder in candidates:
+            # 不预取已知不存在或状态未知（可能在离线的网络路径上）的文件夹
+            if folder.path in seen or not folder.exists:
+                continue
+            seen.add(folder.path)
+            paths.append(folder.path)
+        return paths
+    
+    def prefetch_folder_contents(self, folder_path, generation):
+        """在预览工作线程中把文件夹的预览放入缓存，选中其他文件夹后立即放弃"""
+        prefetch_preview(self.preview_cache, folder_path,
+                         lambda: self.preview_loader.is_current(generation), self.get_preview_sort(),
+                         self.preview_loader.stat_folder)
+    
+    def get_preview_sort(self):
+        """当前的预览排序方式（配置文件中的值无效时按名称排序）"""
+        sort_mode = self.index.settings.get('preview_sort')
+        return sort_mode if sort_mode in PREVIEW_SORT_MODES else DEFAULT_PREVIEW_SORT
+    
+    def on_preview_sort_change(self, event=None):
+        """切换预览排序方式：保存到配置并重新加载当前文件夹"""
+        label = self.preview_sort_box.get()
+        for sort_mode, sort_label in PREVIEW_SORT_MODES.items():
+            if sort_label == label:
+                self.index.update_setting('preview_sort', sort_mode)
+                break
+        folder_path = self.folder_list.selected_path
+        if folder_path is not None:
+            self.preview_loader.request(folder_path, immediate=True)
+    
+    def post_preview(self, generation, func, *args, on_stale=None):
+        """从预览工作线程把界面更新交给主线程，请求已经过时则丢弃（并调用 on_stale，例如关闭目录）"""
+        def apply():
+            if self.preview_loader.is_current(generation):
+                func(*args)
+            elif on_stale is not None:
+                on_stale()
+        self.root.after(0, apply)
+    
+    def clear_file_preview(self):
+        """清空文件预览"""
+        self.reset_preview_paging()
+        # 清空文件列表
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        
+        # 重置标题
+        self.preview_title.config(text="")
+    
+    def load_folder_contents(self, folder_path, generation):
+        """在预览工作线程中加载文件夹内容，请求过时后立即放弃
+
+        所有文件系统操作都在工作线程中进行，界面线程只接收处理好的一批批预览行。
+        """
+        def is_current():
+            return self.preview_loader.is_current(generation)
+        
+        try:
+            try:
+                # 同时记录卷的读取速度，较慢的卷不再预取
+                folder_stat = self.preview_loader.stat_folder(folder_path)
+            except OSError:
+                folder_stat = None
+            if folder_stat is None or not stat.S_ISDIR(folder_stat.st_mode):
+                self.post_preview(generation, self.clear_file_preview)
+                return
+            
+            # 目录没有变化时直接显示缓存的结果
+            mtime = folder_stat.st_mtime_ns
+            sort_mode = self.get_preview_sort()
+            cached = self.preview_cache.get(folder_path, mtime, sort_mode)
+            if cached is not None:
+                self.post_preview(generation, self.show_cached_preview, cached, generation)
+                return
+            
+            # 立即显示加载提示
+            self.post_preview(generation, self.show_loading_preview, folder_path)
+            
+            # 读取第一页，读完立即显示
+            try:
+                if sort_mode != DEFAULT_PREVIEW_SORT:
+                    self.load_sorted_contents(folder_path, mtime, sort_mode, generation)
+                    return
+                
+                first_page = read_first_page(folder_path, is_current)
+                if first_page is None:
+                    return
+                cursor, entries = first_page
+                
+                try:
+                    # 分批获取文件信息，每处理完一批就交给界面显示
+                    files_data = []
+                    for rows, progress in iter_preview_batches(entries, is_current):
+                        files_data.extend(rows)
+                        self.post_preview(generation, self.append_preview_rows, rows, progress)
+                    
+                    # 第一页显示后再统计总数（有时间上限）
+                    counted = count_after_page(cursor, is_current) if is_current() else None
+                except Exception:
+                    # 例如计数时文件夹已被删除：先关闭目录（Windows上打开的目录不能删除或重命名）再报告错误
+                    cursor.close()
+                    raise
+                if counted is None:
+                    cursor.close()
+                    return
+                total_count, count_is_exact = counted
+                
+                preview = FolderPreview(folder_path, mtime, files_data, total_count, count_is_exact,
+                                        None if cursor.exhausted else cursor.offset)
+                self.preview_cache.put(preview)
+                # 游标交给界面继续分页；显示之前又选中了其他文件夹时没有人接手，由这里关闭
+                self.post_preview(generation, self.finish_file_preview, preview, cursor, generation,
+                                  on_stale=cursor.close)
+                
+            except PermissionError:
+                self.post_preview(generation, self.show_preview_error, "权限不足，无法访问此文件夹")
+            except Exception as e:
+                self.post_preview(generation, self.show_preview_error, f"加载失败: {str(e)}")
+                
+        except Exception as e:
+            self.post_preview(generation, self.show_preview_error, f"发生错误: {str(e)}")
+    
+    def load_sorted_contents(self, folder_path, mtime, sort_mode, generation):
+        """在预览工作线程中扫描整个文件夹，显示最大或最新的项目"""
+        def is_current():
+            return self.preview_loader.is_current(generation)
+        
+        sorted_preview = read_sorted_preview(folder_path, mtime, sort_mode, is_current)
+        if sorted_preview is None:
+            return
+        entries, preview = sorted_preview
+        
+        for rows, progress in iter_preview_batches(entries, is_current):
+            preview.rows.extend(rows)
+            self.post_preview(generation, self.append_preview_rows, rows, progress)
+        if not is_current():
+            return
+        
+        preview.update_size()
+        self.preview_cache.put(preview)
+        self.post_preview(generation, self.finish_file_preview, preview, None, generation)
+    
+    def on_file_tree_scroll(self, scrollbar, first, last):
+        """文件列表滚动：更新滚动条，滚动到底部时加载下一页"""
+        scrollbar.set(first, last)
+        if float(last) >= 1.0:
+            self.load_more_preview()
+    
+    def load_more_preview(self):
+        """由预览工作线程读取下一页（已经在读取或没有更多项目时忽略）"""
+        paging = self.preview_paging
+        if paging is None or paging['loading'] or not self.preview_has_more(paging):
+            return
+        paging['loading'] = True
+        self.update_preview_footer()
+        self.preview_loader.submit(paging['generation'], lambda: self.load_more_contents(paging))
+    
+    def load_more_contents(self, paging):
+        """在预览工作线程中读取下一页，从游标上次停下的位置继续"""
+        generation = paging['generation']
+        
+        def is_current():
+            return self.preview_loader.is_current(generation)
+        
+        cursor = paging['cursor']
+        if cursor is None:
+            # 从缓存恢复的预览没有打开的目录，按已读的项目数重新定位
+            cursor = paging['cursor'] = PreviewCursor(paging['path'], paging['offset'])
+        try:
+            entries = cursor.read_page(is_current)
+        except OSError as e:
+            print(f"加载更多项目失败: {e}")
+            self.post_preview(generation, self.finish_more_preview, paging, paging['offset'], True)
+            return
+        if entries is None:
+            return
+        for rows, _ in iter_preview_batches(entries, is_current):
+            self.post_preview(generation, self.append_more_rows, paging, rows)
+        if is_current():
+            self.post_preview(generation, self.finish_more_preview, paging, cursor.offset, cursor.exhausted)
+    
+    def append_more_rows(self, paging, files_data):
+        """在末尾的提示行前面追加下一页的一批预览行"""
+        if paging is not self.preview_paging:
+            return
+        self.insert_preview_rows(files_data)
+        paging['shown'] += len(files_data)
+        if self.preview_footer is not None:
+            self.file_tree.move(self.preview_footer, '', 'end')
+    
+    def finish_more_preview(self, paging, offset, exhausted):
+        """下一页已经显示：更新分页状态和末尾的提示行"""
+        if paging is not self.preview_paging:
+            return
+        paging['offset'] = offset
+        paging['exhausted'] = exhausted
+        paging['loading'] = False
+        # 计数超时时总数只是下限，已经读到的项目更多时以读到的为准
+        paging['total_count'] = max(paging['total_count'], offset)
+        self.update_preview_footer()
+    
+    @staticmethod
+    def format_preview_cost(preview):
+        """按大小或时间排序时显示排序方式、扫描的项目数和用时"""
+        if preview.scan_seconds is None:
+            return ""
+        return (f"{PREVIEW_SORT_MODES[preview.sort_mode]} {len(preview.rows)} 项 · "
+                f"扫描 {preview.total_count} 项，用时 {preview.scan_seconds * 1000:.0f} 毫秒")
+    
+    def reset_preview_paging(self):
+        """丢弃当前预览的分页状态，关闭打开的目录"""
+        if self.preview_paging is not None and self.preview_paging['cursor'] is not None:
+            self.preview_paging['cursor'].close()
+        self.preview_paging = None
+        self.preview_footer = None
+        self.preview_cost.config(text="")
+    
+    def start_preview_paging(self, preview, cursor, generation):
+        """记录第一页显示后的分页状态，并在标题中显示按大小或时间排序的开销"""
+        self.reset_preview_paging()
+        self.preview_cost.config(text=self.format_preview_cost(preview))
+        self.preview_paging = {
+            'generation': generation,
+            'path': preview.path,
+            'cursor': cursor,
+            'offset': preview.next_offset or 0,
+            'exhausted': preview.next_offset is None,
+            'total_count': preview.total_count,
+            'count_is_exact': preview.count_is_exact,
+            'shown': len(preview.rows),
+            'loading': False,
+        }
+    
+    @staticmethod
+    def preview_has_more(paging):
+        """是否还有没有读取的项目"""
+        if paging['exhausted']:
+            return False
+        return not paging['count_is_exact'] or paging['offset'] < paging['total_count']
+    
+    def show_cached_preview(self, preview, generation):
+        """显示缓存的预览结果"""
+        folder_name = os.path.basename(preview.path) or preview.path
+        self.preview_title.config(text=f"{folder_name}")
+        self.update_file_preview(preview, None, generation)
+    
+    def show_loading_preview(self, folder_path):
+        """显示加载中的提示"""
+        self.reset_preview_paging()
+        # 清空现有项目
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        
+        # 显示加载提示
+        folder_name = os.path.basename(folder_path) or folder_path
+        self.preview_title.config(text=f"{folder_name}")
+        
+        self.file_tree.insert('', 'end', values=(
+            "正在加载...",
+            "",
+            ""
+        ), tags=("loading",))
+        
+        # 配置加载样式
+        self.file_tree.tag_configure("loading", foreground="#4A90E2", font=('', 9, 'italic'))
+        
+        # 已删除状态栏相关功能
+    
+    def update_loading_progress(self, progress):
+        """更新加载进度"""
+        # 更新第一个项目的文本显示进度
+        children = self.file_tree.get_children()
+        if children:
+            first_item = children[0]
+            self.file_tree.item(first_item, values=(f"正在加载... {progress}%", "", ""))
+    
+    def append_preview_rows(self, files_data, progress):
+        """在加载提示下面追加一批预览行，并更新加载进度"""
+        self.insert_preview_rows(files_data)
+        self.update_loading_progress(progress)
+    
+    def finish_file_preview(self, preview, cursor, generation):
+        """第一页的所有批次都已显示：去掉加载提示，加上空文件夹或还有更多项目的提示"""
+        for item in self.file_tree.tag_has("loading"):
+            self.file_tree.delete(item)
+        self.start_preview_paging(preview, cursor, generation)
+        self.update_preview_footer()
+    
+    def update_file_preview(self, preview, cursor, generation):
+        """在主线程中显示预览的第一页"""
+        # 清空现有项目
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        
+        self.insert_preview_rows(preview.rows)
+        self.start_preview_paging(preview, cursor, generation)
+        self.update_preview_footer()
+    
+    def insert_preview_rows(self, files_data):
+        """添加文件项目"""
+        for file_info in files_data:
+            # 根据文件类型设置不同的标签
+            if file_info['is_dir']:
+                tags = ("folder",)
+                # 文件夹前面添加emoji
+                display_name = f"📁 {file_info['name']}"
+            else:
+                tags = ("file",)
+                display_name = file_info['name']
+            
+            self.file_tree.insert('', 'end', values=(
+                display_name,
+                file_info['type'],
+                file_info['size']
+            ), tags=tags)
+        
+        # 配置标签样式
+        self.file_tree.tag_configure("folder", foreground="black")    # 文件夹用黑色
+        self.file_tree.tag_configure("file", foreground="black")      # 文件用黑色
+    
+    def update_preview_footer(self):
+        """更新预览末尾的提示行：文件夹为空、还有多少项目或正在加载更多"""
+        if self.preview_footer is not None:
+            self.file_tree.delete(self.preview_footer)
+            self.preview_footer = None
+        paging = self.preview_paging
+        if paging is None:
+            return
+        
+        # 如果文件夹为空，显示提示信息
+        if paging['exhausted'] and not paging['shown'] and not paging['offset']:
+            self.preview_footer = self.file_tree.insert('', 'end', values=(
+                "文件夹为空",
+                "",
+                ""
+            ), tags=("empty",))
+            
+            # 配置空文件夹样式
+            self.file_tree.tag_configure("empty", foreground="#888888", font=('', 10, 'italic'))
+            return
+        
+        if paging['loading']:
+            text = "正在加载更多..."
+        elif self.preview_has_more(paging):
+            remaining = paging['total_count'] - paging['offset']
+            if paging['count_is_exact']:
+                text = f"... 还有 {remaining} 个项目，滚动到底部加载更多"
+            elif remaining > 0:
+                text = f"... 还有超过 {remaining} 个项目，滚动到底部加载更多"
+            else:
+                text = "... 还有更多项目，滚动到底部加载更多"
+        else:
+            return
+        
+        # 添加提示信息
+        self.preview_footer = self.file_tree.insert('', 'end', values=(text, "提示", ""), tags=("info",))
+        self.file_tree.tag_configure("info", foreground="#888888", font=('', 9, 'italic'))  # 提示信息用灰色斜体
+    
+    def show_preview_error(self, error_msg):
+        """显示预览错误信息"""
+        self.reset_preview_paging()
+        # 清空文件列表
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        
+        # 添加错误信息项
+        self.file_tree.insert('', 'end', values=(error_msg, "", ""), tags=("error",))
+        self.file_tree.tag_configure("error", foreground="red")
+    
+    def on_file_double_click(self, event):
+        """文件列表双击事件：打开文件或文件夹"""
+        self.open_selected_file()
+    
+    def on_file_enter_key(self, event):
+        """文件列表回车键事件：打开文件或文件夹"""
+        self.open_selected_file()
+        return 'break'  # 阻止默认行为
+    
+    def open_selected_file(self):
+        """打开选中的文件或文件夹"""
+        selected_items = self.file_tree.selection()
+        if not selected_items:
+            return
+        
+        item = selected_items[0]
+        values = self.file_tree.item(item, 'values')
+        
+        if len(values) < 3:
+            return  # 错误信息项，不处理
+        
+        displayed_name = values[0]
+        file_type = values[1]
+        
+        # 如果是文件夹（带emoji），需要去掉emoji前缀
+        if displayed_name.startswith("📁 "):
+            actual_name = displayed_name[2:]  # 去掉 "📁 " 前缀
+        else:
+            actual_name = displayed_name
+        
+        # 获取当前选中的文件夹路径
+        folder_path = self.folder_list.selected_path
+        if folder_path is None:
+            return
+        file_path = os.path.join(folder_path, actual_name)
+        
+        try:
+            if os.path.exists(file_path):
+                # 使用系统默认程序打开文件/文件夹
+                os.startfile(file_path)
+                
+                # 记录文件夹打开历史（因为打开了文件夹中的文件）
+                self.index.record_folder_open(folder_path)
+                
+                # 将该文件夹移到最前面
+                self.move_folder_to_top(folder_path)
+                
+                # 手动将焦点转移到左侧（因为move_folder_to_top已经选中了文件夹）
+                self.tree.focus_set()
+                self.current_panel = 'left'
+                
+                # 已移除状态栏显示功能
+            else:
+                messagebox.showwarning("警告", f"文件不存在: {actual_name}")
+        except Exception as e:
+            messagebox.showerror("错误", f"打开文件失败: {str(e)}")
+    
+    def on_closing(self):
+        """程序关闭时的处理"""
+        # 停止预览加载，取消智能标签生成，保存设置并关闭历史数据库
+        self.preview_loader.close()
+        self.index.close()
+        
+        # 清理全局快捷键
+        try:
+            import keyboard
+            keyboard.unhook_all_hotkeys()
+        except:
+            pass
+        
+        # 停止托盘图标
+        if self.tray_icon:
+            self.tray_icon.stop()
+        
+        # 关闭窗口
+        self.root.destroy()
+    
+    def refresh_folders(self):
+        """刷新文件夹列表"""
+        self.load_recent_folders()
+    
+    def on_tree_right_key(self, event):
+        """在左侧列表中按下右方向键时切换到右侧面板"""
+        # 阻止默认的右方向键行为（可能会触发其他事件）
+        
+        # 设置当前面板为右侧
+        self.current_panel = 'right'
+        
+        # 将焦点设置到右侧的文件列表
+        self.file_tree.focus_set()
+        
+        # 如果右侧列表有项目但没有选中项，选中第一个
+        if self.file_tree.get_children() and not self.file_tree.selection():
+            first_item = self.file_tree.get_children()[0]
+            self.file_tree.selection_set(first_item)
+            self.file_tree.focus(first_item)
+        
+        return 'break'  # 阻止默认行为和事件传播
+    
+    def on_file_tree_left_key(self, event):
+        """在右侧列表中按下左方向键时切换到左侧面板"""
+        # 设置当前面板为左侧
+        self.current_panel = 'left'
+        
+        # 清除右侧列表的选中状态
+        self.file_tree.selection_remove(self.file_tree.selection())
+        
+        # 将焦点设置到左侧的文件夹列表
+        self.tree.focus_set()
+        
+        # 如果左侧列表有项目但没有选中项，选中第一个
+        if self.folder_list.selected_path is None:
+            self.folder_list.select_index(0)
+        
+        return 'break'  # 阻止默认行为和事件传播
+    
+    def show_context_menu(self, event):
+        """显示右键菜单"""
+        # 获取点击的项目
+        item = self.tree.identify_row(event.y)
+        if item:
+            # 选中该项目
+            self.tree.selection_set(item)
+            self.tree.focus(item)
+            
+            # 获取路径
+            path = self.tree.item(item, 'values')[0]
+            
+            # 根据是否有注释更新菜单项状态
+            if self.index.get_comment(path):
+                self.context_menu.entryconfig(1, state="normal")  # 删除注释菜单项
+            else:
+                self.context_menu.entryconfig(1, state="disabled")  # 禁用删除注释菜单项
+            
+            # 显示菜单
+            try:
+                self.context_menu.tk_popup(event.x_root, event.y_root)
+            finally:
+                self.context_menu.grab_release()
+    
+    def edit_comment(self):
+        """编辑选中文件夹的注释"""
+        path = self.folder_list.selected_path
+        if path is None:
+            return
+        
+        # 获取当前注释
+        current_comment = self.index.get_comment(path)
+        
+        # 创建编辑对话框
+        self.show_comment_dialog(path, current_comment)
+    
+    def show_comment_dialog(self, path, current_comment):
+        """显示注释编辑对话框"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("编辑文件夹注释")
+        dialog.geometry("500x300")
+        dialog.resizable(True, True)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # 居中显示
+        dialog.geometry("+%d+%d" % (
+            self.root.winfo_rootx() + 50,
+            self.root.winfo_rooty() + 50
+        ))
+        
+        # 主框架
+        main_frame = ttk.Frame(dialog, padding="10")
+        main_frame.pack(fill="both", expand=True)
+        
+        # 文件夹路径标签
+        folder_name = os.path.basename(path) or path
+        ttk.Label(main_frame, text=f"文件夹: {folder_name}", font=('', 10, 'bold')).pack(anchor="w")
+        ttk.Label(main_frame, text=path, font=('', 8), foreground="gray").pack(anchor="w", pady=(0, 10))
+        
+        # 注释输入框
+        ttk.Label(main_frame, text="注释:").pack(anchor="w")
+        
+        # 创建文本框和滚动条
+        text_frame = ttk.Frame(main_frame)
+        text_frame.pack(fill="both", expand=True, pady=(5, 10))
+        
+        comment_text = tk.Text(text_frame, wrap="word", height=8)
+        scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=comment_text.yview)
+        comment_text.configure(yscrollcommand=scrollbar.set)
+        
+        comment_text.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        
+        # 设置当前注释内容
+        comment_text.insert("1.0", current_comment)
+        comment_text.focus_set()
+        
+        # 按钮框架
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill="x")
+        
+        def save_comment():
+            """保存注释"""
+            new_comment = comment_text.get("1.0", "end-1c").strip()
+            # 如果注释为空，删除该注释（索引会保存配置）
+            self.index.set_comment(path, new_comment)
+            
+            # 刷新显示
+            self.update_folder_display()
+            
+            dialog.destroy()
+        
+        def cancel_edit():
+            """取消编辑"""
+            dialog.destroy()
+        
+        # 保存和取消按钮
+        ttk.Button(button_frame, text="保存", command=save_comment).pack(side="right", padx=(5, 0))
+        ttk.Button(button_frame, text="取消", command=cancel_edit).pack(side="right")
+        
+        # 绑定快捷键
+        dialog.bind('<Control-Return>', lambda e: save_comment())
+        dialog.bind('<Escape>', lambda e: cancel_edit())
+        
+        # 选中所有文本便于编辑
+        comment_text.tag_add("sel", "1.0", "end")
+        comment_text.mark_set("insert", "end")
+    
+    def delete_comment(self):
+        """删除选中文件夹的注释"""
+        path = self.folder_list.selected_path
+        if path is None:
+            return
+        
+        if self.index.get_comment(path):
+            if messagebox.askyesno("确认删除", "确定要删除这个文件夹的注释吗？"):
+                self.index.delete_comment(path)
+                self.update_folder_display()
+    
+    def open_selected_folder(self):
+        """打开选中的文件夹"""
+        if self.folder_list.selected_path is None:
+            return
+        
+        # 复用双击事件的逻辑
+        fake_event = type('Event', (), {})()
+        self.on_double_click(fake_event)
+    
+    def copy_selected_path(self):
+        """复制选中文件夹的路径"""
+        path = self.folder_list.selected_path
+        if path is None:
+            return
+        try:
+            import pyperclip
+            pyperclip.copy(path)
+            # 可以添加一个简短的提示
+            self.root.title("Windows 最近访问文件夹查看器 - 路径已复制")
+            self.root.after(2000, lambda: self.root.title("Windows 最近访问文件夹查看器"))
+        except Exception as e:
+            messagebox.showerror("错误", f"复制到剪贴板失败: {str(e)}")
+    
+    def update_folder_display(self):
+        """更新文件夹显示（用于在编辑注释后刷新显示）"""
+        # 重新应用过滤器以更新显示，保持滚动位置；只有注释变化的行会更新注释列
+        self.apply_filter(keep_position=True)
+    
+    def filter_by_category(self, category):
+        """根据分类过滤文件夹"""
+        # 存储当前选择的分类
+        self.current_category = category
+        
+        if category == "":
+            # 显示全部，清空搜索框
+            self.search_var.set("")
+        
+        # 应用过滤（不修改搜索框内容）
+        self.apply_category_filter(category)
+    
+    def apply_category_filter(self, category, keep_position=False):
+        """应用分类过滤"""
+        # 根据分类和搜索文本（用于额外的文本过滤）过滤数据
+        self.filtered_data = self.index.filter_folders(self.search_var.get(), category)
+        self.render_folder_rows(keep_position)
+    
+    def generate_smart_tags(self):
+        """生成智能标签（延迟执行）"""
+        # 延迟执行，等待文件夹数据加载完成
+        self.root.after(3000, self._generate_smart_tags_async)
+    
+    def _generate_smart_tags_async(self):
+        """在后台任务中生成智能标签（已有任务在运行时先取消它）"""
+        if not self.index.folders_data:
+            return
+        
+        def report_progress(completed, total):
+            self.root.after(0, self.show_smart_tags_progress, completed, total)
+        
+        def on_done(processed_count):
+            # 在主线程中更新显示
+            self.root.after(0, self.on_smart_tags_done, processed_count)
+        
+        # 只为没有注释的文件夹生成标签（增量生成），索引会保存结果
+        self.index.start_smart_tags_job(report_progress, on_done)
+    
+    def show_smart_tags_progress(self, completed, total):
+        """在注释列标题中显示智能标签生成进度"""
+        if completed < total:
+            self.tree.heading('comment', text=f"注释（正在生成标签 {completed}/{total}）")
+        else:
+            self.tree.heading('comment', text="注释")
+    
+    def on_smart_tags_done(self, processed_count):
+        """智能标签生成完成"""
+        self.tree.heading('comment', text="注释")
+        if processed_count:
+            self.update_folder_display()
+    
+    def auto_generate_comment(self):
+        """为选中的文件夹自动生成注释"""
+        path = self.folder_list.selected_path
+        if path is None:
+            messagebox.showinfo("提示", "请先选择一个文件夹")
+            return
+        
+        try:
+            # 与批量生成使用同一个关键词分类器，只看路径和打开次数
+            auto_comment = self.index.generate_path_comment(path)
+            self.update_folder_display()
+            messagebox.showinfo("完成", f"已为文件夹生成智能注释:\n{auto_comment}")
+        except Exception as e:
+            messagebox.showerror("错误", f"生成注释失败: {str(e)}")
+    
+    def regenerate_all_smart_tags(self):
+        """重新生成所有智能标签"""
+        if not self.index.folders_data:
+            messagebox.showinfo("提示", "没有文件夹数据可处理")
+            return
+        
+        # 创建一个选择对话框
+        dialog = tk.Toplevel(self.root)
+        dialog.title("重新生成智能标签")
+        dialog.geometry("400x200")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # 居中显示
+        dialog.geometry("+%d+%d" % (
+            self.root.winfo_rootx() + 100,
+            self.root.winfo_rooty() + 100
+        ))
+        
+        # 主框架
+        main_frame = ttk.Frame(dialog, padding="20")
+        main_frame.pack(fill="both", expand=True)
+        
+        # 说明标签
+        ttk.Label(main_frame, text="选择要重新生成标签的文件夹:", font=('', 10, 'bold')).pack(anchor="w", pady=(0, 10))
+        
+        # 选项变量
+        option_var = tk.StringVar(value="auto_only")
+        
+        # 选项1：只重新生成自动标签
+        ttk.Radiobutton(
+            main_frame, 
+            text="只重新生成自动标签（以 [ 开头的注释）",
+            variable=option_var,
+            value="auto_only"
+        ).pack(anchor="w", pady=2)
+        
+        # 选项2：为所有没有标签的文件夹生成标签
+        ttk.Radiobutton(
+            main_frame, 
+            text="只为没有任何标签的文件夹生成标签",
+            variable=option_var,
+            value="no_tags_only"
+        ).pack(anchor="w", pady=2)
+        
+        # 选项3：完全重新生成所有标签
+        ttk.Radiobutton(
+            main_frame, 
+            text="完全重新生成所有标签（会覆盖手动注释）",
+            variable=option_var,
+            value="all"
+        ).pack(anchor="w", pady=2)
+        
+        # 按钮框架
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill="x", pady=(20, 0))
+        
+        def start_regeneration():
+            """开始重新生成"""
+            option = option_var.get()
+            dialog.destroy()
+            
+            if option == "auto_only":
+                # 只重新生成自动标签：清空自动注释及对应的智能标签和分类
+                # （先取消正在运行的生成任务，它的结果不会在清空之后再写入）
+                self.index.cancel_smart_tags_job()
+                auto_count = self.index.clear_auto_smart_tags()
+                
+                messagebox.showinfo("开始处理", f"正在后台重新生成 {auto_count} 个自动标签，请稍等...")
+                
+            elif option == "no_tags_only":
+                # 只为没有标签的生成（这是增量生成，使用现有逻辑）
+                messagebox.showinfo("开始处理", "正在后台为没有标签的文件夹生成智能标签，请稍等...")
+                
+            else:  # option == "all"
+                # 完全重新生成（覆盖所有）
+                result = messagebox.askyesno(
+                    "最终确认", 
+                    "这将删除所有现有注释（包括手动添加的），\n并重新生成智能标签。\n\n此操作不可撤销，确定继续吗？"
+                )
+                
+                if not result:
+                    return
+                
+                # 清空所有注释、标签和分类
+                self.index.cancel_smart_tags_job()
+                self.index.clear_all_comments()
+                self.warm_search_index()
+                
+                messagebox.showinfo("开始处理", "正在后台重新生成所有智能标签，请稍等...")
+            
+            # 执行重新生成
+            self._generate_smart_tags_async()
+        
+        def cancel_regeneration():
+            """取消操作"""
+            dialog.destroy()
+        
+        # 按钮
+        ttk.Button(button_frame, text="开始生成", command=start_regeneration).pack(side="right", padx=(5, 0))
+        ttk.Button(button_frame, text="取消", command=cancel_regeneration).pack(side="right")
+        
+        # 绑定快捷键
+        dialog.bind('<Return>', lambda e: start_regeneration())
+        dialog.bind('<Escape>', lambda e: cancel_regeneration())
+    
+    def regenerate_single_tag(self):
+        """重新生成选中文件夹的智能标签"""
+        path = self.folder_list.selected_path
+        if path is None:
+            messagebox.showinfo("提示", "请先选择一个文件夹")
+            return
+        
+        # 询问用户是否确认
+        folder_name = os.path.basename(path) or path
+        result = messagebox.askyesno(
+            "确认操作", 
+            f"这将重新生成文件夹「{folder_name}」的智能标签。\n\n确定继续吗？"
+        )
+        
+        if not result:
+            return
+        
+        # 删除现有的自动生成注释（保留手动注释）、智能标签和分类
+        self.index.clear_smart_tag(path)
+        
+        # 为单个文件夹生成智能标签
+        def generate_single_in_thread():
+            try:
+                auto_comment = self.index.regenerate_smart_tag(path)
+                if auto_comment is None:
+                    self.root.after(0, lambda: messagebox.showerror("错误", "找不到文件夹数据"))
+                    return
+                
+                print(f"为文件夹 {path} 生成智能标签: {auto_comment}")
+                
+                # 更新显示
+                self.root.after(0, self.update_folder_display)
+                self.root.after(0, lambda: messagebox.showinfo("完成", f"已重新生成智能标签:\n{auto_comment}"))
+                
+            except Exception as e:
+                print(f"生成单个智能标签时出错: {e}")
+                error_msg = f"生成标签失败: {str(e)}"
+                self.root.after(0, lambda: messagebox.showerror("错误", error_msg))
+        
+        # 在后台线程中执行
+        threading.Thread(target=generate_single_in_thread, daemon=True).start()
+
+def main(startup_report=False, started_at=None):
+    """启动图形界面，startup_report 为True时打印启动各阶段耗时"""
+    try:
+        startup_timer = StartupTimer(startup_report, started_at)
+        root = tk.Tk()
+        app = RecentFoldersViewer(root, startup_timer)
+        root.mainloop()
+    except Exception as e:
+        messagebox.showerror("启动错误", f"程序启动失败: {str(e)}")
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+Recent 文件夹扫描流水线
+- 列出 Recent 文件夹中的 .lnk 文件（按修改时间倒序）
+- 使用线程池/进程池并行解析快捷方式，命中缓存的直接复用
+- 按原有的"最新优先 + seen_paths 去重"规则生成候选文件夹
+- 在有超时限制的线程池中验证候选文件夹是否存在（按父目录批量列出），按卷熔断无响应的驱动器/共享
+"""
+
+import ntpath
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from folder_record import FolderRecord
+from lnk_parser import read_lnk, LnkParseError
+
+
+# 待解析的快捷方式少于该数量时直接在当前线程解析，避免启动进程池的开销
+PARALLEL_THRESHOLD = 200
+
+# 文件夹存在状态：True 存在，False 不存在，None 未知（检查超时或所在卷已熔断）
+EXISTS_UNKNOWN = None
+
+
+def get_recent_path():
+    """返回Windows Recent文件夹路径，不存在时返回None"""
+    appdata = os.environ.get('APPDATA')
+    if not appdata:
+        return None
+    recent_path = os.path.join(appdata, 'Microsoft', 'Windows', 'Recent')
+    if not os.path.exists(recent_path):
+        return None
+    return recent_path
+
+
+def list_lnk_files(recent_path):
+    """列出目录中的.lnk文件及其大小、修改时间，按修改时间倒序排列"""
+    lnk_files_info = []
+    with os.scandir(recent_path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith('.lnk') and entry.is_file():
+                try:
+                    stat_info = entry.stat()
+                    lnk_files_info.append({
+                        'name': entry.name,
+                        'path': entry.path,
+                        'size': stat_info.st_size,
+                        'mtime': stat_info.st_mtime
+                    })
+                except (OSError, PermissionError):
+                    continue
+
+    # 按修改时间排序，优先处理最新的文件
+    lnk_files_info.sort(key=lambda x: x['mtime'], reverse=True)
+    return lnk_files_info
+
+
+def _resolve_one(lnk_file):
+    """解析单个快捷方式（在工作线程/进程中执行）
+
+    返回 (target, is_direct)；格式无法解析时返回None，由调用方回退到COM；
+    文件无法读取时返回 ("", None)。一个损坏的快捷方式不能影响其他快捷方式的解析。
+    """
+    try:
+        target = read_lnk(lnk_file)
+        return target.path, target.is_dir
+    except OSError:
+        return "", None
+    except Exception as e:
+        if not isinstance(e, LnkParseError):
+            print(f"解析快捷方式 {lnk_file} 时出错: {e}")
+        return None
+
+
+def _resolve_with_com(lnk_file, shell_holder):
+    """使用WScript.Shell解析快捷方式（只在主扫描线程中使用）"""
+    try:
+        if not shell_holder:
+            import win32com.client
+            shell_holder.append(win32com.client.Dispatch("WScript.Shell"))
+        return shell_holder[0].CreateShortCut(lnk_file).Targetpath, None
+    except Exception:
+        return "", None
+
+
+def _create_executor(workers, executor_kind):
+    """创建解析用的工作池"""
+    if executor_kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    # 进程池会加载 multiprocessing，只在真正需要时导入，命令行查询模式启动更快
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def resolve_links(lnk_files_info, link_cache=None, workers=0, executor_kind='process'):
+    """解析所有快捷方式，返回与输入顺序一致的 [(target, is_direct), ...]
+
+    workers 为0时使用CPU核心数；executor_kind 为 'process' 或 'thread'。
+    """
+    results = [None] * len(lnk_files_info)
+    pending = []
+
+    # 先查缓存，只解析新增或变化的快捷方式
+    for i, lnk_info in enumerate(lnk_files_info):
+        if link_cache is not None:
+            cached = link_cache.lookup(lnk_info['name'], lnk_info['size'], lnk_info['mtime'])
+            if cached is not None:
+                results[i] = tuple(cached)
+                continue
+        pending.append(i)
+
+    start_time = time.perf_counter()
+    pending_paths = [lnk_files_info[i]['path'] for i in pending]
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(pending) >= PARALLEL_THRESHOLD:
+        # 每个任务批量处理一组文件，减少进程间通信的次数
+        chunk_size = max(1, min(256, len(pending) // (workers * 4)))
+        try:
+            with _create_executor(workers, executor_kind) as executor:
+                resolved = list(executor.map(_resolve_one, pending_paths, chunksize=chunk_size))
+        except Exception as e:
+            # 进程池不可用时（例如受限环境）退回到单线程解析
+            print(f"并行解析失败，改为顺序解析: {e}")
+            resolved = [_resolve_one(path) for path in pending_paths]
+    else:
+        workers = 1
+        resolved = [_resolve_one(path) for path in pending_paths]
+
+    # 二进制解析失败的快捷方式回退到COM；COM对象只能在当前线程中使用
+    shell_holder = []
+    for i, result in zip(pending, resolved):
+        lnk_info = lnk_files_info[i]
+        if result is None:
+            result = _resolve_with_com(lnk_info['path'], shell_holder)
+        results[i] = result
+        if link_cache is not None:
+            link_cache.store(lnk_info['name'], lnk_info['size'], lnk_info['mtime'],
+                             result[0], result[1])
+
+    elapsed = time.perf_counter() - start_time
+    if pending:
+        rate = len(pending) / elapsed if elapsed > 0 else float('inf')
+        print(f"解析 {len(pending)} 个快捷方式，用时 {elapsed * 1000:.0f} ms，"
+              f"{rate:.0f} 个/秒（{workers} 个工作{'线程' if executor_kind == 'thread' else '进程'}）")
+
+    return results
+
+
+def build_folder_candidates(lnk_files_info, resolved):
+    """按最新优先的顺序生成候选文件夹，使用seen_paths去重"""
+    seen_paths = set()
+    folder_candidates = []
+
+    for lnk_info, (target_path, is_direct) in zip(lnk_files_info, resolved):
+        if not target_path:
+            continue
+
+        # 规范化路径用于去重
+        normalized_target = os.path.normpath(target_path).lower()
+
+        # 收集候选路径（延迟文件系统检查），访问时间直接使用快捷方式的修改时间戳
+        timestamp = lnk_info['mtime']
+
+        # 如果目标路径本身可能是文件夹（已知是文件的跳过）
+        if is_direct is not False and normalized_target not in seen_paths:
+            seen_paths.add(normalized_target)
+            folder_candidates.append({
+                'path': target_path,
+                'timestamp': timestamp,
+                'is_direct': True
+            })
+
+        # 如果目标是文件，添加父目录
+        parent_dir = os.path.dirname(target_path)
+        if parent_dir:
+            normalized_parent = os.path.normpath(parent_dir).lower()
+            if normalized_parent not in seen_paths:
+                seen_paths.add(normalized_parent)
+                folder_candidates.append({
+                    'path': parent_dir,
+                    'timestamp': timestamp,
+                    'is_direct': False
+                })
+
+    return folder_candidates
+
+
+def volume_of(path):
+    """返回路径所在的卷，例如 "c:" 或 "\\\\server\\share"，用于按卷熔断"""
+    drive = ntpath.splitdrive(path)[0]
+    return drive.lower() if drive else os.sep
+
+
+class DaemonPool:
+    """使用守护线程的简单工作池
+
+    卡在无响应网络路径上的线程无法被中断，标准线程池在退出时会等待它们；
+    这里的线程都是守护线程，并且可以在任务超时后补充新的工作线程。
+    """
+
+    def __init__(self, workers):
+        self.tasks = queue.Queue()
+        self.lock = threading.Lock()
+        self.abandoned = set()
+        self.worker_count = 0
+        for _ in range(workers):
+            self.add_worker()
+
+    def add_worker(self):
+        with self.lock:
+            self.worker_count += 1
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def abandon(self, future):
+        """放弃一个卡住的任务并补充新线程，卡住的线程恢复后自行退出"""
+        with self.lock:
+            self.abandoned.add(future)
+        self.add_worker()
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.tasks.put((future, fn, args))
+        return future
+
+    def shutdown(self):
+        """让空闲的工作线程退出（不等待卡住的线程）"""
+        with self.lock:
+            worker_count = self.worker_count
+        for _ in range(worker_count):
+            self.tasks.put(None)
+
+    def _worker(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                with self.lock:
+                    self.worker_count -= 1
+                return
+            future, fn, args = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            with self.lock:
+                if future in self.abandoned:
+                    self.abandoned.discard(future)
+                    self.worker_count -= 1
+                    return
+
+
+class _VolumeBreaker:
+    """按卷统计超时次数，超过阈值后跳过该卷上剩余的路径"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.timeouts = {}
+        self.tripped = set()
+
+    def is_tripped(self, volume):
+        return volume in self.tripped
+
+    def record_timeout(self, volume):
+        self.timeouts[volume] = self.timeouts.get(volume, 0) + 1
+        if self.timeouts[volume] >= self.threshold and volume not in self.tripped:
+            self.tripped.add(volume)
+            print(f"卷 {volume} 连续 {self.timeouts[volume]} 次检查超时，跳过该卷上的其余文件夹")
+
+
+def _isdir(path):
+    """单独检查一个路径是否为文件夹"""
+    try:
+        return os.path.isdir(path)
+    except (OSError, PermissionError):
+        return False
+
+
+def _strip_separators(path):
+    """去掉末尾的路径分隔符（驱动器根目录等只有分隔符的路径保持不变）"""
+    return path.rstrip('\\/') or path
+
+
+def _child_name(path):
+    """路径在父目录中的名称，末尾带分隔符的路径也能得到正确的名称"""
+    return os.path.normcase(os.path.basename(_strip_separators(path)))
+
+
+def _probe_paths(paths, breaker, started):
+    """在工作线程中逐个检查路径，所在卷已熔断时直接返回未知"""
+    if breaker.is_tripped(volume_of(paths[0])):
+        return [EXISTS_UNKNOWN] * len(paths)
+    started.append(time.monotonic())
+    return [_isdir(path) for path in paths]
+
+
+def _probe_parent(parent, paths, breaker, started):
+    """在工作线程中列出一次父目录，同时回答其下所有子文件夹是否存在
+
+    父目录不存在时所有子项都不存在；父目录无法列出（例如没有列目录权限）时
+    退回到逐个检查。
+    """
+    if breaker.is_tripped(volume_of(parent)):
+        return [EXISTS_UNKNOWN] * len(paths)
+    started.append(time.monotonic())
+
+    names = [_child_name(path) for path in paths]
+    wanted = set(names)
+    found = set()
+    try:
+        with os.scandir(parent) as entries:
+            for entry in entries:
+                name = os.path.normcase(entry.name)
+                if name in wanted:
+                    try:
+                        if entry.is_dir():
+                            found.add(name)
+                    except OSError:
+                        pass
+                    wanted.discard(name)
+                    # 所有子项都已找到，不必列完整个目录
+                    if not wanted:
+                        break
+    except (FileNotFoundError, NotADirectoryError):
+        return [False] * len(paths)
+    except (OSError, PermissionError):
+        return [_isdir(path) for path in paths]
+
+    return [name in found for name in names]
+
+
+def _group_by_parent(folder_candidates):
+    """把候选文件夹按父目录分组，返回 [(parent, [候选索引, ...]), ...]
+
+    只有一个子项的父目录、以及没有父目录的路径（如驱动器根目录）的 parent 为None，
+    表示逐个检查更划算。
+    """
+    groups = {}
+    for i, candidate in enumerate(folder_candidates):
+        path = _strip_separators(candidate['path'])
+        parent = os.path.dirname(path)
+        if not parent or parent == path or not os.path.basename(path):
+            key = None
+        else:
+            key = os.path.normcase(parent)
+        groups.setdefault(key, (parent, []))[1].append(i)
+
+    work = []
+    for key, (parent, indices) in groups.items():
+        if key is None or len(indices) == 1:
+            work.extend((None, [i]) for i in indices)
+        else:
+            work.append((parent, indices))
+    return work
+
+
+def verify_candidates(folder_candidates, workers=16, timeout=2.0, breaker_threshold=3,
+                      group_by_parent=True):
+    """并发验证候选文件夹是否存在
+
+    同一父目录下的候选文件夹通过一次 os.scandir 批量回答（group_by_parent=False
+    时逐个调用 os.path.isdir）。每个检查任务最多等待 timeout 秒，超时的记为未知；
+    同一卷超时达到 breaker_threshold 次后，该卷上剩余的路径不再检查，同样记为未知。
+    返回保持候选顺序的 FolderRecord 列表，不存在的文件夹被丢弃。
+    """
+    if not folder_candidates:
+        return []
+
+    if group_by_parent:
+        work = _group_by_parent(folder_candidates)
+    else:
+        work = [(None, [i]) for i in range(len(folder_candidates))]
+
+    breaker = _VolumeBreaker(breaker_threshold)
+    pool = DaemonPool(min(workers, len(work)))
+    statuses = [EXISTS_UNKNOWN] * len(folder_candidates)
+    pending = {}
+
+    try:
+        for parent, indices in work:
+            started = []
+            paths = [folder_candidates[i]['path'] for i in indices]
+            if parent is None:
+                future = pool.submit(_probe_paths, paths, breaker, started)
+            else:
+                future = pool.submit(_probe_parent, parent, paths, breaker, started)
+            pending[future] = (indices, started)
+
+        while pending:
+            done, _ = wait(list(pending), timeout=min(0.05, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                indices, _started = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception:
+                    results = [False] * len(indices)
+                for i, status in zip(indices, results):
+                    statuses[i] = status
+
+            # 检查正在运行的任务是否超时
+            now = time.monotonic()
+            for future, (indices, started) in list(pending.items()):
+                if started and now - started[0] > timeout:
+                    del pending[future]
+                    for i in indices:
+                        statuses[i] = EXISTS_UNKNOWN
+                    breaker.record_timeout(volume_of(folder_candidates[indices[0]]['path']))
+                    pool.abandon(future)
+    finally:
+        pool.shutdown()
+
+    folders = []
+    unknown_count = 0
+    for candidate, status in zip(folder_candidates, statuses):
+        if status is False:
+            continue
+        if status is EXISTS_UNKNOWN:
+            unknown_count += 1
+        folders.append(FolderRecord(candidate['path'], candidate['timestamp'], status))
+
+    if unknown_count:
+        print(f"{unknown_count} 个文件夹检查超时或所在卷无响应，状态未知")
+    return folders
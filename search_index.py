@@ -0,0 +1,571 @@
+# -*- coding: utf-8 -*-
+"""
+文件夹搜索索引
+对路径和注释（casefold 后）建立三字母组(trigram)倒排索引，子串查询通过求倒排表交集得到候选，
+再逐个确认；少于三个字符的查询直接线性扫描。
+索引以路径为键，注释变化时只更新对应路径的倒排表。
+2万个文件夹建立倒排表要几百毫秒，所以重建时不建立，调用 build_postings 之前子串查询都线性扫描
+（在C层面完成，只需几毫秒），命令行中只查询一次时不需要倒排表。
+
+模糊搜索按 fzf 的方式把查询当作路径的子序列匹配（"prjapi" 可以找到 "D:\\projects\\api"），
+每个路径预先计算字符位掩码，缺少查询字符的路径直接跳过；其余路径先用编译好的正则表达式
+确认是子序列，只有真正匹配的路径才计算分数。
+
+查询结果按数据版本缓存在一个小的LRU中：新查询包含缓存中的某个查询时（例如继续输入），
+只在旧结果里继续筛选；退格回到刚查过的查询时直接返回缓存结果。
+这样输入时每次按键的耗时取决于上一次结果的大小，而不是文件夹总数。
+
+文件夹较多且安装了 numpy 时，模糊匹配和评分改为向量化计算（FuzzyArrays）：所有路径拼接成一个字符码数组，
+每个查询字符用二分查找在该字符的出现位置中找到每个路径的下一个匹配位置，结果与纯Python完全相同。
+
+智能标签在后台线程中更新注释，界面线程同时在搜索，所以索引的所有读写都持有同一把锁。
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from itertools import compress, repeat
+from operator import contains
+
+from frecency import load_numpy
+
+
+# 路径和注释之间的分隔符，查询文本中不会出现，保证匹配不会跨越路径和注释
+FIELD_SEPARATOR = '\0'
+
+TRIGRAM_SIZE = 3
+
+# 少于这个长度的查询匹配面太广，只做子串匹配
+FUZZY_MIN_LENGTH = 3
+
+# 模糊匹配评分
+SCORE_MATCH = 16          # 每个匹配字符的基础分
+BONUS_SEGMENT = 10        # 匹配在路径段开头（\ 或 / 之后）
+BONUS_BOUNDARY = 8        # 匹配在单词开头（空格、_、-、. 之后）
+BONUS_CONSECUTIVE = 6     # 与上一个匹配字符相邻
+BONUS_BASENAME = 4        # 匹配在最后一段（文件夹名）中
+PENALTY_GAP_START = 3     # 两个匹配字符之间出现间隔
+PENALTY_GAP_EXTENSION = 1 # 间隔每多一个字符
+MAX_GAP_PENALTY = 12
+
+# 匹配字符前面是这些字符时的加分
+BOUNDARY_BONUS = {
+    '\\': BONUS_SEGMENT, '/': BONUS_SEGMENT,
+    ' ': BONUS_BOUNDARY, '_': BONUS_BOUNDARY, '-': BONUS_BOUNDARY, '.': BONUS_BOUNDARY,
+}
+
+# 分数相差在同一档内的结果保持原有优先级顺序
+SCORE_BUCKET = 16
+
+# 缓存最近多少个查询的结果
+QUERY_CACHE_SIZE = 32
+
+# 路径数量达到这个值时才尝试用 numpy 做模糊搜索；在旧结果中继续筛选时，旧结果达到
+# NUMPY_MIN_CANDIDATES 个才使用 numpy 和倒排表查找注释匹配，更少时逐个确认更快
+NUMPY_MIN_PATHS = 5000
+NUMPY_MIN_CANDIDATES = 1000
+
+
+def normalize_text(text):
+    """搜索统一使用 casefold，比 lower 更适合大小写不敏感的比较"""
+    return text.casefold()
+
+
+def iter_trigrams(text):
+    """返回文本中所有不重复的三字母组"""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def _ascii_char_bits():
+    """ASCII字符对应的掩码位：字母和数字各占一位，其他符号共用4位"""
+    bits = []
+    for code in range(128):
+        ch = chr(code)
+        if 'a' <= ch <= 'z':
+            bits.append(1 << (code - ord('a')))
+        elif '0' <= ch <= '9':
+            bits.append(1 << (26 + code - ord('0')))
+        else:
+            bits.append(1 << (36 + code % 4))
+    return bits
+
+
+ASCII_CHAR_BITS = _ascii_char_bits()
+
+
+def char_mask(text):
+    """字符位掩码（64位），用于快速排除不包含查询字符的路径
+
+    casefold 后的字母和数字各占一位，其他ASCII符号共用4位，非ASCII字符（如中文）散列到剩下的24位。
+    """
+    mask = 0
+    for ch in set(text):
+        code = ord(ch)
+        if code < 128:
+            mask |= ASCII_CHAR_BITS[code]
+        else:
+            mask |= 1 << (40 + code % 24)
+    return mask
+
+
+def _possessive_suffix():
+    """Python 3.11 起正则支持占有量词 *+，匹配失败时不回溯，速度快几倍；旧版本退回普通的 *"""
+    try:
+        re.compile('a*+')
+        return '+'
+    except re.error:
+        return ''
+
+
+POSSESSIVE = _possessive_suffix()
+
+
+def compile_fuzzy_pattern(query):
+    """把查询编译成子序列正则，用 match 从文本开头匹配
+
+    每个字符一个分组，字符前用 [^c]* 跳到该字符第一次出现的位置，相当于正向贪心匹配：
+    从第一个可能的位置匹配不上时，从后面的位置也不可能匹配，所以只需要尝试一次。
+    """
+    parts = []
+    for ch in query:
+        escaped = re.escape(ch)
+        parts.append(f'[^{escaped}]*{POSSESSIVE}({escaped})')
+    return re.compile(''.join(parts))
+
+
+def basename_offset(text, end=None):
+    """返回最后一段（文件夹名）在 text[:end] 中的起始位置，忽略末尾的分隔符"""
+    if end is None:
+        end = len(text)
+    return max(text.rfind('\\', 0, end - 1), text.rfind('/', 0, end - 1)) + 1
+
+
+def fuzzy_key(text):
+    """预先计算的模糊匹配信息：(字符位掩码, 长度, 文件夹名起始位置)"""
+    return char_mask(text), len(text), basename_offset(text)
+
+
+def fuzzy_scores(query, entries, texts):
+    """批量计算模糊匹配分数，返回 {key: 分数}（query 和文本都需已 casefold）
+
+    entries 是 [(key, fuzzy_key), ...]，texts[key] 的前 fuzzy_key 长度部分参与匹配。
+    位掩码缺少查询字符的直接跳过，再用正则确认是子序列。query 是连续子串时取最后一次出现
+    （通常在文件夹名中）按公式计分；否则对正则找到的最早匹配位置逐个计分：路径段开头、
+    单词开头、连续匹配和文件夹名中的匹配加分，间隔扣分。评分写在循环里，避免每个路径一次函数调用。
+    """
+    length = len(query)
+    query_mask = char_mask(query)
+    match_at_start = compile_fuzzy_pattern(query).match
+    bonus_before = BOUNDARY_BONUS.get
+    substring_score = length * (SCORE_MATCH + BONUS_CONSECUTIVE) - BONUS_CONSECUTIVE
+
+    scores = {}
+    for key, (mask, end, basename_start) in entries:
+        if mask & query_mask != query_mask:
+            continue
+        text = texts[key]
+        match = match_at_start(text, 0, end)
+        if match is None:
+            continue
+
+        pos = text.rfind(query, 0, end)
+        if pos >= 0:
+            score = substring_score + (bonus_before(text[pos - 1], 0) if pos else BONUS_SEGMENT)
+            if pos + length > basename_start:
+                score += (pos + length - max(pos, basename_start)) * BONUS_BASENAME
+            scores[key] = score
+            continue
+
+        score = 0
+        prev = -2
+        for pos, _ in match.regs[1:]:
+            score += SCORE_MATCH + (bonus_before(text[pos - 1], 0) if pos else BONUS_SEGMENT)
+            if pos == prev + 1:
+                score += BONUS_CONSECUTIVE
+            elif prev >= 0:
+                score -= min(MAX_GAP_PENALTY, PENALTY_GAP_START + (pos - prev - 2) * PENALTY_GAP_EXTENSION)
+            if pos >= basename_start:
+                score += BONUS_BASENAME
+            prev = pos
+        scores[key] = score
+    return scores
+
+
+def fuzzy_score(query, text):
+    """计算单个文本的模糊匹配分数，不匹配时返回None"""
+    query = normalize_text(query)
+    text = normalize_text(text)
+    return fuzzy_scores(query, [(0, fuzzy_key(text))], {0: text}).get(0)
+
+
+class FuzzyArrays:
+    """模糊搜索用的 numpy 数组，路径增删后重建
+
+    所有路径（casefold 后，不含注释）拼接成一个字符码数组，每个路径前放一个 \\0，
+    所以匹配位置前一个字符总是有效的，在路径开头时按路径段开头加分。
+    每个字符的出现位置在第一次查询时计算并缓存。
+    """
+
+    def __init__(self, numpy, texts, fuzzy_keys):
+        np = self.numpy = numpy
+        paths = list(fuzzy_keys)
+        count = len(paths)
+        self.rows = {path: row for row, path in enumerate(paths)}
+        # 用对象数组按行号取出路径，比逐个下标构造列表快
+        self.path_array = np.empty(count, dtype=object)
+        self.path_array[:] = paths
+
+        keys = [fuzzy_keys[path] for path in paths]
+        self.masks = np.fromiter((key[0] for key in keys), dtype=np.uint64, count=count)
+        lengths = np.fromiter((key[1] for key in keys), dtype=np.int64, count=count)
+        self.ends = np.cumsum(lengths + 1)
+        self.starts = self.ends - lengths
+        self.basenames = self.starts + np.fromiter((key[2] for key in keys), dtype=np.int64, count=count)
+
+        joined = ''.join(['\0' + texts[path][:key[1]] for path, key in zip(paths, keys)]) + '\0'
+        self.codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+        self.bonus_table = np.zeros(128, dtype=np.int64)
+        for ch, bonus in BOUNDARY_BONUS.items():
+            self.bonus_table[ord(ch)] = bonus
+        self.bonus_table[0] = BONUS_SEGMENT
+        self._occurrences = {}  # {字符: 在 codes 中出现的位置（升序），最后加一个 len(codes)}
+
+    def occurrences(self, ch):
+        """返回字符在所有路径中出现的位置，末尾是超出所有路径的 len(codes)
+
+        找不到下一次出现的路径得到 len(codes)，之后的字符也都找不到，不需要每一步都删除这些路径。
+        """
+        positions = self._occurrences.get(ch)
+        if positions is None:
+            np = self.numpy
+            positions = np.append(np.flatnonzero(self.codes == ord(ch)), len(self.codes))
+            self._occurrences[ch] = positions
+        return positions
+
+    def bonus_before(self, positions):
+        """每个匹配位置前一个字符带来的加分"""
+        return self.bonus_table[self.numpy.minimum(self.codes[positions - 1], 127)]
+
+    def scores(self, query, base=None):
+        """与 fuzzy_scores 相同的匹配和评分，返回 {path: 分数}；base 不为None时只在其中查找"""
+        np = self.numpy
+        query_mask = np.uint64(char_mask(query))
+        if base is None:
+            rows = np.flatnonzero(self.masks & query_mask == query_mask)
+        else:
+            rows = np.sort(np.fromiter(map(self.rows.__getitem__, base), dtype=np.int64, count=len(base)))
+            rows = rows[self.masks[rows] & query_mask == query_mask]
+
+        # 逐个查询字符找每个路径中上一个匹配位置之后的第一次出现，即正则的正向贪心匹配；
+        # 位置只会增大，最后一个字符的位置仍在路径内就说明所有字符都匹配
+        columns = []
+        prev = self.starts[rows] - 1
+        for ch in query:
+            occurrences = self.occurrences(ch)
+            indexes = np.minimum(np.searchsorted(occurrences, prev, 'right'), len(occurrences) - 1)
+            prev = occurrences[indexes]
+            columns.append(prev)
+        matched = np.flatnonzero(prev < self.ends[rows])
+        if not len(matched):
+            return {}
+        rows = rows[matched]
+        columns = [column[matched] for column in columns]
+
+        basenames = self.basenames[rows]
+        scores = np.zeros(len(rows), dtype=np.int64)
+        last = None
+        for positions in columns:
+            scores += SCORE_MATCH + self.bonus_before(positions) + BONUS_BASENAME * (positions >= basenames)
+            if last is not None:
+                gaps = positions - last
+                penalties = np.minimum(MAX_GAP_PENALTY, PENALTY_GAP_START + (gaps - 2) * PENALTY_GAP_EXTENSION)
+                scores += np.where(gaps == 1, BONUS_CONSECUTIVE, -penalties)
+            last = positions
+
+        # query 是连续子串时按最后一次出现计分
+        length = len(query)
+        starts = self.occurrences(query[0])[:-1]
+        last_code = len(self.codes) - 1
+        for offset in range(1, length):
+            if not len(starts):
+                break
+            starts = starts[self.codes[np.minimum(starts + offset, last_code)] == ord(query[offset])]
+        if len(starts):
+            substring_rows = np.searchsorted(self.starts, starts, 'right') - 1
+            inside = starts + length <= self.ends[substring_rows]
+            starts = starts[inside]
+            substring_rows = substring_rows[inside]
+            # 同一路径只保留最后一次出现
+            last_in_row = np.ones(len(starts), dtype=bool)
+            last_in_row[:-1] = substring_rows[1:] != substring_rows[:-1]
+            starts = starts[last_in_row]
+            substring_rows = substring_rows[last_in_row]
+            # 只保留在本次候选中的路径
+            where = np.minimum(np.searchsorted(rows, substring_rows), len(rows) - 1)
+            matched = rows[where] == substring_rows
+            starts = starts[matched]
+            where = where[matched]
+            substring_scores = (length * (SCORE_MATCH + BONUS_CONSECUTIVE) - BONUS_CONSECUTIVE
+                                + self.bonus_before(starts))
+            overlap = starts + length - np.maximum(starts, basenames[where])
+            scores[where] = substring_scores + np.maximum(overlap, 0) * BONUS_BASENAME
+
+        return dict(zip(self.path_array[rows].tolist(), scores.tolist()))
+
+
+class TrigramIndex:
+    """路径 + 注释的三字母组索引：{trigram: set(path)}
+
+    所有公开方法都持有 lock（可重入），可以在不同线程中调用。查询返回的缓存结果创建后不再修改，
+    释放锁之后仍然可以安全地遍历。
+    """
+
+    def __init__(self):
+        self.texts = {}     # {path: casefold 后的 "路径\0注释"}
+        self.fuzzy_keys = {}  # {path: (路径的字符位掩码, 路径长度, 文件夹名起始位置)}
+        self.postings = None  # {trigram: set(path)}；build_postings 之前为None
+        # 按列存放的 ([(path, fuzzy_key), ...], 掩码列表)，用 map/compress 在C层面完成掩码预过滤；
+        # 路径增删时重建
+        self._mask_columns = None
+        # FuzzyArrays；没有安装 numpy 时为 False，路径增删时重建
+        self._fuzzy_arrays = None
+        # 数据版本：任何路径或注释变化都会加一，并清空查询缓存
+        self.version = 0
+        self._query_cache = OrderedDict()  # {(查询类型, 查询): 结果}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __contains__(self, path):
+        return path in self.texts
+
+    def rebuild(self, entries):
+        """根据 [(path, comment), ...] 重建索引（不建立倒排表）"""
+        texts = {}
+        fuzzy_keys = {}
+        for path, comment in entries:
+            normalized = normalize_text(path)
+            texts[path] = normalized + FIELD_SEPARATOR + normalize_text(comment or "")
+            fuzzy_keys[path] = fuzzy_key(normalized)
+        with self.lock:
+            self.texts = texts
+            self.fuzzy_keys = fuzzy_keys
+            self.postings = None
+            self._paths_changed()
+            self._data_changed()
+
+    def build_postings(self):
+        """建立倒排表，已经建立时什么也不做；界面在后台线程中提前调用，之后的子串查询只确认候选"""
+        with self.lock:
+            if self.postings is not None:
+                return
+            postings = {}
+            for path, text in self.texts.items():
+                for trigram in iter_trigrams(text):
+                    paths = postings.get(trigram)
+                    if paths is None:
+                        postings[trigram] = {path}
+                    else:
+                        paths.add(path)
+            self.postings = postings
+
+    def add(self, path, comment=""):
+        """添加或更新一个文件夹
+
+        已有的路径直接替换文本，只增删变化的三字母组，路径始终留在 texts 中。
+        """
+        text = normalize_text(path) + FIELD_SEPARATOR + normalize_text(comment or "")
+        with self.lock:
+            old_text = self.texts.get(path)
+            if old_text is None:
+                self.fuzzy_keys[path] = fuzzy_key(normalize_text(path))
+                self._paths_changed()
+            # 已有的路径只是注释变化，路径的模糊匹配信息不变
+            self.texts[path] = text
+            postings = self.postings
+            if postings is not None:
+                trigrams = iter_trigrams(text)
+                old_trigrams = iter_trigrams(old_text) if old_text is not None else set()
+                self._remove_postings(path, old_trigrams - trigrams)
+                for trigram in trigrams - old_trigrams:
+                    paths = postings.get(trigram)
+                    if paths is None:
+                        postings[trigram] = {path}
+                    else:
+                        paths.add(path)
+            self._data_changed()
+
+    def update(self, path, comment=""):
+        """注释变化时更新已索引的文件夹；不在索引中的路径忽略"""
+        with self.lock:
+            if path in self.texts:
+                self.add(path, comment)
+
+    def remove(self, path):
+        """从索引中删除一个文件夹"""
+        with self.lock:
+            text = self.texts.pop(path, None)
+            if text is None:
+                return
+            del self.fuzzy_keys[path]
+            self._paths_changed()
+            if self.postings is not None:
+                self._remove_postings(path, iter_trigrams(text))
+            self._data_changed()
+
+    def clear_cache(self):
+        """清空查询缓存（性能测试时测量完整搜索用）"""
+        with self.lock:
+            self._query_cache.clear()
+
+    def _paths_changed(self):
+        """路径增删后按列存放的模糊匹配数据需要重建"""
+        self._mask_columns = None
+        self._fuzzy_arrays = None
+
+    def _data_changed(self):
+        """数据变化后旧的查询结果都不再有效"""
+        self.version += 1
+        if self._query_cache:
+            self._query_cache.clear()
+
+    def _remove_postings(self, path, trigrams):
+        """从这些三字母组的倒排表中删除 path"""
+        for trigram in trigrams:
+            paths = self.postings.get(trigram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.postings[trigram]
+
+    def search(self, query):
+        """返回路径或注释包含 query 的路径集合（结果会被缓存，调用方不要修改）"""
+        return self._cached_query('substring', normalize_text(query))
+
+    def fuzzy_search(self, query):
+        """模糊搜索，返回 {path: 分数}（结果会被缓存，调用方不要修改）
+
+        路径按子序列匹配并评分；注释只按子串匹配，得分相当于一段没有加分的连续匹配。
+        """
+        return self._cached_query('fuzzy', normalize_text(query))
+
+    def _cached_query(self, kind, query):
+        """先查LRU缓存，再尝试在缓存的较宽查询结果中缩小范围，都没有时完整搜索"""
+        with self.lock:
+            cache = self._query_cache
+            key = (kind, query)
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                return result
+
+            base = self._narrowest_cached_superset(kind, query)
+            if kind == 'substring':
+                result = self._substring_search(query, base)
+            else:
+                result = self._fuzzy_search(query, base)
+
+            cache[key] = result
+            if len(cache) > QUERY_CACHE_SIZE:
+                cache.popitem(last=False)
+            return result
+
+    def _narrowest_cached_superset(self, kind, query):
+        """在缓存中找结果一定包含 query 结果的查询，返回其中最小的结果；没有时返回None
+
+        旧查询是新查询的子串时，包含新查询的文本一定包含旧查询，以新查询为子序列的路径
+        也一定以旧查询为子序列，所以旧结果是新结果的超集。
+        """
+        best = None
+        for (cached_kind, cached_query), result in self._query_cache.items():
+            if cached_kind == kind and cached_query and cached_query in query:
+                if best is None or len(result) < len(best):
+                    best = result
+        return best
+
+    def _substring_search(self, query, base=None):
+        """子串搜索；base 不为None时只在其中查找"""
+        texts = self.texts
+        if len(query) < TRIGRAM_SIZE or self.postings is None:
+            # 短查询或还没有倒排表时逐个确认，用 map 在C层面完成
+            if base is None:
+                return set(compress(texts, map(contains, texts.values(), repeat(query))))
+            return set(compress(base, map(contains, map(texts.__getitem__, base), repeat(query))))
+
+        # 从最短的倒排表开始求交集
+        posting_lists = []
+        for trigram in iter_trigrams(query):
+            paths = self.postings.get(trigram)
+            if not paths:
+                return set()
+            posting_lists.append(paths)
+        posting_lists.sort(key=len)
+
+        # 旧结果比最短的倒排表还小时，直接在旧结果中确认
+        if base is not None and len(base) <= len(posting_lists[0]):
+            return {path for path in base if query in texts[path]}
+
+        matched = set(posting_lists[0])
+        for paths in posting_lists[1:]:
+            if not matched:
+                break
+            matched.intersection_update(paths)
+
+        # 三字母组都出现不代表子串出现，需要确认
+        return {path for path in matched if query in texts[path]}
+
+    def _fuzzy_search(self, query, base=None):
+        """模糊搜索；base 不为None时只在其中查找"""
+        texts = self.texts
+        arrays = self._numpy_arrays() if base is None or len(base) >= NUMPY_MIN_CANDIDATES else None
+        if arrays is not None:
+            scores = arrays.scores(query, base)
+        elif base is None:
+            scores = fuzzy_scores(query, self._mask_candidates(char_mask(query)), texts)
+        else:
+            fuzzy_keys = self.fuzzy_keys
+            scores = fuzzy_scores(query, [(path, fuzzy_keys[path]) for path in base], texts)
+
+        if base is None:
+            comment_matches = self._comment_matches(query, scores)
+        elif len(base) >= NUMPY_MIN_CANDIDATES:
+            comment_matches = [path for path in self._comment_matches(query, scores) if path in base]
+        else:
+            # 旧结果很少时直接逐个确认，比遍历倒排表快
+            comment_matches = [path for path in base if path not in scores and query in texts[path]]
+        scores.update(dict.fromkeys(comment_matches, SCORE_MATCH * len(query)))
+        return scores
+
+    def _comment_matches(self, query, scores):
+        """返回不在 scores 中、注释包含 query 的路径
+
+        路径包含 query 时一定已经模糊匹配，所以先在倒排表中去掉 scores 里的路径，只确认剩下的。
+        """
+        if len(query) < TRIGRAM_SIZE or self.postings is None:
+            return self.search(query).difference(scores)
+        candidates = None
+        for trigram in iter_trigrams(query):
+            paths = self.postings.get(trigram)
+            if not paths:
+                return set()
+            candidates = paths.difference(scores) if candidates is None else candidates & paths
+        texts = self.texts
+        return {path for path in candidates if query in texts[path]}
+
+    def _numpy_arrays(self):
+        """路径足够多且安装了 numpy 时返回 FuzzyArrays，否则返回None"""
+        if len(self.texts) < NUMPY_MIN_PATHS:
+            return None
+        if self._fuzzy_arrays is None:
+            numpy = load_numpy()
+            self._fuzzy_arrays = FuzzyArrays(numpy, self.texts, self.fuzzy_keys) if numpy else False
+        return self._fuzzy_arrays or None
+
+    def _mask_candidates(self, query_mask):
+        """返回位掩码包含查询所有字符的 (path, fuzzy_key)"""
+        if self._mask_columns is None:
+            self._mask_columns = (list(self.fuzzy_keys.items()),
+                                  [key[0] for key in self.fuzzy_keys.values()])
+        entries, masks = self._mask_columns
+        return compress(entries, map(query_mask.__eq__, map(query_mask.__and__, masks)))
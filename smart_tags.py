@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+智能标签规则
+根据文件夹路径关键词、文件夹内容、使用频率和访问时间生成分类和标签。
+批量生成和单个文件夹重新生成共用这里的规则。
+
+所有路径关键词在第一次使用时编译成一个按前缀树组织的正则表达式（KeywordClassifier），
+每个路径只扫描一次就得到匹配的所有规则，不再对每条规则逐个关键词查找子串。
+"""
+
+import os
+import re
+import stat
+import zlib
+from datetime import datetime
+
+
+# 路径关键词规则：(标签, 分类, 关键词)，按顺序匹配，第一个匹配的规则决定分类
+PATH_KEYWORD_RULES = [
+    ("开发", "开发项目", [
+        'project', 'code', 'dev', 'src', 'source', 'github', 'git',
+        'programming', 'python', 'javascript', 'java', 'cpp', 'c#',
+        'web', 'api', 'backend', 'frontend', 'nodejs', 'react', 'vue',
+        'workspace', 'development', 'coding', 'repository', 'repo'
+    ]),
+    ("工作", "工作文档", [
+        'work', 'office', 'business', 'company', 'corp', 'enterprise',
+        'meeting', 'report', 'document', 'contract', 'proposal',
+        'presentation', 'excel', 'word', 'powerpoint'
+    ]),
+    ("学习", "学习资料", [
+        'study', 'learn', 'course', 'tutorial', 'education', 'school',
+        'university', 'college', 'book', 'note', 'homework',
+        'exam', 'test', 'research', 'paper', 'thesis'
+    ]),
+    ("多媒体", "多媒体文件", [
+        'photo', 'picture', 'image', 'video', 'movie', 'music', 'audio',
+        'media', 'gallery', 'camera', 'screenshot', 'wallpaper'
+    ]),
+    ("下载", "下载临时", [
+        'download', 'temp', 'temporary', 'cache', 'installer', 'setup'
+    ]),
+    ("游戏", "游戏相关", [
+        'game', 'steam', 'origin', 'epic', 'ubisoft', 'blizzard',
+        'gaming', 'mod', 'save'
+    ]),
+    ("系统", "系统文件", [
+        'system', 'windows', 'program files', 'appdata', 'users',
+        'config', 'setting', 'preference', 'registry', 'backup'
+    ]),
+]
+
+# 文件扩展名规则：(标签, 分类, 扩展名, 已有这些标签时跳过)
+EXTENSION_RULES = [
+    ("代码", "开发项目", ['.py', '.js', '.java', '.cpp', '.c', '.cs'], ["开发"]),
+    ("图片", "多媒体文件", ['.jpg', '.jpeg', '.png', '.gif', '.bmp'], ["多媒体"]),
+    ("文档", "文档资料", ['.doc', '.docx', '.pdf', '.txt', '.rtf'], ["工作", "学习"]),
+]
+
+# 打开次数达到这些值时加上"常用"、"经常"标签（快捷分类也使用这两个阈值）
+FREQUENT_OPEN_COUNT = 10
+OFTEN_OPEN_COUNT = 5
+
+# 内容分析时只看前几个文件
+CONTENT_SAMPLE_SIZE = 10
+
+DEFAULT_CATEGORY = "其他"
+
+# 分类规则的版本：路径关键词规则或内容采样数量变化后随之变化，标签缓存中旧规则的结果不再使用
+CLASSIFIER_VERSION = zlib.crc32(repr((PATH_KEYWORD_RULES, CONTENT_SAMPLE_SIZE)).encode('utf-8'))
+
+
+def _trie_pattern(words):
+    """把关键词组织成前缀树形式的正则表达式，例如 work、workspace -> work(?:space)?
+
+    正则引擎不需要在每个位置逐个尝试所有关键词；可选的后缀是贪婪的，同一位置优先匹配最长的关键词。
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+
+    return emit(trie)
+
+
+class KeywordClassifier:
+    """路径关键词分类器：rules 为 [(标签, 分类, 关键词列表), ...]
+
+    classify(text) 一次扫描返回 text（已转为小写）包含关键词的所有规则，按 rules 中的顺序排列。
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        keyword_masks = {}
+        for i, (_, _, keywords) in enumerate(rules):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                keyword_masks[keyword] = keyword_masks.get(keyword, 0) | (1 << i)
+
+        # 每个位置只报告最长的关键词，是它前缀的关键词（例如 workspace 中的 work）也在这里匹配，
+        # 所以每个关键词对应它自己和所有前缀关键词所属规则的位掩码
+        self.masks = {
+            keyword: self._prefix_mask(keyword, keyword_masks) for keyword in keyword_masks
+        }
+        # 用先行断言在每个位置匹配，关键词可以互相重叠
+        self.pattern = re.compile('(?=(' + _trie_pattern(keyword_masks) + '))')
+        self._results = {}  # {位掩码: [(标签, 分类), ...]}
+
+    @staticmethod
+    def _prefix_mask(keyword, keyword_masks):
+        mask = 0
+        for end in range(1, len(keyword) + 1):
+            mask |= keyword_masks.get(keyword[:end], 0)
+        return mask
+
+    def match_mask(self, text):
+        """返回匹配规则的位掩码，第 i 位对应 rules[i]"""
+        mask = 0
+        masks = self.masks
+        for keyword in set(self.pattern.findall(text)):
+            mask |= masks[keyword]
+        return mask
+
+    def classify(self, text):
+        """返回 [(标签, 分类), ...]，调用方不要修改"""
+        mask = self.match_mask(text)
+        result = self._results.get(mask)
+        if result is None:
+            result = self._results[mask] = [
+                (tag, category) for i, (tag, category, _) in enumerate(self.rules) if mask >> i & 1
+            ]
+        return result
+
+
+_path_classifier = None
+
+
+def path_classifier():
+    """返回路径关键词分类器，第一次调用时编译（命令行查询模式用不到，不在导入时编译）"""
+    global _path_classifier
+    if _path_classifier is None:
+        _path_classifier = KeywordClassifier(PATH_KEYWORD_RULES)
+    return _path_classifier
+
+
+def scan_folder_extensions(path):
+    """快速扫描文件夹中前几个文件的扩展名（DirEntry 自带文件类型，Windows上不需要逐个 stat）"""
+    extensions = set()
+    try:
+        with os.scandir(path) as entries:
+            for count, entry in enumerate(entries):
+                if count >= CONTENT_SAMPLE_SIZE:
+                    break
+                if entry.is_file():
+                    _, ext = os.path.splitext(entry.name.lower())
+                    if ext:
+                        extensions.add(ext)
+    except OSError:
+        pass
+    return extensions
+
+
+def classify_path(path):
+    """只根据路径关键词生成 (分类, 标签列表)，第一个匹配的规则决定分类"""
+    matches = path_classifier().classify(path.lower())
+    tags = [tag for tag, _ in matches]
+    category = matches[0][1] if matches else DEFAULT_CATEGORY
+    return category, tags
+
+
+def open_count_tags(path, open_history):
+    """基于访问频率的标签"""
+    if path in open_history:
+        count = open_history[path]['count']
+        if count >= FREQUENT_OPEN_COUNT:
+            return ["常用"]
+        elif count >= OFTEN_OPEN_COUNT:
+            return ["经常"]
+    return []
+
+
+def generate_path_tags(path, open_history):
+    """只根据路径和打开次数生成 (分类, 标签列表)，不读取文件夹内容"""
+    category, tags = classify_path(path)
+    return category, tags + open_count_tags(path, open_history)
+
+
+def describe_folder(path, tag_cache=None):
+    """返回 (扩展名集合, 分类, 路径标签列表)
+
+    有 tag_cache 时按目录的修改时间缓存：目录没有变化时只需要一次 stat，不列出文件夹内容。
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    if tag_cache is not None and st is not None:
+        cached = tag_cache.lookup(path, st.st_mtime)
+        if cached is not None:
+            return cached
+
+    category, tags = classify_path(path)
+    if st is not None and stat.S_ISDIR(st.st_mode):
+        extensions = scan_folder_extensions(path)
+    else:
+        extensions = set()
+    if tag_cache is not None and st is not None:
+        tag_cache.store(path, st.st_mtime, extensions, category, tags)
+    return extensions, category, tags
+
+
+def generate_folder_tags(path, access_time, open_history, now=None, tag_cache=None):
+    """为一个文件夹生成 (分类, 标签列表)，tag_cache 见 describe_folder"""
+    # 基于路径分析和文件夹内容快速分析
+    extensions, category, tags = describe_folder(path, tag_cache)
+    for tag, tag_category, rule_extensions, skip_tags in EXTENSION_RULES:
+        if any(ext in extensions for ext in rule_extensions):
+            if not any(skip_tag in tags for skip_tag in skip_tags):
+                tags.append(tag)
+                if category == DEFAULT_CATEGORY:
+                    category = tag_category
+
+    # 基于访问频率
+    tags.extend(open_count_tags(path, open_history))
+
+    # 基于访问时间
+    now = now or datetime.now()
+    days_diff = (now - access_time).days
+    if days_diff == 0:
+        tags.append("今日")
+    elif days_diff <= 3:
+        tags.append("最近")
+    elif days_diff <= 7:
+        tags.append("本周")
+
+    return category, tags
+
+
+def format_auto_comment(category, tags):
+    """生成自动注释，格式为 "[分类] 标签1 | 标签2" """
+    return f"[{category}] {' | '.join(tags)}"
+
+
+def is_auto_comment(comment):
+    """以 "[" 开头的注释是自动生成的"""
+    return comment.startswith('[')
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+智能标签内容分析结果的持久化缓存
+以文件夹路径为键，记录目录的修改时间、扫描到的扩展名和按路径关键词得到的分类和标签。
+目录中增删或重命名文件时目录的修改时间会变化，没有变化的文件夹只需要一次 stat，
+"重新生成所有标签"和新的配置目录都不用再列出文件夹内容。
+"""
+
+import json
+import os
+import threading
+
+from config_writer import atomic_write_json
+
+
+CACHE_VERSION = 1
+
+
+class TagCache:
+    """保存每个文件夹的分析结果：{path: [目录mtime, 扩展名列表, 分类, 路径标签列表]}
+
+    分类规则变化后（classifier_version 不同）整个缓存作废。标签在后台线程中生成，
+    多个工作线程和单个文件夹重新生成可能同时读写，所以所有操作用一把锁串行化。
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.classifier_version = None
+        self.entries = {}
+        self.dirty = False
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def load(self, classifier_version):
+        """加载缓存文件，文件损坏或版本不符时从空缓存开始"""
+        self.classifier_version = classifier_version
+        self.entries = {}
+        self.dirty = False
+        self.loaded = True
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION and data.get('classifier') == classifier_version:
+                    self.entries = data.get('folders', {})
+        except Exception as e:
+            print(f"加载标签缓存失败: {e}")
+            self.entries = {}
+
+    def lookup(self, path, mtime):
+        """返回 (扩展名集合, 分类, 路径标签列表)；未命中或目录已变化时返回None"""
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                return set(entry[1]), entry[2], list(entry[3])
+            self.misses += 1
+            return None
+
+    def store(self, path, mtime, extensions, category, tags):
+        """记录一个文件夹的分析结果"""
+        with self.lock:
+            self.entries[path] = [mtime, sorted(extensions), category, list(tags)]
+            self.dirty = True
+
+    def prune(self, live_paths):
+        """删除已不在最近文件夹列表中的缓存项"""
+        with self.lock:
+            stale = [path for path in self.entries if path not in live_paths]
+            for path in stale:
+                del self.entries[path]
+            if stale:
+                self.dirty = True
+        return len(stale)
+
+    def reset_stats(self):
+        """重置命中统计"""
+        self.hits = 0
+        self.misses = 0
+
+    def save(self):
+        """缓存有变化时写回磁盘"""
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                data = {'version': CACHE_VERSION, 'classifier': self.classifier_version, 'folders': self.entries}
+                atomic_write_json(self.cache_file, data)
+                self.dirty = False
+            except Exception as e:
+                print(f"保存标签缓存失败: {e}")
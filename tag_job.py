@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+智能标签生成任务
+在有界的守护线程池中并行分析文件夹，慢速网络共享上的目录读取可以相互重叠；
+任务可以取消，并通过回调报告进度。同一时间只运行一个任务由 FolderIndex 保证。
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from recent_scanner import DaemonPool
+
+
+# 调度线程检查取消请求的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.1
+
+
+class TagJob:
+    """一次智能标签生成任务
+
+    run(folders, tag_folder) 在最多 workers 个守护线程中调用 tag_folder(folder)，收集返回的
+    (路径, 分类, 标签列表)。同时只提交 workers 个文件夹，cancel() 后不再提交新的文件夹并立即返回
+    （卡在无响应路径上的线程会在恢复后自行退出）。progress_callback(已完成, 总数) 在调度线程中调用。
+    """
+
+    def __init__(self, workers, progress_callback=None):
+        self.workers = max(1, workers)
+        self.progress_callback = progress_callback
+        self.total = 0
+        self.completed = 0
+        self.cancelled = threading.Event()
+        # 由运行任务的线程在结束（包括保存结果）后设置
+        self.finished = threading.Event()
+
+    def cancel(self):
+        """请求取消任务"""
+        self.cancelled.set()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+    def wait(self, timeout=None):
+        """等待任务结束，返回是否已结束"""
+        return self.finished.wait(timeout)
+
+    def run(self, folders, tag_folder):
+        """分析所有文件夹，返回结果列表（被取消时只包含已完成的部分）"""
+        self.total = len(folders)
+        self.completed = 0
+        results = []
+        if not folders:
+            return results
+
+        pool = DaemonPool(min(self.workers, len(folders)))
+        remaining = iter(folders)
+        pending = set()
+        try:
+            while not self.cancelled.is_set():
+                # 保持最多 workers 个任务在运行，取消后尚未提交的文件夹不会再开始
+                while len(pending) < self.workers:
+                    folder = next(remaining, None)
+                    if folder is None:
+                        break
+                    pending.add(pool.submit(self._tag_one, tag_folder, folder))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is not None:
+                        results.append(result)
+                self.completed += len(done)
+                if done and self.progress_callback:
+                    self.progress_callback(self.completed, self.total)
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown()
+        return results
+
+    @staticmethod
+    def _tag_one(tag_folder, folder):
+        try:
+            return tag_folder(folder)
+        except Exception as e:
+            print(f"处理文件夹 {folder.path} 时出错: {e}")
+            return None
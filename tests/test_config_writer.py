@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""config_writer 的测试：后台写入失败后不需要新的 submit 也会重试"""
+
+import json
+import time
+
+import config_writer
+from config_writer import BackgroundJsonWriter
+
+
+def test_failed_write_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_writer, 'WRITE_RETRY_DELAY', 0.01)
+    real_write = config_writer.atomic_write_json
+    attempts = []
+
+    def flaky_write(path, data, indent=None):
+        attempts.append(data)
+        if len(attempts) == 1:
+            raise PermissionError("文件被占用")
+        real_write(path, data, indent)
+
+    monkeypatch.setattr(config_writer, 'atomic_write_json', flaky_write)
+    path = tmp_path / 'config.json'
+    writer = BackgroundJsonWriter(str(path), delay=0.01)
+    writer.submit({'settings': {'fuzzy_search': False}})
+
+    deadline = time.monotonic() + 5
+    while writer.writes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.writes == 1
+    assert len(attempts) == 2
+    assert json.loads(path.read_text(encoding='utf-8')) == {'settings': {'fuzzy_search': False}}
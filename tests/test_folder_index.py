@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""folder_index 的测试：旧版 config.json 迁移到数据库时不能丢失打开历史和注释，打开次数不重复计算，
+搜索索引按需重建"""
+
+import json
+import os
+import time
+
+from folder_index import FolderIndex
+from folder_record import FolderRecord
+from history_store import HistoryStore
+
+
+LEGACY_CONFIG = {
+    'open_history': {'d:\\work': {'count': 2, 'first_opened': 100.0, 'last_opened': 200.0}},
+    'folder_comments': {'d:\\work': '项目'},
+    'settings': {'verify_workers': 4},
+}
+
+
+def write_config(config_dir, config):
+    with open(os.path.join(config_dir, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+def read_config(config_dir, name='config.json'):
+    with open(os.path.join(config_dir, name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_unavailable_database_keeps_history_in_config(tmp_path):
+    """数据库打不开时使用 config.json 中的历史，退出时也不能改写成只有设置的格式"""
+    write_config(tmp_path, LEGACY_CONFIG)
+    os.mkdir(tmp_path / 'history.db')
+
+    index = FolderIndex(str(tmp_path))
+    index.load_config()
+    assert index.history_in_json
+    assert index.open_history['d:\\work']['count'] == 2
+    assert index.get_comment('d:\\work') == '项目'
+
+    # 每次变化都交给后台写入，不等到退出（这里直接执行写入线程延迟后的那次写入）
+    index.record_folder_open('d:\\new')
+    index.set_comment('d:\\new', '新项目')
+    index.config_writer.flush()
+    config = read_config(tmp_path)
+    assert set(config['open_history']) == {'d:\\work', 'd:\\new'}
+    assert config['folder_comments'] == {'d:\\work': '项目', 'd:\\new': '新项目'}
+
+    index.update_setting('verify_workers', 8)
+    index.close()
+
+    config = read_config(tmp_path)
+    assert config['settings']['verify_workers'] == 8
+    assert set(config['open_history']) == {'d:\\work', 'd:\\new'}
+    assert index.export_json()['open_history']['d:\\work']['count'] == 2
+
+
+def test_migration_backs_up_before_rewriting_config(tmp_path):
+    write_config(tmp_path, LEGACY_CONFIG)
+
+    index = FolderIndex(str(tmp_path))
+    index.load_config()
+    assert not index.history_in_json
+    index.close()
+
+    assert read_config(tmp_path, 'config.json.bak') == LEGACY_CONFIG
+    assert 'open_history' not in read_config(tmp_path)
+
+    index = FolderIndex(str(tmp_path))
+    index.load_config()
+    assert index.open_history['d:\\work']['count'] == 2
+    assert index.get_comment('d:\\work') == '项目'
+    index.close()
+
+
+def test_failed_backup_skips_migration(tmp_path, monkeypatch):
+    """备份失败时不迁移也不写数据库，下次启动从 config.json 迁移，打开事件不重复"""
+    write_config(tmp_path, LEGACY_CONFIG)
+    index = FolderIndex(str(tmp_path))
+    monkeypatch.setattr(index, 'backup_config', lambda suffix: False)
+    index.load_config()
+    assert index.history_in_json
+    index.record_folder_open('d:\\work')
+    index.close()
+
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.open()
+    assert not store.is_migrated()
+    assert store.load() == ({}, {}, {})
+    store.close()
+    assert read_config(tmp_path)['open_history']['d:\\work']['count'] == 3
+
+    index = FolderIndex(str(tmp_path))
+    index.load_config()
+    assert not index.history_in_json
+    entry = index.open_history['d:\\work']
+    assert entry['count'] == 3
+    assert len(entry['opens']) == 3
+    index.close()
+
+
+def test_search_index_built_on_first_search(tmp_path):
+    """替换文件夹列表时不重建搜索索引，第一次搜索时才重建，期间修改的注释也能搜到"""
+    index = FolderIndex(str(tmp_path))
+    now = time.time()
+    index.set_folders([FolderRecord('d:\\work\\alpha', now), FolderRecord('d:\\work\\beta', now - 10)])
+    assert len(index.search_index) == 0
+
+    index.set_comment('d:\\work\\beta', 'release notes')
+    assert [folder.path for folder in index.filter_folders('release')] == ['d:\\work\\beta']
+    assert len(index.search_index) == 2
+
+    index.set_comment('d:\\work\\alpha', 'release plan')
+    assert len(index.filter_folders('release')) == 2
+    index.close()
+
+
+def test_record_open_counts_each_open_once(tmp_path):
+    """旧版记录（没有打开事件）和第一次打开的记录，这次打开都只算一次"""
+    index = FolderIndex(str(tmp_path))
+    index.open_history = {'d:\\work': {'count': 2, 'first_opened': 100.0, 'last_opened': 200.0}}
+    index.record_folder_open('d:\\work')
+    entry = index.open_history['d:\\work']
+    assert entry['count'] == 3
+    assert entry['opens'][:2] == [100.0, 200.0]
+    assert len(entry['opens']) == 3
+
+    index.record_folder_open('d:\\new')
+    assert len(index.open_history['d:\\new']['opens']) == 1
+    index.close()
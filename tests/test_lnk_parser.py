@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+lnk_parser 的样例快捷方式测试
+样例 .lnk 按 MS-SHLLINK 格式在这里构造：先验证正常的本地、网络和 IDList 快捷方式，
+再把它们截断或改坏，确认所有格式错误都以 LnkParseError 报告，并且一个损坏的快捷方式
+不会影响同一目录中其他快捷方式的解析。
+"""
+
+import struct
+
+import pytest
+
+import lnk_parser
+from lnk_parser import LnkParseError, parse_lnk
+from recent_scanner import list_lnk_files, resolve_links
+
+
+def make_header(link_flags, file_attributes=0x10):
+    """76字节的 ShellLinkHeader"""
+    return (struct.pack('<I', lnk_parser.HEADER_SIZE) + lnk_parser.LINK_CLSID
+            + struct.pack('<2I', link_flags, file_attributes) + b'\0' * 24
+            + struct.pack('<3I', 0, 0, 1) + b'\0' * 12)
+
+
+def make_local_link_info(base, suffix=''):
+    """带 Unicode 偏移（36字节头部）的本地路径 LinkInfo"""
+    header_size = 0x24
+    volume_id = struct.pack('<4I', 16, 3, 0, 16)
+    base_ansi = base.encode('latin-1') + b'\0'
+    suffix_ansi = suffix.encode('latin-1') + b'\0'
+    base_unicode = base.encode('utf-16-le') + b'\0\0'
+    suffix_unicode = suffix.encode('utf-16-le') + b'\0\0'
+    volume_offset = header_size
+    base_offset = volume_offset + len(volume_id)
+    suffix_offset = base_offset + len(base_ansi)
+    base_unicode_offset = suffix_offset + len(suffix_ansi)
+    suffix_unicode_offset = base_unicode_offset + len(base_unicode)
+    total = suffix_unicode_offset + len(suffix_unicode)
+    return (struct.pack('<9I', total, header_size, lnk_parser.VOLUME_ID_AND_LOCAL_BASE_PATH,
+                        volume_offset, base_offset, 0, suffix_offset,
+                        base_unicode_offset, suffix_unicode_offset)
+            + volume_id + base_ansi + suffix_ansi + base_unicode + suffix_unicode)
+
+
+def make_network_link_info(net_name, suffix):
+    """只有网络路径的 LinkInfo（28字节头部）"""
+    header_size = 0x1C
+    name = net_name.encode('latin-1') + b'\0'
+    network_link = struct.pack('<5I', 20 + len(name), 0, 20, 0, 0) + name
+    suffix_ansi = suffix.encode('latin-1') + b'\0'
+    network_offset = header_size
+    suffix_offset = network_offset + len(network_link)
+    total = suffix_offset + len(suffix_ansi)
+    return (struct.pack('<7I', total, header_size, lnk_parser.COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX,
+                        0, 0, network_offset, suffix_offset)
+            + network_link + suffix_ansi)
+
+
+def make_id_list(items):
+    body = b''.join(struct.pack('<H', len(item) + 2) + item for item in items) + b'\0\0'
+    return struct.pack('<H', len(body)) + body
+
+
+def my_computer_item():
+    return b'\x1f\x50' + lnk_parser.CLSID_MY_COMPUTER
+
+
+def volume_item(drive):
+    return b'\x2f' + drive.encode('latin-1') + b'\0' * (20 - len(drive))
+
+
+def file_entry_item(short_name, is_dir=True):
+    """只有短文件名的文件条目项"""
+    name = short_name.encode('latin-1') + b'\0'
+    if len(name) % 2:
+        name += b'\0'
+    return bytes([0x31 if is_dir else 0x32, 0]) + b'\0' * 8 + struct.pack('<H', 0x10) + name
+
+
+@pytest.fixture
+def local_lnk():
+    flags = lnk_parser.HAS_LINK_INFO | lnk_parser.IS_UNICODE
+    return make_header(flags) + make_local_link_info('C:\\Users\\dev\\', 'projects')
+
+
+@pytest.fixture
+def network_lnk():
+    return make_header(lnk_parser.HAS_LINK_INFO, 0) + make_network_link_info('\\\\server\\share', 'dir\\sub')
+
+
+@pytest.fixture
+def id_list_lnk():
+    items = [my_computer_item(), volume_item('D:\\'), file_entry_item('WORK'), file_entry_item('API')]
+    return make_header(lnk_parser.HAS_LINK_TARGET_ID_LIST) + make_id_list(items)
+
+
+def test_local_link_info(local_lnk):
+    assert parse_lnk(local_lnk) == ('C:\\Users\\dev\\projects', True)
+
+
+def test_network_link_info(network_lnk):
+    assert parse_lnk(network_lnk) == ('\\\\server\\share\\dir\\sub', None)
+
+
+def test_id_list(id_list_lnk):
+    assert parse_lnk(id_list_lnk).path == 'D:\\WORK\\API'
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'garbage',
+    b'\x4c\x00\x00\x00' + b'\0' * 72,  # CLSID 错误
+])
+def test_invalid_header(data):
+    with pytest.raises(LnkParseError):
+        parse_lnk(data)
+
+
+def test_truncated_at_every_length(local_lnk, network_lnk, id_list_lnk):
+    """任何位置截断都只能得到 LnkParseError 或正常结果，不能抛出其他异常"""
+    for data in (local_lnk, network_lnk, id_list_lnk):
+        for length in range(len(data)):
+            try:
+                parse_lnk(data[:length])
+            except LnkParseError:
+                pass
+
+
+def test_link_info_header_claims_unicode_offsets_but_is_short():
+    """头部大小声明为 0x24，但 LinkInfo 只有28字节"""
+    link_info = struct.pack('<7I', 28, 0x24, lnk_parser.VOLUME_ID_AND_LOCAL_BASE_PATH, 0, 0, 0, 0)
+    data = make_header(lnk_parser.HAS_LINK_INFO) + link_info
+    with pytest.raises(LnkParseError):
+        parse_lnk(data)
+
+
+def test_link_info_size_beyond_file(local_lnk):
+    data = bytearray(local_lnk)
+    struct.pack_into('<I', data, lnk_parser.HEADER_SIZE, len(data))
+    with pytest.raises(LnkParseError):
+        parse_lnk(bytes(data))
+
+
+def test_network_link_offset_out_of_range(network_lnk):
+    data = bytearray(network_lnk)
+    # NetworkRelativeLinkOffset 指向文件末尾之后
+    struct.pack_into('<I', data, lnk_parser.HEADER_SIZE + 20, 0xFFFF)
+    with pytest.raises(LnkParseError):
+        parse_lnk(bytes(data))
+
+
+@pytest.mark.parametrize('item_size', [1, 2, 0x7FFF])
+def test_id_list_item_size_invalid(item_size):
+    id_list = struct.pack('<H', 6) + struct.pack('<H', item_size) + b'\x2f\0\0\0'
+    data = make_header(lnk_parser.HAS_LINK_TARGET_ID_LIST) + id_list
+    with pytest.raises(LnkParseError):
+        parse_lnk(data)
+
+
+def test_id_list_size_beyond_file():
+    data = make_header(lnk_parser.HAS_LINK_TARGET_ID_LIST) + struct.pack('<H', 100) + b'\0\0'
+    with pytest.raises(LnkParseError):
+        parse_lnk(data)
+
+
+def test_corrupt_link_does_not_hide_others(tmp_path, local_lnk):
+    """目录中有一个损坏的快捷方式时，其他快捷方式照常解析"""
+    link_info = struct.pack('<7I', 28, 0x24, lnk_parser.VOLUME_ID_AND_LOCAL_BASE_PATH, 0, 0, 0, 0)
+    (tmp_path / 'good.lnk').write_bytes(local_lnk)
+    (tmp_path / 'bad.lnk').write_bytes(make_header(lnk_parser.HAS_LINK_INFO) + link_info)
+
+    lnk_files_info = list_lnk_files(str(tmp_path))
+    results = dict(zip((info['name'] for info in lnk_files_info),
+                       resolve_links(lnk_files_info, workers=1)))
+    assert results['good.lnk'] == ('C:\\Users\\dev\\projects', True)
+    # 无法解析的快捷方式回退到COM，COM不可用时目标为空
+    assert results['bad.lnk'][0] == ''
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""preview_engine 的测试：只有连续慢速的文件夹 stat 才把卷标记为慢速"""
+
+import preview_engine
+from preview_engine import SLOW_PROBE_COUNT, SLOW_STAT_SECONDS, PreviewLoader
+
+
+def test_single_slow_probe_does_not_mark_volume():
+    loader = PreviewLoader(lambda path, generation: None)
+    loader.record_probe('c:\\big', SLOW_STAT_SECONDS * 10)
+    loader.record_probe('c:\\other', 0.001)
+    loader.record_probe('c:\\big', SLOW_STAT_SECONDS * 10)
+    assert not loader.is_slow('c:\\big')
+
+
+def test_repeated_slow_probes_mark_volume():
+    loader = PreviewLoader(lambda path, generation: None)
+    for _ in range(SLOW_PROBE_COUNT):
+        loader.record_probe('\\\\server\\share\\docs', SLOW_STAT_SECONDS * 10)
+    assert loader.is_slow('\\\\server\\share\\other')
+    assert not loader.is_slow('c:\\work')
+
+
+def test_slow_load_without_slow_stat_does_not_mark_volume(tmp_path, monkeypatch):
+    """加载（例如计数或排序扫描）很慢而文件夹 stat 很快时不标记"""
+    clock = [0.0]
+    monkeypatch.setattr(preview_engine.time, 'monotonic', lambda: clock[0])
+    loader = PreviewLoader(lambda path, generation: None)
+    for _ in range(SLOW_PROBE_COUNT + 1):
+        loader.stat_folder(str(tmp_path))
+        clock[0] += 10
+    assert not loader.is_slow(str(tmp_path))
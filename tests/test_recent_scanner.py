@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""recent_scanner 按父目录批量验证候选文件夹的测试"""
+
+import os
+
+from recent_scanner import verify_candidates
+
+
+def make_candidates(paths):
+    return [{'path': path, 'timestamp': 0.0} for path in paths]
+
+
+def test_trailing_separator_with_sibling(tmp_path):
+    """末尾带分隔符的路径和同一父目录下的其他候选一起验证时不能被当作不存在"""
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    paths = [str(tmp_path / 'a') + os.sep, str(tmp_path / 'b'), str(tmp_path / 'missing')]
+
+    grouped = [folder.path for folder in verify_candidates(make_candidates(paths))]
+    single = [folder.path for folder in verify_candidates(make_candidates(paths), group_by_parent=False)]
+    assert grouped == single == paths[:2]
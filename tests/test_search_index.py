@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""search_index 的测试：后台线程更新注释时的并发，以及 numpy 模糊搜索与纯Python结果一致"""
+
+import threading
+
+import pytest
+
+import search_index
+from search_index import FuzzyArrays, TrigramIndex, char_mask, fuzzy_scores, normalize_text
+
+
+def make_index(count=2000, postings=True):
+    index = TrigramIndex()
+    index.rebuild((f'd:\\projects\\app{i}\\src', f'note {i}') for i in range(count))
+    if postings:
+        index.build_postings()
+    return index
+
+
+def test_update_keeps_path_indexed():
+    index = make_index(10)
+    index.update('d:\\projects\\app3\\src', '标签 python')
+    assert 'd:\\projects\\app3\\src' in index.search('python')
+    assert 'd:\\projects\\app3\\src' not in index.search('note 3')
+    assert 'd:\\projects\\app3\\src' in index.search('app3')
+
+
+def test_search_without_postings_matches_postings():
+    """建立倒排表之前线性扫描的结果与之后相同，之前的增量更新也会进入倒排表"""
+    index = make_index(200, postings=False)
+    index.update('d:\\projects\\app3\\src', '发布 nasrel')
+    queries = ['app1', 'note 1', 'nasrel', '发布', 'src', 'zzz', 'prjsrc']
+    before = {query: (set(index.search(query)), dict(index.fuzzy_search(query))) for query in queries}
+    index.build_postings()
+    index.clear_cache()
+    assert {query: (set(index.search(query)), dict(index.fuzzy_search(query))) for query in queries} == before
+
+
+def test_concurrent_update_and_search():
+    """智能标签线程更新注释时，界面线程的搜索不能出错，也不能漏掉路径"""
+    index = make_index()
+    stop = threading.Event()
+    errors = []
+
+    def update_comments():
+        try:
+            round_no = 0
+            while not stop.is_set():
+                round_no += 1
+                for i in range(0, 2000, 7):
+                    index.update(f'd:\\projects\\app{i}\\src', f'tag{round_no} python')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stop.set()
+
+    writer = threading.Thread(target=update_comments)
+    writer.start()
+    try:
+        for _ in range(200):
+            if stop.is_set():
+                break
+            index.clear_cache()
+            assert len(index.search('projects')) == 2000
+            assert len(index.search('pr')) == 2000
+            assert len(index.fuzzy_search('prjsrc')) == 2000
+    finally:
+        stop.set()
+        writer.join()
+    assert not errors
+
+
+def test_numpy_scores_match_pure_python():
+    """向量化的匹配和评分（包括连续子串、路径开头和文件夹名加分）与 fuzzy_scores 完全相同"""
+    numpy = pytest.importorskip('numpy')
+    paths = [f'd:\\projects\\app{i}\\src' for i in range(300)] + [
+        'c:\\users\\dev\\nas-release', '\\\\nas01\\share\\rel', 'e:\\报告\\2024 年度', 'nasrel',
+    ]
+    index = TrigramIndex()
+    index.rebuild((path, '') for path in paths)
+    arrays = FuzzyArrays(numpy, index.texts, index.fuzzy_keys)
+    base = {path: 0 for path in paths[::2]}
+    for query in ['nas', 'nasrel', 'app1src', 'prjsrc', 'd:', '报告', 'zzz', 's_1']:
+        query = normalize_text(query)
+        expected = fuzzy_scores(query, list(index._mask_candidates(char_mask(query))), index.texts)
+        assert arrays.scores(query) == expected
+        expected = fuzzy_scores(query, [(path, index.fuzzy_keys[path]) for path in base], index.texts)
+        assert arrays.scores(query, base) == expected
+
+
+def test_fuzzy_search_with_numpy_keeps_comment_matches(monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(search_index, 'NUMPY_MIN_PATHS', 1)
+    index = make_index(20)
+    index.update('d:\\projects\\app7\\src', '发布 nasrel')
+    scores = index.fuzzy_search('nasrel')
+    assert list(scores) == ['d:\\projects\\app7\\src']
+    assert index._fuzzy_arrays